@@ -0,0 +1,262 @@
+"""ASGI serving mode for the ML API
+
+Usage:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5001
+    python serve.py --workers 4 --asgi
+
+I/O-bound endpoints run natively on the event loop: GET /api/ml/realtime reads
+the current immutable snapshot (with ETag/304 and ?since= deltas) and
+GET /api/ml/stream pushes Server-Sent Events without holding a thread per
+client. Every other route is served by the unchanged Flask app through a
+WSGI bridge, so response schemas are identical in both modes:
+
+    POST requests  model inference, CA simulation and other CPU-bound work run
+                   on a bounded compute pool; at most NEURONIX_ASGI_MAX_PENDING
+                   may wait or run at once, beyond that clients get a 503
+    other methods  cheap reads (health, stats, model info, history) run on a
+                   separate pool, so slow simulations never starve them
+
+    NEURONIX_ASGI_COMPUTE_WORKERS  compute pool threads (default: CPU count)
+    NEURONIX_ASGI_IO_WORKERS       read pool threads (default 16)
+    NEURONIX_ASGI_MAX_PENDING      compute requests admitted at once (default 4x compute workers)
+    NEURONIX_ASGI_MAX_BODY         request body limit in bytes (default 16 MiB)
+    NEURONIX_REALTIME              start the real-time loop on ASGI startup (default 1)
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from werkzeug.http import parse_etags, quote_etag
+
+import json_encoding
+import ml_api
+
+JSON_HEADERS = [(b'content-type', b'application/json'), (b'access-control-allow-origin', b'*')]
+
+def _query_param(query: dict, name: str, default=None, type=None):
+    """First value of a query parameter; like Flask, invalid values fall back to default"""
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        return type(values[0]) if type else values[0]
+    except ValueError:
+        return default
+
+def _header(scope, name: bytes) -> str:
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+class NeuronixASGI:
+    """ASGI application: native realtime/stream handlers plus the Flask app over WSGI"""
+    
+    def __init__(self, flask_app, compute_workers: int = None, io_workers: int = 16,
+                 max_pending: int = None, max_body: int = 16 << 20):
+        self.flask_app = flask_app
+        compute_workers = compute_workers or os.cpu_count() or 1
+        self.compute_executor = ThreadPoolExecutor(max_workers=compute_workers, thread_name_prefix='asgi-compute')
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='asgi-io')
+        self.max_pending = max_pending or compute_workers * 4
+        self.max_body = max_body
+        self._compute_slots = None  # Created on the serving loop
+        self.stats = {'native': 0, 'compute': 0, 'io': 0, 'rejected': 0}
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+    
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if os.environ.get('NEURONIX_REALTIME', '1') != '0':
+                    ml_api.real_time_predictor.start_continuous_prediction()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.compute_executor.shutdown(wait=False)
+                self.io_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def _http(self, scope, receive, send):
+        method, path = scope['method'], scope['path']
+        if method == 'GET' and path == '/api/ml/realtime':
+            self.stats['native'] += 1
+            await self._realtime(scope, send)
+        elif method == 'GET' and path == '/api/ml/stream':
+            self.stats['native'] += 1
+            await self._stream(scope, receive, send)
+        elif method == 'POST':
+            await self._compute(scope, receive, send)
+        else:
+            self.stats['io'] += 1
+            await self._wsgi(scope, receive, send, self.io_executor)
+    
+    async def _realtime(self, scope, send):
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+        snapshot = ml_api.prediction_snapshots.current
+        region = _query_param(query, 'region', 'all')
+        if region != 'all' and region not in snapshot.predictions:
+            await self._send_json(send, 404, {'success': False, 'error': f'No prediction for region: {region}'})
+            return
+        headers = JSON_HEADERS + [(b'etag', quote_etag(snapshot.etag).encode('latin-1')),
+                                  (b'cache-control', b'no-cache')]
+        
+        if snapshot.etag in parse_etags(_header(scope, b'if-none-match')):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers[1:]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        
+        body = ml_api.realtime_body(
+            snapshot, region, _query_param(query, 'since', type=int), _query_param(query, 'epoch')
+        )
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': headers + [(b'content-length', str(len(body)).encode('latin-1'))]})
+        await send({'type': 'http.response.body', 'body': body})
+    
+    async def _stream(self, scope, receive, send):
+        broadcaster = ml_api.prediction_broadcaster
+        last_event_id = _header(scope, b'last-event-id')
+        last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+        # Subscribe before taking the snapshot so no update falls in between
+        subscription = broadcaster.subscribe_async(last_event_id)
+        snapshot = broadcaster.snapshot_frame() if last_event_id is None else None
+        
+        async def pump():
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'), (b'access-control-allow-origin', b'*')
+            ]})
+            async for frame in broadcaster.stream_async(subscription, snapshot):
+                await send({'type': 'http.response.body', 'body': frame, 'more_body': True})
+        
+        async def wait_for_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+        
+        pump_task = asyncio.ensure_future(pump())
+        disconnect_task = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            await asyncio.wait({pump_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Cancelling the pump closes the generator; unsubscribe here too in case it never started
+            for task in (pump_task, disconnect_task):
+                task.cancel()
+            broadcaster.unsubscribe(subscription)
+    
+    async def _compute(self, scope, receive, send):
+        if self._compute_slots is None:
+            self._compute_slots = asyncio.Semaphore(self.max_pending)
+        # Shed load instead of queueing without bound behind slow simulations
+        if self._compute_slots.locked():
+            self.stats['rejected'] += 1
+            await self._send_json(send, 503, {'success': False, 'error': 'Server busy, retry shortly'},
+                                  [(b'retry-after', b'1')])
+            return
+        async with self._compute_slots:
+            self.stats['compute'] += 1
+            await self._wsgi(scope, receive, send, self.compute_executor)
+    
+    async def _send_json(self, send, status: int, payload: dict, extra_headers=()):
+        body = json_encoding.dumps(payload)
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': JSON_HEADERS + list(extra_headers)})
+        await send({'type': 'http.response.body', 'body': body})
+    
+    async def _read_body(self, receive) -> bytes:
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > self.max_body:
+                raise ValueError('Request body too large')
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+    
+    def _environ(self, scope, body: bytes) -> dict:
+        server_name, server_port = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server_name,
+            'SERVER_PORT': str(server_port),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False
+        }
+        for key, value in scope['headers']:
+            name = key.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'CONTENT_LENGTH':
+                name = 'HTTP_' + name
+                environ[name] = f"{environ[name]},{value}" if name in environ else value
+        return environ
+    
+    def _call_wsgi(self, environ: dict):
+        """Run the Flask app to completion on a worker thread"""
+        response = {}
+        
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+        
+        iterable = self.flask_app(environ, start_response)
+        try:
+            body = b''.join(iterable)
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+        return response['status'], response['headers'], body
+    
+    async def _wsgi(self, scope, receive, send, executor: ThreadPoolExecutor):
+        try:
+            body = await self._read_body(receive)
+        except ValueError as e:
+            await self._send_json(send, 413, {'success': False, 'error': str(e)})
+            return
+        if body is None:
+            return  # Client went away before sending the whole request
+        
+        loop = asyncio.get_running_loop()
+        status, headers, response_body = await loop.run_in_executor(
+            executor, self._call_wsgi, self._environ(scope, body)
+        )
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': response_body})
+
+app = NeuronixASGI(
+    ml_api.app,
+    compute_workers=int(os.environ.get('NEURONIX_ASGI_COMPUTE_WORKERS', 0)) or None,
+    io_workers=int(os.environ.get('NEURONIX_ASGI_IO_WORKERS', 16)),
+    max_pending=int(os.environ.get('NEURONIX_ASGI_MAX_PENDING', 0)) or None,
+    max_body=int(os.environ.get('NEURONIX_ASGI_MAX_BODY', 16 << 20))
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5001)
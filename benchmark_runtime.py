@@ -0,0 +1,137 @@
+
+"""Sweep TensorFlow runtime profiles for ConvLSTMUNetModel.predict_fire_risk
+
+Usage:
+    python benchmark_runtime.py --intra 1 2 4 --inter 1 2 --precision float32 mixed_bfloat16 \\
+        --onednn default off --concurrency 1 4 --iterations 50 --output results.json
+
+Thread pools and oneDNN can only be configured before TensorFlow initializes,
+so every profile is measured in a fresh subprocess. Results report throughput
+(predictions/second across all client threads) and per-call latency percentiles.
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from runtime_profile import RuntimeProfile, PRECISIONS
+
+SAMPLE_INPUT = {
+    'temperature': 34, 'humidity': 28, 'wind_speed': 22, 'wind_direction': 'NE',
+    'ndvi': 0.6, 'elevation': 1500, 'slope': 15, 'vegetation_density': 'dense'
+}
+
+def run_single(iterations: int, warmup: int, concurrency: int) -> dict:
+    """Benchmark predict_fire_risk in this process with the profile from the environment"""
+    import numpy as np
+    from ml_models import ConvLSTMUNetModel, runtime_profile
+    
+    model = ConvLSTMUNetModel()
+    for _ in range(warmup):
+        model.predict_fire_risk(SAMPLE_INPUT, spatial_map='none')
+    
+    latencies = []
+    lock = threading.Lock()
+    
+    def client():
+        local = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            model.predict_fire_risk(SAMPLE_INPUT, spatial_map='none')
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+    
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'profile': runtime_profile.describe(),
+        'concurrency': concurrency,
+        'predictions': len(latencies),
+        'throughput_per_sec': len(latencies) / elapsed,
+        'latency_ms': {
+            'mean': float(latencies_ms.mean()),
+            'p50': float(np.percentile(latencies_ms, 50)),
+            'p95': float(np.percentile(latencies_ms, 95)),
+            'p99': float(np.percentile(latencies_ms, 99))
+        }
+    }
+
+def run_profile(profile: RuntimeProfile, args, concurrency: int) -> dict:
+    """Run one profile in a subprocess and collect its JSON result"""
+    env = dict(os.environ)
+    env.update(profile.to_env())
+    env['NEURONIX_INFERENCE_BACKEND'] = 'keras'
+    command = [
+        sys.executable, os.path.abspath(__file__), '--single',
+        '--iterations', str(args.iterations), '--warmup', str(args.warmup),
+        '--concurrency', str(concurrency)
+    ]
+    completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'profile': profile.describe(), 'concurrency': concurrency,
+                'error': completed.stderr.strip().splitlines()[-1:]}
+    # The result is the last line; TensorFlow may log to stdout before it
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TensorFlow runtime profiles')
+    parser.add_argument('--intra', type=int, nargs='+', default=[0, 1, 2, 4],
+                        help='Intra-op thread counts to sweep (0 = TF default)')
+    parser.add_argument('--inter', type=int, nargs='+', default=[0, 1, 2],
+                        help='Inter-op thread counts to sweep (0 = TF default)')
+    parser.add_argument('--precision', nargs='+', choices=PRECISIONS, default=['float32'])
+    parser.add_argument('--onednn', nargs='+', choices=['default', 'on', 'off'], default=['default'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1],
+                        help='Number of concurrent client threads per run')
+    parser.add_argument('--iterations', type=int, default=30, help='Predictions per client thread')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--output', help='Write all results to this JSON file')
+    parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.single:
+        print(json.dumps(run_single(args.iterations, args.warmup, args.concurrency[0])))
+        return
+    
+    results = []
+    sweep = itertools.product(args.intra, args.inter, args.precision, args.onednn, args.concurrency)
+    for intra, inter, precision, onednn, concurrency in sweep:
+        profile = RuntimeProfile(
+            intra_op_threads=intra, inter_op_threads=inter, precision=precision,
+            onednn=None if onednn == 'default' else onednn == 'on'
+        )
+        result = run_profile(profile, args, concurrency)
+        results.append(result)
+        
+        settings = f"intra={intra or 'dflt':>4} inter={inter or 'dflt':>4} {precision:>14} onednn={onednn:>7} clients={concurrency:>2}"
+        if 'error' in result:
+            print(f"{settings}  FAILED {result['error']}")
+        else:
+            latency = result['latency_ms']
+            print(f"{settings}  {result['throughput_per_sec']:8.2f} pred/s  "
+                  f"p50 {latency['p50']:7.2f} ms  p95 {latency['p95']:7.2f} ms")
+    
+    successful = [r for r in results if 'error' not in r]
+    if successful:
+        best = max(successful, key=lambda r: r['throughput_per_sec'])
+        print(f"Best throughput: {best['throughput_per_sec']:.2f} pred/s with {best['profile']} "
+              f"at concurrency {best['concurrency']}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
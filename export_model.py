@@ -0,0 +1,59 @@
+
+"""Export the ConvLSTM + UNet model to TFLite and compare it against Keras
+
+Usage:
+    python export_model.py --output models/convlstm_unet.tflite --quantization int8
+
+Start the API with NEURONIX_INFERENCE_BACKEND=tflite (and NEURONIX_TFLITE_MODEL
+pointing at the exported file) to serve predictions from the TFLite runtime.
+"""
+import argparse
+import json
+import os
+
+# Build the Keras model for export regardless of the configured serving backend
+os.environ['NEURONIX_INFERENCE_BACKEND'] = 'keras'
+
+from ml_models import (fire_predictor, export_tflite_model, compare_inference_backends,
+                       TFLiteInferenceBackend, TFLITE_MODEL_PATH)
+
+def main():
+    parser = argparse.ArgumentParser(description='Export ConvLSTM + UNet model to TFLite')
+    parser.add_argument('--output', default=TFLITE_MODEL_PATH, help='Path of the .tflite file to write')
+    parser.add_argument('--quantization', choices=['none', 'float16', 'int8'], default='none',
+                        help='Post-training quantization (int8 = dynamic-range weight quantization)')
+    parser.add_argument('--batch-size', type=int, default=1, help='Static batch size of the exported model')
+    parser.add_argument('--compare-samples', type=int, default=64,
+                        help='Number of synthetic inputs for the accuracy comparison (0 to skip)')
+    parser.add_argument('--threads', type=int, default=None, help='TFLite interpreter threads for the comparison')
+    args = parser.parse_args()
+    
+    keras_model = fire_predictor.convlstm_model
+    quantization = None if args.quantization == 'none' else args.quantization
+    
+    size_bytes = export_tflite_model(
+        keras_model.model, args.output, input_shape=keras_model.input_shape,
+        batch_size=args.batch_size, quantization=quantization
+    )
+    print(f"Exported {args.output} ({size_bytes / 1e6:.2f} MB, quantization={args.quantization})")
+    
+    if args.compare_samples <= 0:
+        return
+    
+    report = compare_inference_backends(
+        keras_model.backend, TFLiteInferenceBackend(args.output, args.threads),
+        samples=args.compare_samples, input_shape=keras_model.input_shape
+    )
+    report['quantization'] = args.quantization
+    report['model_size_bytes'] = size_bytes
+    
+    # Keep the accuracy report next to the artifact it describes
+    report_path = os.path.splitext(args.output)[0] + '.comparison.json'
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    
+    print(json.dumps(report, indent=2))
+    print(f"Comparison report written to {report_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,420 @@
+"""Cellular automata fire spread and background simulation jobs
+
+Free of TensorFlow and of import-time side effects, so the simulation job
+server and its pool processes import only this module, never the model.
+"""
+import datetime
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+import numpy as np
+
+class CellularAutomataFireSpread:
+    """Cellular Automata model for fire spread simulation"""
+    
+    def __init__(self, grid_size=(100, 100)):
+        self.grid_size = grid_size
+        self.grid = np.zeros(grid_size)
+        self.fuel_map = np.random.beta(2, 2, grid_size)  # Fuel distribution
+        self.elevation_map = np.random.normal(0.5, 0.2, grid_size)
+        self.moisture_map = np.random.beta(3, 2, grid_size)
+        
+    def ignite_fire(self, x: int, y: int):
+        """Start a fire at given coordinates"""
+        if 0 <= x < self.grid_size[0] and 0 <= y < self.grid_size[1]:
+            self.grid[x, y] = 1.0
+    
+    def spread_step(self, wind_speed: float, wind_direction: float, temperature: float, humidity: float):
+        """Perform one step of fire spread simulation"""
+        new_grid = self.grid.copy()
+        
+        # Convert wind direction to vector
+        wind_x = np.cos(np.radians(wind_direction)) * wind_speed / 30.0
+        wind_y = np.sin(np.radians(wind_direction)) * wind_speed / 30.0
+        
+        # Temperature and humidity effects
+        temp_factor = min(temperature / 40.0, 1.5)
+        humidity_factor = max(0.1, 1.0 - humidity / 100.0)
+        
+        for i in range(1, self.grid_size[0] - 1):
+            for j in range(1, self.grid_size[1] - 1):
+                if self.grid[i, j] > 0:  # If there's fire
+                    # Check 8 neighbors
+                    for di in [-1, 0, 1]:
+                        for dj in [-1, 0, 1]:
+                            if di == 0 and dj == 0:
+                                continue
+                            
+                            ni, nj = i + di, j + dj
+                            if 0 <= ni < self.grid_size[0] and 0 <= nj < self.grid_size[1]:
+                                if new_grid[ni, nj] == 0:  # Unburned cell
+                                    # Calculate spread probability
+                                    base_prob = 0.1
+                                    
+                                    # Fuel availability
+                                    fuel_factor = self.fuel_map[ni, nj]
+                                    
+                                    # Slope effect (fire spreads faster uphill)
+                                    slope_factor = 1.0
+                                    if self.elevation_map[ni, nj] > self.elevation_map[i, j]:
+                                        slope_factor = 1.5
+                                    elif self.elevation_map[ni, nj] < self.elevation_map[i, j]:
+                                        slope_factor = 0.7
+                                    
+                                    # Wind effect
+                                    wind_factor = 1.0
+                                    if abs(di - wind_x) < 0.5 and abs(dj - wind_y) < 0.5:
+                                        wind_factor = 1.8
+                                    
+                                    # Moisture effect
+                                    moisture_factor = max(0.1, 1.0 - self.moisture_map[ni, nj])
+                                    
+                                    # Calculate total probability
+                                    spread_prob = (base_prob * fuel_factor * slope_factor * 
+                                                 wind_factor * temp_factor * humidity_factor * moisture_factor)
+                                    
+                                    if np.random.random() < spread_prob:
+                                        new_grid[ni, nj] = 1.0
+        
+        # Fire decay (burned areas become less intense over time)
+        self.grid = self.grid * 0.95
+        self.grid = np.maximum(self.grid, new_grid)
+        
+        return self.calculate_spread_metrics()
+    
+    def calculate_spread_metrics(self) -> Dict:
+        """Calculate metrics about fire spread"""
+        burned_area = np.sum(self.grid > 0.1)
+        total_cells = self.grid_size[0] * self.grid_size[1]
+        
+        # Calculate perimeter (simplified)
+        fire_cells = self.grid > 0.1
+        perimeter = 0
+        for i in range(self.grid_size[0]):
+            for j in range(self.grid_size[1]):
+                if fire_cells[i, j]:
+                    # Check if cell is on the edge of fire
+                    neighbors = 0
+                    for di in [-1, 0, 1]:
+                        for dj in [-1, 0, 1]:
+                            ni, nj = i + di, j + dj
+                            if (0 <= ni < self.grid_size[0] and 0 <= nj < self.grid_size[1] 
+                                and fire_cells[ni, nj]):
+                                neighbors += 1
+                    if neighbors < 9:  # Not completely surrounded
+                        perimeter += 1
+        
+        return {
+            'burned_area_hectares': burned_area * 0.25,  # Assuming each cell = 0.25 hectares
+            'fire_perimeter_km': perimeter * 0.05,  # Rough conversion
+            'fire_intensity': np.mean(self.grid[self.grid > 0]),
+            'spread_rate': burned_area  # Simplified spread rate
+        }
+
+WIND_DIRECTION_DEGREES = {'N': 0, 'NE': 45, 'E': 90, 'SE': 135, 'S': 180, 'SW': 225, 'W': 270, 'NW': 315}
+
+def spread_hours(simulator: CellularAutomataFireSpread, environmental_data: Dict, first_hour: int,
+                 hours: int = 1) -> List[Dict]:
+    """Advance a fire spread simulation by hours and return the metrics of each hour"""
+    # Convert wind direction string to degrees
+    wind_direction_deg = WIND_DIRECTION_DEGREES.get(environmental_data['wind_direction'], 0)
+    
+    simulation_results = []
+    for hour in range(first_hour, first_hour + hours):
+        # Simulate hourly variations
+        temp_variation = environmental_data['temperature'] + np.random.normal(0, 2)
+        humidity_variation = max(10, environmental_data['humidity'] + np.random.normal(0, 5))
+        wind_variation = max(0, environmental_data['wind_speed'] + np.random.normal(0, 3))
+        
+        # Perform spread step
+        metrics = simulator.spread_step(
+            wind_variation, wind_direction_deg, temp_variation, humidity_variation
+        )
+        
+        metrics['hour'] = hour
+        metrics['temperature'] = temp_variation
+        metrics['humidity'] = humidity_variation
+        metrics['wind_speed'] = wind_variation
+        
+        simulation_results.append(metrics)
+    
+    return simulation_results
+
+def fire_spread_result(simulator: CellularAutomataFireSpread, simulation_results: List[Dict]) -> Dict:
+    """Shape of a finished simulation as returned by /api/ml/simulate"""
+    return {
+        'hourly_progression': simulation_results,
+        'final_state': simulation_results[-1] if simulation_results else {},
+        # Copy: the simulator keeps igniting into its grid in place
+        'fire_map': simulator.grid.copy()
+    }
+
+class SimulationCancelled(Exception):
+    """Raised inside a simulation job to stop it once cancelled"""
+
+class JobQueueFull(Exception):
+    """The simulation job queue is at capacity"""
+
+# Shared with every pool process by _init_pool_process, one slot per job worker
+# thread: hours simulated by the slot's current member, and its cancel flag
+_slot_hours = None
+_slot_cancelled = None
+
+def _init_pool_process(slot_hours, slot_cancelled):
+    global _slot_hours, _slot_cancelled
+    _slot_hours, _slot_cancelled = slot_hours, slot_cancelled
+    # Processes forked from one fork server would otherwise share a random state
+    np.random.seed()
+
+def simulate_member(slot: int, params: Dict) -> Dict:
+    """Run one ensemble member of a job in a pool process
+    
+    Progress goes to the slot's hour counter after every simulated hour, and
+    the run stops with SimulationCancelled once the slot's cancel flag is set.
+    """
+    simulator = CellularAutomataFireSpread(grid_size=(params['grid_size'], params['grid_size']))
+    simulator.ignite_fire(*params['ignition_point'])
+    simulation_results = []
+    for hour in range(params['duration_hours']):
+        if _slot_cancelled[slot]:
+            raise SimulationCancelled()
+        simulation_results.extend(spread_hours(simulator, params['environmental_data'], hour))
+        _slot_hours[slot] = hour + 1
+    return fire_spread_result(simulator, simulation_results)
+
+@dataclass
+class SimulationJob:
+    """A fire spread simulation submitted to the SimulationJobManager"""
+    job_id: str
+    params: Dict
+    status: str = 'queued'  # queued, running, completed, failed, cancelled
+    progress: float = 0.0
+    submitted_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    cancel_event: threading.Event = field(default=None, repr=False, compare=False)
+    future: object = field(default=None, repr=False, compare=False)
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in ('completed', 'failed', 'cancelled')
+    
+    def snapshot(self) -> 'SimulationJob':
+        """Copy without the cancel event and future, so it can be pickled to another process"""
+        return replace(self, cancel_event=None, future=None)
+    
+    def to_dict(self) -> Dict:
+        def stamp(value):
+            return datetime.datetime.fromtimestamp(value).isoformat() if value else None
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'progress': round(self.progress, 4),
+            'params': self.params,
+            'submitted_at': stamp(self.submitted_at),
+            'started_at': stamp(self.started_at),
+            'finished_at': stamp(self.finished_at),
+            'error': self.error
+        }
+
+class SimulationJobManager:
+    """Runs long fire spread simulations on a bounded worker pool
+    
+    Each running job is driven by one of max_workers threads, which hands its
+    ensemble members, one per task, to a pool of as many processes: spread_step
+    is pure Python and would serialize on the GIL in threads. Pool processes
+    come from a fork server that imports only this module, never a process
+    with TensorFlow loaded. Jobs get their own CellularAutomataFireSpread, so
+    concurrent jobs never share a grid. At most max_queued jobs may wait for a
+    worker; further submissions raise JobQueueFull. Running jobs report
+    progress per simulated hour and stop at the next hour once cancelled.
+    Finished jobs are kept for result_ttl seconds, and at most retain of them,
+    oldest evicted first.
+    
+    Job state lives in this process, and callers get snapshots of it. Under
+    serve.py the workers reach one shared manager through simulation_server.
+    """
+    
+    PROGRESS_INTERVAL = 0.2  # Seconds between progress reads while a member runs
+    
+    def __init__(self, max_workers: int = 2, max_queued: int = 32, retain: int = 100,
+                 result_ttl: float = 3600.0):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.retain = retain
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='simulation')
+        self._processes = None  # ProcessPoolExecutor for ensemble members, started by the first job
+        self._context = multiprocessing.get_context('forkserver')
+        self._slot_hours = self._context.RawArray('i', max_workers)
+        self._slot_cancelled = self._context.RawArray('b', max_workers)
+        self._free_slots = list(range(max_workers))
+        self._jobs = OrderedDict()  # job id -> SimulationJob, in submission order
+        self._lock = threading.Lock()
+        self.counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0, 'rejected': 0, 'evicted': 0}
+    
+    def submit(self, params: Dict) -> SimulationJob:
+        with self._lock:
+            self._evict()
+            if sum(1 for job in self._jobs.values() if job.status == 'queued') >= self.max_queued:
+                self.counters['rejected'] += 1
+                raise JobQueueFull(f"Simulation queue is full ({self.max_queued} jobs waiting)")
+            job = SimulationJob(job_id=uuid.uuid4().hex, params=params, submitted_at=time.time(),
+                                cancel_event=threading.Event())
+            self._jobs[job.job_id] = job
+            self.counters['submitted'] += 1
+        job.future = self._executor.submit(self._run, job)
+        with self._lock:
+            return job.snapshot()
+    
+    def get(self, job_id: str) -> Optional[SimulationJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.snapshot() if job is not None else None
+    
+    def list_jobs(self) -> List[SimulationJob]:
+        with self._lock:
+            self._evict()
+            return [job.snapshot() for job in self._jobs.values()]
+    
+    def cancel(self, job_id: str) -> Optional[SimulationJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if not job.finished:
+            job.cancel_event.set()
+            # Queued jobs never start; running ones stop at their next simulated hour
+            if job.future is not None and job.future.cancel():
+                self._finish(job, 'cancelled')
+        with self._lock:
+            return job.snapshot()
+    
+    def shutdown(self, wait: bool = True):
+        """Cancel unfinished jobs and stop the worker threads and processes"""
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel_event.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        with self._lock:
+            processes, self._processes = self._processes, None
+        if processes is not None:
+            processes.shutdown(wait=wait, cancel_futures=True)
+    
+    def _process_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._processes is None:
+                self._context.set_forkserver_preload([__name__])
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=self._context,
+                    initializer=_init_pool_process, initargs=(self._slot_hours, self._slot_cancelled)
+                )
+            return self._processes
+    
+    def _discard_process_pool(self, processes: ProcessPoolExecutor):
+        """Drop a broken pool so the next job starts a fresh one"""
+        with self._lock:
+            if self._processes is processes:
+                self._processes = None
+        processes.shutdown(wait=False, cancel_futures=True)
+    
+    def _finish(self, job: SimulationJob, status: str, result: Optional[Dict] = None, error: Optional[str] = None):
+        with self._lock:
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = time.time()
+            self.counters[status] += 1
+    
+    def _run_member(self, job: SimulationJob, processes: ProcessPoolExecutor, slot: int, member: int) -> Dict:
+        """Run one ensemble member in the pool, relaying progress and cancellation through the slot"""
+        params = job.params
+        total_hours = params['ensemble_size'] * params['duration_hours']
+        self._slot_hours[slot] = 0
+        future = processes.submit(simulate_member, slot, params)
+        while True:
+            if job.cancel_event.is_set():
+                self._slot_cancelled[slot] = 1
+            try:
+                return future.result(timeout=self.PROGRESS_INTERVAL)
+            except FutureTimeout:
+                job.progress = (member * params['duration_hours'] + self._slot_hours[slot]) / total_hours
+    
+    def _run(self, job: SimulationJob):
+        if job.cancel_event.is_set():
+            self._finish(job, 'cancelled')
+            return
+        job.status = 'running'
+        job.started_at = time.time()
+        
+        params = job.params
+        members = params['ensemble_size']
+        processes = self._process_pool()
+        with self._lock:
+            slot = self._free_slots.pop()
+        self._slot_cancelled[slot] = 0
+        
+        try:
+            runs = []
+            for member in range(members):
+                if job.cancel_event.is_set():
+                    raise SimulationCancelled()
+                runs.append(self._run_member(job, processes, slot, member))
+                job.progress = (member + 1) / members
+            
+            result = runs[0]
+            if members > 1:
+                # Share of ensemble members in which each cell burned
+                burned = np.stack([run['fire_map'] > 0 for run in runs])
+                result['ensemble'] = {
+                    'size': members,
+                    'burn_probability': burned.mean(axis=0),
+                    'final_states': [run['final_state'] for run in runs]
+                }
+            self._finish(job, 'completed', result=result)
+        except SimulationCancelled:
+            self._finish(job, 'cancelled')
+        except BrokenProcessPool as e:
+            # A pool process died, e.g. killed for memory
+            self._discard_process_pool(processes)
+            self._finish(job, 'failed', error=f"Simulation process died: {e}")
+        except Exception as e:
+            self._finish(job, 'failed', error=str(e))
+        finally:
+            with self._lock:
+                self._free_slots.append(slot)
+    
+    def _evict(self):
+        """Drop expired finished jobs, then the oldest finished ones beyond retain (lock held)"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished:
+            if now - job.finished_at > self.result_ttl:
+                del self._jobs[job.job_id]
+                self.counters['evicted'] += 1
+        finished = [job for job in finished if job.job_id in self._jobs]
+        finished.sort(key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - self.retain)]:
+            del self._jobs[job.job_id]
+            self.counters['evicted'] += 1
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            return {
+                'workers': self.max_workers,
+                'max_queued': self.max_queued,
+                'queue_depth': statuses.count('queued'),
+                'running': statuses.count('running'),
+                'retained': sum(1 for status in statuses if status in ('completed', 'failed', 'cancelled')),
+                **self.counters
+            }
@@ -0,0 +1,69 @@
+"""NumPy-aware JSON encoding for API responses
+
+dumps() serializes straight to UTF-8 bytes. With orjson installed, NumPy
+arrays and scalars are written natively from their buffers, so large maps
+(spatial_risk_map, fire_map) never go through .tolist() and Python floats.
+Without it, the stdlib encoder is used with a default hook that converts
+NumPy values. NumpyJSONProvider plugs the same encoder into Flask, so every
+jsonify() call goes through it.
+"""
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value):
+    """Values neither encoder handles natively, converted the way Flask would"""
+    if isinstance(value, (np.ndarray, np.generic)):
+        # Non-contiguous or exotic-dtype arrays orjson falls back on
+        return value.tolist()
+    if isinstance(value, datetime.date):
+        return http_date(value)
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+def dumps(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialize obj, including NumPy arrays and scalars, to compact JSON bytes"""
+    if orjson is not None:
+        options = _ORJSON_OPTIONS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=options)
+    if indent:
+        return json.dumps(obj, default=_default, indent=2, sort_keys=sort_keys).encode('utf-8')
+    return json.dumps(obj, default=_default, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider whose responses are encoded by dumps()
+    
+    Keys are not sorted, which only changes key order in responses.
+    """
+    
+    sort_keys = False
+    default = staticmethod(_default)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Match Flask: pretty-print in debug mode unless compact is forced
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(dumps(obj, indent=indent) + b'\n', mimetype=self.mimetype)
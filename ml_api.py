@@ -1,26 +1,404 @@
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-import json
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+import os
 import numpy as np
 from datetime import datetime
-from ml_models import get_model_predictions, simulate_fire_scenario, NDVIAnalyzer
+from ml_models import (get_model_predictions, get_regional_predictions, simulate_fire_scenario,
+                       NDVIAnalyzer, prediction_cache, fire_predictor, reload_model, explain_fire_factors,
+                       RiskAdaptiveScheduler, RiskHistoryStore, FixedRateTicker, TTLLRUCache,
+                       simulation_jobs, ignition_cell, JobQueueFull, parse_spatial_map, check_model_artifact)
+from weight_store import ArtifactNotFound
+from weather_ingestion import create_weather_ingestor
+from json_encoding import NumpyJSONProvider
+import json_encoding
+import realtime_server
+import asyncio
+import functools
+import hashlib
+import hmac
 import threading
+import queue
+import re
+import signal
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 
 app = Flask(__name__)
+# NumPy-aware, orjson-backed encoding for every jsonify() response
+app.json = NumpyJSONProvider(app)
 CORS(app)
 
+# Upper bound on MC dropout passes per request
+MAX_MC_SAMPLES = 256
+
+# Regions added over the API: how many may be tracked in total, and what a name may look like
+MAX_REGIONS = int(os.environ.get('NEURONIX_MAX_REGIONS', 256))
+REGION_NAME_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9 ._'-]{0,63}")
+
 # Global variables for real-time data simulation
-current_predictions = {}
 simulation_cache = {}
 
+class PredictionSnapshot:
+    """One immutable version of the real-time predictions for all regions
+    
+    Published snapshots are never mutated, so request threads can read them
+    without locking. JSON bodies are serialized on first use and reused by
+    every later request for the same version. Each snapshot also carries the
+    recent change log, (version, changed regions, removed regions) per
+    publish, which answers delta queries consistently with its own contents.
+    """
+    
+    def __init__(self, version: int, predictions: dict, timestamp: str, epoch: str = '', changes: tuple = ()):
+        self.version = version
+        self.epoch = epoch
+        self.predictions = MappingProxyType(predictions)
+        self.timestamp = timestamp
+        self.changes = changes
+        self._bodies = {}
+    
+    @property
+    def etag(self) -> str:
+        return f"{self.epoch}-v{self.version}"
+    
+    def _serialize(self, key, payload_fn) -> bytes:
+        cached = self._bodies.get(key)
+        if cached is None:
+            payload = payload_fn()
+            payload['version'] = self.version
+            payload['epoch'] = self.epoch
+            payload['timestamp'] = self.timestamp
+            # Concurrent first reads may both serialize; the results are identical
+            cached = self._bodies[key] = json_encoding.dumps(payload)
+        return cached
+    
+    def body(self, region: str = 'all') -> bytes:
+        """Serialized /api/ml/realtime response for region, cached per version
+        
+        Only regions in this snapshot are cached, which bounds the cache by the
+        tracked regions; anything else raises KeyError.
+        """
+        if region == 'all':
+            return self._serialize(region, lambda: {
+                'success': True, 'full': True, 'predictions': dict(self.predictions), 'removed': []
+            })
+        if region not in self.predictions:
+            raise KeyError(region)
+        return self._serialize(region, lambda: {
+            'success': True, 'prediction': self.predictions[region], 'region': region
+        })
+    
+    def covers(self, since: int) -> bool:
+        """Whether the change log reaches back to version since"""
+        if since == self.version:
+            return True
+        return bool(self.changes) and self.changes[0][0] - 1 <= since < self.version
+    
+    def changed_since(self, since: int) -> tuple:
+        """Predictions of the regions updated after version since, and the regions removed since then"""
+        changed, removed = set(), set()
+        for version, updated, deleted in self.changes:
+            if version > since:
+                changed.update(updated)
+                removed.update(deleted)
+        # A region removed and re-added within the window is just an update
+        return ({region: self.predictions[region] for region in changed if region in self.predictions},
+                sorted(region for region in removed | changed if region not in self.predictions))
+    
+    def delta_body(self, since: int) -> bytes:
+        """Serialized changes after version since: updated regions plus tombstones for removed ones"""
+        def payload():
+            predictions, removed = self.changed_since(since)
+            return {'success': True, 'full': False, 'since': since, 'predictions': predictions, 'removed': removed}
+        return self._serialize(('since', since), payload)
+
+class SnapshotStore:
+    """Holds the latest PredictionSnapshot and publishes new versions
+    
+    Writers copy the current mapping, apply their updates and swap in a new
+    snapshot under a lock; readers just take the current reference.
+    """
+    
+    def __init__(self, change_log_size: int = 512):
+        self._lock = threading.Lock()
+        self.change_log_size = change_log_size
+        # Versions restart with the process; serve.py workers take over the predictor process's epoch
+        self.epoch = f"{os.getpid():x}{int(time.time()):x}"
+        self._current = PredictionSnapshot(0, {}, datetime.now().isoformat(), self.epoch)
+    
+    @property
+    def current(self) -> PredictionSnapshot:
+        return self._current
+    
+    def publish(self, updates: dict, removed: list = ()) -> PredictionSnapshot:
+        with self._lock:
+            current = self._current
+            predictions = dict(current.predictions)
+            predictions.update(updates)
+            for region in removed:
+                predictions.pop(region, None)
+            
+            version = current.version + 1
+            entry = (version, frozenset(updates), frozenset(removed))
+            retained = current.changes[-(self.change_log_size - 1):] if self.change_log_size > 1 else ()
+            snapshot = PredictionSnapshot(version, predictions, datetime.now().isoformat(), self.epoch,
+                                          retained + (entry,))
+            self._current = snapshot
+        return snapshot
+    
+    def changes_since(self, epoch: str, version: int) -> dict:
+        """What a store at (epoch, version) lacks to match the current snapshot
+        
+        Within this store's epoch and change log that is the changed regions and
+        the log entries after version, otherwise the whole snapshot.
+        """
+        snapshot = self._current
+        if epoch == snapshot.epoch and snapshot.covers(version):
+            predictions, removed = snapshot.changed_since(version)
+            changes = tuple(entry for entry in snapshot.changes if entry[0] > version)
+            full = False
+        else:
+            predictions, removed, changes, full = dict(snapshot.predictions), [], snapshot.changes, True
+        return {'epoch': snapshot.epoch, 'version': snapshot.version, 'timestamp': snapshot.timestamp,
+                'full': full, 'predictions': predictions, 'removed': removed, 'changes': changes}
+    
+    def apply(self, change: dict) -> PredictionSnapshot:
+        """Install the snapshot described by another store's changes_since()"""
+        with self._lock:
+            current = self._current
+            if change['full']:
+                predictions, changes = dict(change['predictions']), tuple(change['changes'])
+            else:
+                predictions = dict(current.predictions)
+                predictions.update(change['predictions'])
+                for region in change['removed']:
+                    predictions.pop(region, None)
+                changes = (current.changes + tuple(change['changes']))[-max(self.change_log_size, 1):]
+            self.epoch = change['epoch']
+            snapshot = PredictionSnapshot(change['version'], predictions, change['timestamp'], self.epoch, changes)
+            self._current = snapshot
+        return snapshot
+
+def realtime_body(snapshot: PredictionSnapshot, region: str = 'all', since: int = None, epoch: str = None) -> bytes:
+    """Serialized /api/ml/realtime body for a snapshot (shared with the ASGI handler)"""
+    if region == 'all' and since is not None and epoch in (None, snapshot.epoch) and snapshot.covers(since):
+        # Only regions changed after the client's version, plus tombstones
+        return snapshot.delta_body(since)
+    # Versions from another process, or older than the change log, get everything
+    return snapshot.body(region)
+
+class AsyncSubscription:
+    """Subscriber queue owned by an asyncio event loop (ASGI streaming)"""
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+    
+    def put_nowait(self, frame: bytes):
+        self.queue.put_nowait(frame)
+
+class PredictionBroadcaster:
+    """Pushes real-time prediction updates to Server-Sent Events subscribers
+    
+    Each update is serialized once into an SSE frame and the same bytes are
+    queued for every subscriber, so server work scales with updates, not with
+    clients times poll rate. A slow subscriber loses its oldest queued frames
+    instead of blocking the publisher, and recent frames are kept so a client
+    reconnecting with Last-Event-ID catches up on what it missed.
+    """
+    
+    def __init__(self, queue_size: int = 64, history_size: int = 256, keepalive_seconds: float = 15.0):
+        self.queue_size = queue_size
+        self.keepalive_seconds = keepalive_seconds
+        self._subscribers = set()
+        self._history = deque(maxlen=history_size)  # (event id, frame)
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._new_event = threading.Condition(self._lock)
+        self.published = 0
+        self.dropped = 0
+    
+    @staticmethod
+    def format_event(event: str, data, event_id: int = None) -> bytes:
+        frame = f"event: {event}\n"
+        if event_id is not None:
+            frame += f"id: {event_id}\n"
+        return frame.encode('utf-8') + b"data: " + json_encoding.dumps(data) + b"\n\n"
+    
+    def publish(self, event: str, data):
+        """Serialize data once and queue it for every subscriber"""
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            frame = self.format_event(event, data, event_id)
+            self._history.append((event_id, frame))
+            subscribers = list(self._subscribers)
+            self.published += 1
+            self._new_event.notify_all()
+        
+        for subscription in subscribers:
+            self._offer(subscription, frame)
+    
+    @property
+    def last_event_id(self) -> int:
+        return self._next_id - 1
+    
+    def wait(self, last_event_id: int, timeout: float) -> bool:
+        """Block until an event after last_event_id is published, for at most timeout seconds"""
+        with self._new_event:
+            return self._new_event.wait_for(lambda: self._next_id - 1 > last_event_id, timeout)
+    
+    def frames_after(self, last_event_id: int) -> list:
+        """Retained (event id, frame) pairs published after last_event_id"""
+        with self._lock:
+            return [(event_id, frame) for event_id, frame in self._history if event_id > last_event_id]
+    
+    def relay(self, frames: list, last_event_id: int, reset: bool = False):
+        """Republish another broadcaster's frames unchanged, with their event ids
+        
+        reset first drops the retained frames, whose ids belong to a previous
+        run of that broadcaster.
+        """
+        with self._lock:
+            if reset:
+                self._history.clear()
+            self._history.extend(frames)
+            self._next_id = last_event_id + 1
+            subscribers = list(self._subscribers)
+            self.published += len(frames)
+            self._new_event.notify_all()
+        
+        for _, frame in frames:
+            for subscription in subscribers:
+                self._offer(subscription, frame)
+    
+    def _offer(self, subscription, frame: bytes):
+        if isinstance(subscription, AsyncSubscription):
+            # asyncio queues may only be touched from their own loop
+            try:
+                subscription.loop.call_soon_threadsafe(self._offer_now, subscription.queue, frame)
+            except RuntimeError:
+                pass  # Loop already closed; the subscriber is going away
+        else:
+            self._offer_now(subscription, frame)
+    
+    def _offer_now(self, subscription, frame: bytes):
+        try:
+            subscription.put_nowait(frame)
+        except (queue.Full, asyncio.QueueFull):
+            # Drop the oldest frame; newer regional predictions supersede it anyway
+            try:
+                subscription.get_nowait()
+            except (queue.Empty, asyncio.QueueEmpty):
+                pass
+            self.dropped += 1
+            try:
+                subscription.put_nowait(frame)
+            except (queue.Full, asyncio.QueueFull):
+                pass
+    
+    def subscribe(self, last_event_id: int = None) -> queue.Queue:
+        return self._register(queue.Queue(maxsize=self.queue_size), last_event_id)
+    
+    def subscribe_async(self, last_event_id: int = None) -> AsyncSubscription:
+        """Subscribe from a coroutine; frames are delivered on the running event loop"""
+        return self._register(AsyncSubscription(asyncio.get_running_loop(), self.queue_size), last_event_id)
+    
+    def _register(self, subscription, last_event_id: int = None):
+        with self._lock:
+            if last_event_id is not None:
+                missed = [frame for event_id, frame in self._history if event_id > last_event_id]
+                for frame in missed[-self.queue_size:]:
+                    subscription.put_nowait(frame)
+            self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(subscription)
+    
+    def snapshot_frame(self) -> bytes:
+        return self.format_event('snapshot', dict(prediction_snapshots.current.predictions))
+    
+    def stream(self, subscription: queue.Queue, initial_frame: bytes = None):
+        """Generator of SSE bytes for one subscriber; unsubscribes when the client goes away"""
+        try:
+            # Ask browsers to wait 5 s before reconnecting
+            yield b"retry: 5000\n\n"
+            if initial_frame is not None:
+                yield initial_frame
+            while True:
+                try:
+                    yield subscription.get(timeout=self.keepalive_seconds)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield b": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+    
+    async def stream_async(self, subscription: AsyncSubscription, initial_frame: bytes = None):
+        """Async generator counterpart of stream() for an AsyncSubscription"""
+        try:
+            yield b"retry: 5000\n\n"
+            if initial_frame is not None:
+                yield initial_frame
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+    
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self.published,
+                'dropped_frames': self.dropped,
+                'last_event_id': self._next_id - 1
+            }
+
+# Push channel for real-time predictions (/api/ml/stream)
+prediction_broadcaster = PredictionBroadcaster()
+
+# Versioned real-time predictions for all regions (/api/ml/realtime)
+prediction_snapshots = SnapshotStore(int(os.environ.get('NEURONIX_CHANGE_LOG_SIZE', 512)))
+
 class RealTimePredictor:
     """Handles real-time predictions and updates"""
     
-    def __init__(self):
+    def __init__(self, spatial_map: str = 'none', snapshots: SnapshotStore = None,
+                 broadcaster: PredictionBroadcaster = None):
         self.is_running = False
         self.prediction_thread = None
+        self.snapshots = prediction_snapshots if snapshots is None else snapshots
+        self.broadcaster = prediction_broadcaster if broadcaster is None else broadcaster
+        # The dashboard only reads scalar scores, so regional maps are not stored by default
+        self.spatial_map = spatial_map
+        
+        # Every district, plus the extra regions that have their own base conditions
+        regions = list(fire_predictor.resource_optimizer.districts)
+        regions += [region for region in self.BASE_CONDITIONS if region not in regions]
+        self.scheduler = RiskAdaptiveScheduler(
+            regions,
+            min_interval=float(os.environ.get('NEURONIX_REFRESH_MIN_INTERVAL', 15)),
+            max_interval=float(os.environ.get('NEURONIX_REFRESH_MAX_INTERVAL', 300)),
+            budget_per_tick=int(os.environ.get('NEURONIX_REFRESH_BUDGET', 8)),
+            tick_seconds=float(os.environ.get('NEURONIX_REFRESH_TICK', 5)),
+            max_regions=max(MAX_REGIONS, len(regions))
+        )
+        self.ticker = FixedRateTicker(self.scheduler.tick_seconds)
+        
+        # Station feeds (NEURONIX_WEATHER_SOURCE); None keeps the synthetic weather
+        self.weather_ingestor = create_weather_ingestor()
+        
+        # Fixed-size risk history per region (default: 24 h at the minimum refresh interval)
+        self.history = RiskHistoryStore(capacity=int(os.environ.get('NEURONIX_HISTORY_CAPACITY', 5760)))
         
     def start_continuous_prediction(self):
         """Start continuous prediction updates"""
@@ -30,59 +408,295 @@ class RealTimePredictor:
             self.prediction_thread.daemon = True
             self.prediction_thread.start()
     
+    def add_region(self, region: str) -> bool:
+        """Start tracking a region, refreshed on the next tick; False if the region limit is reached"""
+        return self.scheduler.add_region(region)
+    
+    def remove_region(self, region: str) -> bool:
+        """Stop tracking a region and publish a tombstone for it"""
+        if not self.scheduler.remove_region(region):
+            return False
+        self.history.remove(region)
+        fire_predictor.forget_region(region)
+        self.snapshots.publish({}, removed=[region])
+        self.broadcaster.publish('removed', [region])
+        return True
+    
+    def query_history(self, region: str, hours: float = 24.0, buckets: int = None, columns: list = None):
+        """Risk history of a tracked region (RiskHistoryStore.query), None if it has none"""
+        return self.history.query(region, hours=hours, buckets=buckets, columns=columns)
+    
+    def get_stats(self) -> dict:
+        return {
+            'active': self.is_running,
+            'history': self.history.get_stats(),
+            'weather_ingestion': self.weather_ingestor.get_stats() if self.weather_ingestor is not None else None,
+            'scheduler': self.scheduler.get_stats(),
+            'ticks': self.ticker.get_stats()
+        }
+    
+    def changes(self, epoch: str, version: int, last_event_id: int, timeout: float) -> dict:
+        """Snapshot changes and stream frames a RealTimeFollower lacks, waiting up to timeout for new ones"""
+        if epoch == self.snapshots.epoch:
+            self.broadcaster.wait(last_event_id, timeout)
+            # Frames first: a frame is only published after its snapshot
+            frames = self.broadcaster.frames_after(last_event_id)
+            last_event_id = frames[-1][0] if frames else last_event_id
+        else:
+            frames, last_event_id = [], self.broadcaster.last_event_id
+        change = self.snapshots.changes_since(epoch, version)
+        change['frames'], change['last_event_id'] = frames, last_event_id
+        return change
+    
     def _prediction_loop(self):
         """Main prediction loop running in background"""
-        regions = ['Nainital', 'Almora', 'Dehradun', 'Haridwar', 'Rishikesh']
-        
         while self.is_running:
+            tick_start = self.ticker.wait()
+            # Regions due for a refresh, capped by the per-tick compute budget
+            regions = self.scheduler.next_batch(tick_start)
+            
             try:
-                for region in regions:
-                    # Simulate environmental data for each region
-                    env_data = self._generate_regional_data(region)
+                if regions:
+                    # Simulate environmental data for all due regions in one go
+                    region_env = self._generate_regional_batch(regions)
+                    if self.weather_ingestor is not None:
+                        # Overlay station observations; regions without one keep the simulated values
+                        for region, observation in self.weather_ingestor.fetch(regions).items():
+                            region_env[region].update(observation)
                     
-                    # Get ML predictions
-                    predictions = get_model_predictions(env_data)
+                    # One batched model call for all regions; per-region post-processing is fanned out
+                    regional_predictions = get_regional_predictions(region_env, spatial_map=self.spatial_map)
                     
-                    # Store predictions
-                    current_predictions[region] = {
-                        'prediction': predictions,
-                        'timestamp': datetime.now().isoformat(),
-                        'environmental_data': env_data
-                    }
-                
-                # Update every 30 seconds
-                time.sleep(30)
+                    updates = {}
+                    for region, predictions in regional_predictions.items():
+                        # Regions removed while their refresh was in flight are dropped, with the state it created
+                        if not self.scheduler.complete(region, predictions['ensemble_risk_score'], tick_start):
+                            fire_predictor.forget_region(region)
+                            continue
+                        self.history.record(region, predictions['ensemble_risk_score'], region_env[region])
+                        # Store predictions
+                        updates[region] = {
+                            'prediction': predictions,
+                            'timestamp': datetime.now().isoformat(),
+                            'environmental_data': region_env[region]
+                        }
+                    
+                    # Publish a new immutable version for readers
+                    self.snapshots.publish(updates)
+                    
+                    # Push only the refreshed regions, serialized once for all subscribers
+                    self.broadcaster.publish('predictions', updates)
                 
             except Exception as e:
                 print(f"Error in prediction loop: {e}")
-                time.sleep(10)
-    
-    def _generate_regional_data(self, region: str) -> dict:
-        """Generate realistic environmental data for a region"""
-        base_conditions = {
-            'Nainital': {'temp_base': 28, 'humidity_base': 45, 'wind_base': 18},
-            'Almora': {'temp_base': 26, 'humidity_base': 50, 'wind_base': 15},
-            'Dehradun': {'temp_base': 30, 'humidity_base': 55, 'wind_base': 12},
-            'Haridwar': {'temp_base': 32, 'humidity_base': 60, 'wind_base': 10},
-            'Rishikesh': {'temp_base': 29, 'humidity_base': 52, 'wind_base': 14}
-        }
-        
-        base = base_conditions.get(region, {'temp_base': 28, 'humidity_base': 50, 'wind_base': 15})
+                self.ticker.record_error(e)
+                self.scheduler.retry(regions)
+            
+            self.ticker.complete(tick_start)
+    
+    BASE_CONDITIONS = {
+        'Nainital': {'temp_base': 28, 'humidity_base': 45, 'wind_base': 18},
+        'Almora': {'temp_base': 26, 'humidity_base': 50, 'wind_base': 15},
+        'Dehradun': {'temp_base': 30, 'humidity_base': 55, 'wind_base': 12},
+        'Haridwar': {'temp_base': 32, 'humidity_base': 60, 'wind_base': 10},
+        'Rishikesh': {'temp_base': 29, 'humidity_base': 52, 'wind_base': 14},
+        'Pithoragarh': {'temp_base': 24, 'humidity_base': 55, 'wind_base': 14},
+        'Chamoli': {'temp_base': 22, 'humidity_base': 58, 'wind_base': 16},
+        'Rudraprayag': {'temp_base': 25, 'humidity_base': 55, 'wind_base': 13},
+        'Tehri': {'temp_base': 26, 'humidity_base': 52, 'wind_base': 14},
+        'Pauri': {'temp_base': 27, 'humidity_base': 50, 'wind_base': 14},
+        'Uttarkashi': {'temp_base': 21, 'humidity_base': 60, 'wind_base': 15},
+        'Bageshwar': {'temp_base': 24, 'humidity_base': 55, 'wind_base': 13},
+        'Champawat': {'temp_base': 26, 'humidity_base': 52, 'wind_base': 14},
+        'Udham Singh Nagar': {'temp_base': 33, 'humidity_base': 58, 'wind_base': 10}
+    }
+    
+    DEFAULT_CONDITIONS = {'temp_base': 28, 'humidity_base': 50, 'wind_base': 15}
+    
+    def _generate_regional_batch(self, regions: list) -> dict:
+        """Generate realistic environmental data for all regions at once"""
+        count = len(regions)
+        bases = [self.BASE_CONDITIONS.get(region, self.DEFAULT_CONDITIONS) for region in regions]
+        temp_base = np.array([b['temp_base'] for b in bases], dtype=float)
+        humidity_base = np.array([b['humidity_base'] for b in bases], dtype=float)
+        wind_base = np.array([b['wind_base'] for b in bases], dtype=float)
+        
+        # Add realistic variations, one vectorized draw per variable
+        temperature = np.maximum(15, temp_base + np.random.normal(0, 3, count))
+        humidity = np.clip(humidity_base + np.random.normal(0, 8, count), 20, 80)
+        wind_speed = np.maximum(5, wind_base + np.random.normal(0, 5, count))
+        wind_direction = np.random.choice(['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW'], count)
+        ndvi = np.clip(0.6 + np.random.normal(0, 0.1, count), 0.2, 0.9)
+        elevation = 1500 + np.random.normal(0, 300, count)
+        slope = np.clip(15 + np.random.normal(0, 8, count), 0, 45)
+        vegetation_density = np.random.choice(['moderate', 'dense', 'sparse'], count, p=[0.5, 0.3, 0.2])
         
-        # Add realistic variations
         return {
-            'temperature': max(15, base['temp_base'] + np.random.normal(0, 3)),
-            'humidity': max(20, min(80, base['humidity_base'] + np.random.normal(0, 8))),
-            'wind_speed': max(5, base['wind_base'] + np.random.normal(0, 5)),
-            'wind_direction': np.random.choice(['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']),
-            'ndvi': max(0.2, min(0.9, 0.6 + np.random.normal(0, 0.1))),
-            'elevation': 1500 + np.random.normal(0, 300),
-            'slope': max(0, min(45, 15 + np.random.normal(0, 8))),
-            'vegetation_density': np.random.choice(['moderate', 'dense', 'sparse'], p=[0.5, 0.3, 0.2])
+            region: {
+                'temperature': float(temperature[i]),
+                'humidity': float(humidity[i]),
+                'wind_speed': float(wind_speed[i]),
+                'wind_direction': str(wind_direction[i]),
+                'ndvi': float(ndvi[i]),
+                'elevation': float(elevation[i]),
+                'slope': float(slope[i]),
+                'vegetation_density': str(vegetation_density[i])
+            }
+            for i, region in enumerate(regions)
         }
 
-# Initialize real-time predictor
-real_time_predictor = RealTimePredictor()
+class RealTimeFollower:
+    """Mirrors the one RealTimePredictor that serve.py runs for all its workers
+    
+    A thread long-polls the predictor process and installs its snapshots and
+    stream frames here unchanged, so every worker answers with the same
+    versions, ETags, ?since= deltas and event ids. Region changes, history and
+    stats are forwarded to the predictor process.
+    """
+    
+    def __init__(self, leader: realtime_server.RealTimeClient, snapshots: SnapshotStore = None,
+                 broadcaster: PredictionBroadcaster = None, poll_seconds: float = 15.0):
+        self.leader = leader
+        self.snapshots = prediction_snapshots if snapshots is None else snapshots
+        self.broadcaster = prediction_broadcaster if broadcaster is None else broadcaster
+        self.poll_seconds = poll_seconds
+        self.follow_thread = None
+        self._lock = threading.Lock()
+    
+    def start_following(self):
+        """Keep this process's snapshots and stream in step with the predictor process"""
+        with self._lock:
+            if self.follow_thread is None:
+                self.follow_thread = threading.Thread(target=self._follow_loop, daemon=True)
+                self.follow_thread.start()
+    
+    def start_continuous_prediction(self):
+        self.leader.start_continuous_prediction()
+        self.start_following()
+    
+    def sync(self, timeout: float = 0.0):
+        """Install what the predictor published since the last sync, waiting up to timeout for news"""
+        current = self.snapshots.current
+        change = self.leader.changes(current.epoch, current.version, self.broadcaster.last_event_id, timeout)
+        if change['full'] or change['version'] != current.version:
+            self.snapshots.apply(change)
+        if change['full'] or change['frames']:
+            self.broadcaster.relay(change['frames'], change['last_event_id'], reset=change['full'])
+    
+    def _follow_loop(self):
+        failing = False
+        while True:
+            try:
+                self.sync(self.poll_seconds)
+                failing = False
+            except Exception as e:
+                # E.g. the predictor process is still loading its model or restarting;
+                # keep serving the last snapshot meanwhile
+                if not failing:
+                    print(f"Lost the real-time predictor, retrying: {e!r}")
+                failing = True
+                time.sleep(1.0)
+    
+    def add_region(self, region: str) -> bool:
+        return self.leader.add_region(region)
+    
+    def remove_region(self, region: str) -> bool:
+        return self.leader.remove_region(region)
+    
+    def query_history(self, region: str, hours: float = 24.0, buckets: int = None, columns: list = None):
+        return self.leader.query_history(region, hours, buckets, columns)
+    
+    def get_stats(self) -> dict:
+        try:
+            return self.leader.get_stats()
+        except Exception as e:
+            return {'active': False, 'error': str(e), 'history': None, 'weather_ingestion': None,
+                    'scheduler': None, 'ticks': None}
+
+# Under serve.py one process runs the predictor and every worker follows it (realtime_server.py)
+realtime_leader = realtime_server.client()
+real_time_predictor = RealTimePredictor() if realtime_leader is None else RealTimeFollower(realtime_leader)
+
+# Shared secret for administrative routes; unset disables them
+ADMIN_TOKEN = os.environ.get('NEURONIX_ADMIN_TOKEN', '')
+
+def require_admin_token(view):
+    """Allow a view only for requests bearing NEURONIX_ADMIN_TOKEN as 'Authorization: Bearer <token>'"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({'success': False, 'error': 'Administrative routes are disabled, set NEURONIX_ADMIN_TOKEN'}), 403
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+            return jsonify({'success': False, 'error': 'Invalid or missing admin token'}), 401
+        return view(*args, **kwargs)
+    
+    return wrapper
+
+# Response caches of the memoized analytical routes, by endpoint
+response_caches = {}
+
+def cached_response(max_size: int = None, ttl_seconds: float = None):
+    """Memoize a deterministic route on its canonicalized JSON body
+    
+    Successful responses are stored as encoded bytes in a TTLLRUCache keyed on
+    the method, path, query string, the JSON body with sorted keys and the
+    model generation, so a repeat call skips the view entirely. A top-level
+    'timestamp' is left out of the stored body and stamped anew on every
+    response. GET and HEAD responses carry an ETag and Cache-Control, and a
+    matching If-None-Match gets an empty 304; browsers and proxies never reuse
+    POST responses, so those get neither.
+    """
+    max_size = int(os.environ.get('NEURONIX_RESPONSE_CACHE_SIZE', 256)) if max_size is None else max_size
+    ttl_seconds = float(os.environ.get('NEURONIX_RESPONSE_CACHE_TTL', 600)) if ttl_seconds is None else ttl_seconds
+    
+    def decorator(view):
+        cache = response_caches[view.__name__] = TTLLRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            body = json_encoding.dumps(request.get_json(silent=True), sort_keys=True)
+            generation = str(fire_predictor.model_generation).encode('utf-8')
+            target = f"{request.method} {request.path}?".encode('utf-8') + request.query_string
+            key = hashlib.sha256(target + b'\0' + body + b'\0' + generation).hexdigest()
+            
+            cached = cache.get(key)
+            status = 'HIT'
+            if cached is None:
+                status = 'MISS'
+                response = app.make_response(view(*args, **kwargs))
+                # Errors are not cached, so a retry recomputes
+                if response.status_code != 200:
+                    return response
+                payload = response.get_json(silent=True)
+                stamped = isinstance(payload, dict) and 'timestamp' in payload
+                if stamped:
+                    del payload['timestamp']
+                    data = json_encoding.dumps(payload)
+                else:
+                    data = response.get_data()
+                # The ETag covers the stored body, so a fresh timestamp does not change it
+                cached = (data, hashlib.sha256(data).hexdigest()[:32], stamped)
+                cache.put(key, cached)
+            
+            data, etag, stamped = cached
+            validated = request.method in ('GET', 'HEAD')
+            if validated and etag in request.if_none_match:
+                response = Response(status=304)
+            else:
+                if stamped:
+                    data = (data[:-1] + (b',' if len(data) > 2 else b'') + b'"timestamp":' +
+                            json_encoding.dumps(datetime.now().isoformat()) + b'}')
+                response = Response(data, mimetype='application/json')
+            if validated:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = f"private, max-age={int(ttl_seconds)}"
+            response.headers['X-Cache'] = status
+            return response
+        
+        return wrapper
+    
+    return decorator
 
 @app.route('/api/ml/predict', methods=['POST'])
 def predict_fire_risk():
@@ -102,8 +716,28 @@ def predict_fire_risk():
             'vegetation_density': data.get('vegetation_density', 'moderate')
         }
         
-        # Get ML predictions
-        predictions = get_model_predictions(env_data)
+        # Spatial risk map format: 'full', 'none', 'downsample[:N]' or 'base64[:float16|uint8]'
+        spatial_map = data.get('spatial_map', 'full')
+        try:
+            # Rejected before inference rather than after the forward pass
+            parse_spatial_map(spatial_map, fire_predictor.convlstm_model.input_shape[:2])
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # Optional seed for the synthetic spatial input
+        seed = data.get('seed')
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+            return jsonify({'success': False, 'error': 'seed must be a non-negative integer'}), 400
+        
+        # Optional MC dropout passes for a model-uncertainty confidence interval
+        mc_samples = data.get('mc_samples', 0)
+        if isinstance(mc_samples, bool) or not isinstance(mc_samples, int):
+            return jsonify({'success': False, 'error': 'mc_samples must be an integer'}), 400
+        mc_samples = max(0, min(mc_samples, MAX_MC_SAMPLES))
+        
+        # Get ML predictions (cached on quantized inputs and the spatial input seed, except with MC dropout)
+        predictions = get_model_predictions(env_data, spatial_map=spatial_map, seed=seed,
+                                            mc_samples=mc_samples)
         
         return jsonify({
             'success': True,
@@ -156,26 +790,122 @@ def simulate_fire():
             'error': str(e)
         }), 500
 
+# Bounds on background simulation size
+MAX_SIMULATION_GRID = 300
+MAX_SIMULATION_HOURS = 72
+MAX_ENSEMBLE_SIZE = 16
+
+@app.route('/api/ml/simulate/jobs', methods=['POST'])
+def submit_simulation_job():
+    """Queue a fire spread simulation and return its job id immediately"""
+    try:
+        data = request.get_json() or {}
+        
+        lat = data.get('lat', 30.0)
+        lng = data.get('lng', 79.0)
+        grid_size = min(max(int(data.get('grid_size', 100)), 10), MAX_SIMULATION_GRID)
+        duration = min(max(int(data.get('duration', 6)), 1), MAX_SIMULATION_HOURS)
+        ensemble_size = min(max(int(data.get('ensemble_size', 1)), 1), MAX_ENSEMBLE_SIZE)
+        
+        env_data = {
+            'temperature': data.get('temperature', 30),
+            'humidity': data.get('humidity', 50),
+            'wind_speed': data.get('wind_speed', 15),
+            'wind_direction': data.get('wind_direction', 'NE')
+        }
+        
+        job = simulation_jobs.submit({
+            'coordinates': [lat, lng],
+            'ignition_point': ignition_cell(lat, lng, grid_size),
+            'grid_size': grid_size,
+            'duration_hours': duration,
+            'ensemble_size': ensemble_size,
+            'environmental_data': env_data
+        })
+        
+        response = jsonify({'success': True, 'job': job.to_dict()})
+        response.status_code = 202
+        response.headers['Location'] = f"/api/ml/simulate/jobs/{job.job_id}"
+        return response
+        
+    except JobQueueFull as e:
+        response = jsonify({'success': False, 'error': str(e), 'queue': simulation_jobs.get_stats()})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/simulate/jobs', methods=['GET'])
+def list_simulation_jobs():
+    """List retained simulation jobs and the queue depth"""
+    return jsonify({
+        'success': True,
+        'jobs': [job.to_dict() for job in simulation_jobs.list_jobs()],
+        'queue': simulation_jobs.get_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/ml/simulate/jobs/<job_id>', methods=['GET'])
+def get_simulation_job(job_id):
+    """Status and progress of a simulation job"""
+    job = simulation_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+@app.route('/api/ml/simulate/jobs/<job_id>/result', methods=['GET'])
+def get_simulation_job_result(job_id):
+    """Result of a completed simulation job, shaped like /api/ml/simulate"""
+    job = simulation_jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'}), 404
+    if job.status != 'completed':
+        return jsonify({'success': False, 'error': f'Job is {job.status}', 'job': job.to_dict()}), 409
+    
+    params = job.params
+    return jsonify({
+        'success': True,
+        'simulation': job.result,
+        'parameters': {
+            'coordinates': params['coordinates'],
+            'duration_hours': params['duration_hours'],
+            'environmental_data': params['environmental_data'],
+            'grid_size': params['grid_size'],
+            'ensemble_size': params['ensemble_size']
+        },
+        'timestamp': datetime.fromtimestamp(job.finished_at).isoformat()
+    })
+
+@app.route('/api/ml/simulate/jobs/<job_id>', methods=['DELETE'])
+def cancel_simulation_job(job_id):
+    """Cancel a queued or running simulation job"""
+    job = simulation_jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
 @app.route('/api/ml/realtime', methods=['GET'])
 def get_realtime_predictions():
     """Get real-time predictions for all regions"""
     try:
+        snapshot = prediction_snapshots.current
         region = request.args.get('region', 'all')
+        if region != 'all' and region not in snapshot.predictions:
+            return jsonify({'success': False, 'error': f'No prediction for region: {region}'}), 404
         
-        if region == 'all':
-            return jsonify({
-                'success': True,
-                'predictions': current_predictions,
-                'timestamp': datetime.now().isoformat()
-            })
+        # Unchanged since the client's last poll: no body at all
+        if snapshot.etag in request.if_none_match:
+            response = Response(status=304)
         else:
-            region_data = current_predictions.get(region, {})
-            return jsonify({
-                'success': True,
-                'prediction': region_data,
-                'region': region,
-                'timestamp': datetime.now().isoformat()
-            })
+            body = realtime_body(snapshot, region, request.args.get('since', type=int), request.args.get('epoch'))
+            response = Response(body, mimetype='application/json')
+        response.set_etag(snapshot.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
             
     except Exception as e:
         return jsonify({
@@ -183,6 +913,46 @@ def get_realtime_predictions():
             'error': str(e)
         }), 500
 
+@app.route('/api/ml/history/<region>', methods=['GET'])
+def get_region_history(region):
+    """Risk history for a region over the last N hours, optionally downsampled"""
+    try:
+        hours = min(max(request.args.get('hours', 24, type=float), 0), 24 * 30)
+        buckets = request.args.get('buckets', type=int)
+        columns = request.args.get('columns')
+        
+        history = real_time_predictor.query_history(
+            region, hours=hours, buckets=max(1, min(buckets, 10000)) if buckets else None,
+            columns=columns.split(',') if columns else None
+        )
+        if history is None:
+            return jsonify({'success': False, 'error': f'No history for region: {region}'}), 404
+        
+        return jsonify({'success': True, 'history': history})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/stream', methods=['GET'])
+def stream_predictions():
+    """Server-Sent Events stream of real-time regional predictions"""
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    # Subscribe before taking the snapshot so no update falls in between
+    subscription = prediction_broadcaster.subscribe(last_event_id)
+    
+    # New clients start from the current state; reconnecting clients replay what they missed
+    snapshot = prediction_broadcaster.snapshot_frame() if last_event_id is None else None
+    
+    return Response(
+        stream_with_context(prediction_broadcaster.stream(subscription, snapshot)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/ml/ndvi', methods=['POST'])
 def analyze_ndvi():
     """Analyze NDVI data and detect burned areas"""
@@ -295,6 +1065,7 @@ def optimize_resources():
         }), 500
 
 @app.route('/api/ml/carbon-emissions', methods=['POST'])
+@cached_response()
 def calculate_carbon_emissions():
     """Calculate CO2 emissions from forest fire"""
     try:
@@ -320,6 +1091,7 @@ def calculate_carbon_emissions():
         }), 500
 
 @app.route('/api/ml/environmental-impact', methods=['POST'])
+@cached_response()
 def predict_environmental_impact():
     """Predict long-term environmental and ecological impact"""
     try:
@@ -528,6 +1300,7 @@ def predict_fire_impact():
         }), 500
 
 @app.route('/api/ml/explain3D', methods=['POST'])
+@cached_response()
 def explain_3d_fire():
     """Generate explanations for 3D fire behavior"""
     try:
@@ -639,29 +1412,36 @@ def generate_elevation_data(lat, lng, spread_factor):
 def generate_terrain_data(lat, lng):
     """Generate 3D terrain mesh data"""
     grid_size = 50
-    terrain_data = []
-    
-    for i in range(grid_size):
-        row = []
-        for j in range(grid_size):
-            # Generate realistic height values
-            x = (i - grid_size/2) * 0.1
-            z = (j - grid_size/2) * 0.1
-            
-            height = (
-                np.sin(x * 0.3) * np.cos(z * 0.3) * 5 +
-                np.sin(x * 0.1) * np.cos(z * 0.1) * 15 +
-                np.random.normal(0, 2)
-            )
-            
-            row.append({
-                'x': x,
-                'y': max(0, height),
-                'z': z,
-                'vegetation_type': 'forest' if height > 5 else 'grassland',
-                'fuel_load': np.random.uniform(2, 8)
-            })
-        terrain_data.append(row)
+    
+    # Whole grid at once: x varies along rows, z along columns
+    coords = (np.arange(grid_size) - grid_size / 2) * 0.1
+    x, z = np.meshgrid(coords, coords, indexing='ij')
+    
+    # Generate realistic height values
+    height = (
+        np.sin(x * 0.3) * np.cos(z * 0.3) * 5 +
+        np.sin(x * 0.1) * np.cos(z * 0.1) * 15 +
+        np.random.normal(0, 2, (grid_size, grid_size))
+    )
+    fuel_load = np.random.uniform(2, 8, (grid_size, grid_size))
+    
+    # One conversion per column instead of per cell
+    xs, ys, zs = x.tolist(), np.maximum(height, 0).tolist(), z.tolist()
+    forest = (height > 5).tolist()
+    fuel = fuel_load.tolist()
+    terrain_data = [
+        [
+            {
+                'x': xs[i][j],
+                'y': ys[i][j],
+                'z': zs[i][j],
+                'vegetation_type': 'forest' if forest[i][j] else 'grassland',
+                'fuel_load': fuel[i][j]
+            }
+            for j in range(grid_size)
+        ]
+        for i in range(grid_size)
+    ]
     
     return {
         'grid_data': terrain_data,
@@ -714,6 +1494,7 @@ def generate_burn_polygons(center_lat, center_lng, burned_area):
     return polygons
 
 @app.route('/api/ml/explain', methods=['POST'])
+@cached_response()
 def explain_fire_behavior():
     """API endpoint for AI explainability - explains why fire spreads in certain patterns"""
     try:
@@ -726,27 +1507,19 @@ def explain_fire_behavior():
         slope = data.get('slope', 15)
         temperature = data.get('temperature', 30)
         
-        # Calculate factor weights using realistic fire behavior models
-        wind_weight = min(60, wind_speed * 2.5)
-        dryness_weight = min(50, (100 - humidity) * 0.7)
-        slope_weight = min(30, slope * 1.8)
-        temp_weight = min(25, max(0, (temperature - 20) * 0.8))
-        
-        total_weight = wind_weight + dryness_weight + slope_weight + temp_weight
-        
-        # Normalize to percentages
-        factor_weights = {
-            'wind': round((wind_weight / total_weight) * 100, 1),
-            'dryness': round((dryness_weight / total_weight) * 100, 1),
-            'slope': round((slope_weight / total_weight) * 100, 1),
-            'temperature': round((temp_weight / total_weight) * 100, 1)
-        }
-        
-        # Calculate confidence score
-        confidence_score = min(95, max(65, 85 + (total_weight - 120) * 0.12))
+        # Factor weights, risk factors and FWI come from the shared prediction pipeline stages
+        factor_analysis = explain_fire_factors({
+            'wind_speed': wind_speed,
+            'wind_direction': wind_direction,
+            'humidity': humidity,
+            'slope': slope,
+            'temperature': temperature
+        })
+        factor_weights = factor_analysis['factor_weights']
+        confidence_score = factor_analysis['confidence_score']
         
         # Generate plain language explanation
-        dominant_factor = max(factor_weights.items(), key=lambda x: x[1])
+        dominant_factor = (factor_analysis['dominant_factor'], factor_weights[factor_analysis['dominant_factor']])
         
         direction_map = {
             'N': 'north', 'NE': 'northeast', 'E': 'east', 'SE': 'southeast',
@@ -791,6 +1564,8 @@ def explain_fire_behavior():
                 'temperature': temperature
             },
             'dominant_factor': dominant_factor[0],
+            'risk_factors': factor_analysis['risk_factors'],
+            'fire_weather_index': factor_analysis['fire_weather_index'],
             'timestamp': datetime.now().isoformat()
         })
         
@@ -801,6 +1576,7 @@ def explain_fire_behavior():
         }), 500
 
 @app.route('/api/ml/whatif', methods=['POST'])
+@cached_response()
 def whatif_simulation():
     """API endpoint for What-If scenario testing"""
     try:
@@ -819,7 +1595,7 @@ def whatif_simulation():
         baseline_conditions = data.get('baseline', {
             'wind_speed': 22,
             'wind_direction': 'NE',
-            'humidity': 28,
+            'humidity': 32,
             'slope': 15,
             'temperature': 34
         })
@@ -1028,84 +1804,42 @@ def generate_replay_data(hour, base_conditions):
         'metrics': event['metrics']
     }
 
-@app.route('/api/ml/explain', methods=['POST'])
-def explain_fire_behavior():
-    """API endpoint for AI explainability - explains why fire spreads in certain patterns"""
+@app.route('/api/ml/recovery/generate-plan', methods=['POST'])
+@cached_response()
+def generate_recovery_plan():
+    """Generate post-fire recovery and reforestation plan"""
     try:
         data = request.get_json()
         
-        # Extract environmental conditions
-        wind_speed = data.get('wind_speed', 15)
-        wind_direction = data.get('wind_direction', 'NE')
-        humidity = data.get('humidity', 50)
-        slope = data.get('slope', 15)
-        temperature = data.get('temperature', 30)
-        
-        # Calculate factor weights using realistic fire behavior models
-        wind_weight = min(60, wind_speed * 2.5)
-        dryness_weight = min(50, (100 - humidity) * 0.7)
-        slope_weight = min(30, slope * 1.8)
-        temp_weight = min(25, max(0, (temperature - 20) * 0.8))
-        
-        total_weight = wind_weight + dryness_weight + slope_weight + temp_weight
-        
-        # Normalize to percentages
-        factor_weights = {
-            'wind': round((wind_weight / total_weight) * 100, 1),
-            'dryness': round((dryness_weight / total_weight) * 100, 1),
-            'slope': round((slope_weight / total_weight) * 100, 1),
-            'temperature': round((temp_weight / total_weight) * 100, 1)
-        }
-        
-        # Calculate confidence score
-        confidence_score = min(95, max(65, 85 + (total_weight - 120) * 0.12))
-        
-        # Generate plain language explanation
-        dominant_factor = max(factor_weights.items(), key=lambda x: x[1])
-        
-        direction_map = {
-            'N': 'north', 'NE': 'northeast', 'E': 'east', 'SE': 'southeast',
-            'S': 'south', 'SW': 'southwest', 'W': 'west', 'NW': 'northwest'
-        }
-        
-        direction = direction_map.get(wind_direction, 'northeast')
+        burned_area = data.get('burned_area_hectares', 150)
+        vegetation_type = data.get('vegetation_type', 'native-mix')
+        soil_condition = data.get('soil_condition', 'moderate_damage')
+        climate_zone = data.get('climate_zone', 'temperate_himalayan')
         
-        explanation = f"Fire is moving {direction} due to "
+        # Generate species recommendations
+        species_recommendations = generate_species_recommendations(vegetation_type, climate_zone)
         
-        factors = []
-        if wind_speed > 15:
-            factors.append(f"{wind_speed} km/h winds")
-        if humidity < 40:
-            factors.append(f"dry vegetation ({humidity}% humidity)")
-        if slope > 10:
-            factors.append(f"{slope}° upward slope")
-        if temperature > 30:
-            factors.append(f"high temperature ({temperature}°C)")
+        # Calculate priority zones
+        priority_zones = calculate_recovery_priority_zones(burned_area, soil_condition)
         
-        explanation += ", ".join(factors) + ". "
+        # Generate timeline
+        recovery_timeline = generate_recovery_timeline(burned_area, vegetation_type)
         
-        if dominant_factor[0] == 'wind':
-            explanation += "Wind is the dominant factor driving rapid spread."
-        elif dominant_factor[0] == 'dryness':
-            explanation += "Vegetation dryness is the primary concern for fire intensity."
-        elif dominant_factor[0] == 'slope':
-            explanation += "Terrain slope is significantly affecting uphill fire movement."
-        else:
-            explanation += "Temperature is contributing to increased fire behavior."
+        # Calculate sustainability metrics
+        sustainability_metrics = calculate_post_fire_sustainability(burned_area, vegetation_type)
         
         return jsonify({
             'success': True,
-            'confidence_score': confidence_score,
-            'factor_weights': factor_weights,
-            'explanation': explanation,
-            'environmental_conditions': {
-                'wind_speed': wind_speed,
-                'wind_direction': wind_direction,
-                'humidity': humidity,
-                'slope': slope,
-                'temperature': temperature
+            'recovery_plan': {
+                'burned_area_hectares': burned_area,
+                'vegetation_type': vegetation_type,
+                'species_recommendations': species_recommendations,
+                'priority_zones': priority_zones,
+                'recovery_timeline': recovery_timeline,
+                'sustainability_metrics': sustainability_metrics,
+                'planting_schedule': generate_planting_schedule(burned_area),
+                'maintenance_plan': generate_maintenance_plan(vegetation_type)
             },
-            'dominant_factor': dominant_factor[0],
             'timestamp': datetime.now().isoformat()
         })
         
@@ -1115,281 +1849,10 @@ def explain_fire_behavior():
             'error': str(e)
         }), 500
 
-@app.route('/api/ml/whatif', methods=['POST'])
-def whatif_simulation():
-    """API endpoint for What-If scenario testing"""
-    try:
-        data = request.get_json()
-        
-        # Extract modified conditions
-        modified_conditions = {
-            'wind_speed': data.get('wind_speed', 15),
-            'wind_direction': data.get('wind_direction', 'NE'),
-            'humidity': data.get('humidity', 50),
-            'slope': data.get('slope', 15),
-            'temperature': data.get('temperature', 30)
-        }
-        
-        # Get baseline conditions
-        baseline_conditions = data.get('baseline', {
-            'wind_speed': 22,
-            'wind_direction': 'NE',
-            'humidity': 32,
-            'slope': 15,
-            'temperature': 34
-        })
-        
-        # Calculate fire behavior differences
-        baseline_spread_rate = calculate_spread_rate(baseline_conditions)
-        modified_spread_rate = calculate_spread_rate(modified_conditions)
-        
-        # Generate ghost trail coordinates (simplified)
-        ghost_trail_coords = generate_ghost_trail(modified_conditions)
-        
-        # Calculate scenario comparison metrics
-        spread_rate_change = ((modified_spread_rate - baseline_spread_rate) / baseline_spread_rate) * 100
-        burn_area_change = spread_rate_change * 1.5  # Simplified relationship
-        
-        comparison_metrics = {
-            'spread_rate': {
-                'baseline': round(baseline_spread_rate, 2),
-                'modified': round(modified_spread_rate, 2),
-                'change_percent': round(spread_rate_change, 1)
-            },
-            'burn_area_6h': {
-                'baseline': round(baseline_spread_rate * 6 * 10, 0),  # hectares
-                'modified': round(modified_spread_rate * 6 * 10, 0),
-                'change_percent': round(burn_area_change, 1)
-            },
-            'direction': {
-                'baseline': baseline_conditions['wind_direction'],
-                'modified': modified_conditions['wind_direction'],
-                'changed': baseline_conditions['wind_direction'] != modified_conditions['wind_direction']
-            }
-        }
-        
-        return jsonify({
-            'success': True,
-            'ghost_trail_coordinates': ghost_trail_coords,
-            'comparison_metrics': comparison_metrics,
-            'modified_conditions': modified_conditions,
-            'baseline_conditions': baseline_conditions,
-            'impact_summary': generate_impact_summary(comparison_metrics),
-            'timestamp': datetime.now().isoformat()
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@app.route('/api/ml/replay-explanation', methods=['POST'])
-def replay_explanation():
-    """API endpoint for step-by-step fire spread explanation"""
-    try:
-        data = request.get_json()
-        
-        hour = data.get('hour', 0)
-        base_conditions = data.get('conditions', {})
-        
-        # Generate hour-specific explanations and conditions
-        replay_data = generate_replay_data(hour, base_conditions)
-        
-        return jsonify({
-            'success': True,
-            'hour': hour,
-            'explanation': replay_data['explanation'],
-            'conditions': replay_data['conditions'],
-            'factor_changes': replay_data['factor_changes'],
-            'fire_behavior_metrics': replay_data['metrics'],
-            'timestamp': datetime.now().isoformat()
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-def calculate_spread_rate(conditions):
-    """Calculate fire spread rate based on environmental conditions"""
-    wind_factor = conditions['wind_speed'] / 30  # Normalized to 0-1
-    humidity_factor = (100 - conditions['humidity']) / 100
-    slope_factor = conditions['slope'] / 45
-    temp_factor = max(0, (conditions['temperature'] - 20) / 25)
-    
-    # Base spread rate (km/h)
-    base_rate = 1.5
-    
-    # Apply multipliers
-    spread_rate = base_rate * (1 + wind_factor * 1.5 + humidity_factor * 0.8 + slope_factor * 0.6 + temp_factor * 0.4)
-    
-    return min(8.0, spread_rate)  # Cap at 8 km/h
-
-def generate_ghost_trail(conditions):
-    """Generate coordinates for ghost fire trail visualization"""
-    # Simplified ghost trail generation
-    base_lat, base_lng = 30.0668, 79.0193
-    
-    # Calculate spread direction based on wind
-    direction_offsets = {
-        'N': (0.01, 0), 'NE': (0.007, 0.007), 'E': (0, 0.01),
-        'SE': (-0.007, 0.007), 'S': (-0.01, 0), 'SW': (-0.007, -0.007),
-        'W': (0, -0.01), 'NW': (0.007, -0.007)
-    }
-    
-    lat_offset, lng_offset = direction_offsets.get(conditions['wind_direction'], (0.007, 0.007))
-    
-    # Scale by wind speed and other factors
-    wind_multiplier = conditions['wind_speed'] / 20
-    lat_offset *= wind_multiplier
-    lng_offset *= wind_multiplier
-    
-    trail_coords = []
-    for i in range(6):  # 6 hour progression
-        progress = (i + 1) / 6
-        trail_coords.append({
-            'lat': base_lat + lat_offset * progress,
-            'lng': base_lng + lng_offset * progress,
-            'hour': i + 1,
-            'intensity': min(100, 30 + i * 12)
-        })
-    
-    return trail_coords
-
-def generate_impact_summary(metrics):
-    """Generate human-readable impact summary"""
-    spread_change = metrics['spread_rate']['change_percent']
-    area_change = metrics['burn_area_6h']['change_percent']
-    
-    if spread_change < -10:
-        impact = "Significant improvement: fire spread would be much slower"
-    elif spread_change < -5:
-        impact = "Moderate improvement: fire spread would be reduced"
-    elif spread_change < 5:
-        impact = "Minimal change: fire behavior would be similar"
-    elif spread_change < 15:
-        impact = "Moderate worsening: fire would spread faster"
-    else:
-        impact = "Significant worsening: fire would spread much faster"
-    
-    return impact
-
-def generate_replay_data(hour, base_conditions):
-    """Generate realistic replay data for each hour"""
-    
-    # Hour-specific events and conditions
-    events = [
-        {
-            'explanation': "Fire ignition detected. Initial spread driven by ambient conditions.",
-            'conditions_change': {},
-            'metrics': {'spread_rate': 1.2, 'intensity': 30, 'area': 15}
-        },
-        {
-            'explanation': "Wind speed increases to 22 km/h. Fire accelerates northeast.",
-            'conditions_change': {'wind_speed': 22},
-            'metrics': {'spread_rate': 2.1, 'intensity': 45, 'area': 45}
-        },
-        {
-            'explanation': "Humidity drops to 25%. Vegetation becomes critically dry.",
-            'conditions_change': {'humidity': 25},
-            'metrics': {'spread_rate': 2.8, 'intensity': 60, 'area': 85}
-        },
-        {
-            'explanation': "Fire encounters 20° slope. Uphill spread rate doubles.",
-            'conditions_change': {'slope': 20},
-            'metrics': {'spread_rate': 3.2, 'intensity': 75, 'area': 140}
-        },
-        {
-            'explanation': "Temperature peaks at 36°C. Maximum fire intensity reached.",
-            'conditions_change': {'temperature': 36},
-            'metrics': {'spread_rate': 3.8, 'intensity': 90, 'area': 210}
-        },
-        {
-            'explanation': "Wind direction shifts slightly. Fire spread pattern adjusts.",
-            'conditions_change': {'wind_direction': 'E'},
-            'metrics': {'spread_rate': 3.5, 'intensity': 85, 'area': 285}
-        },
-        {
-            'explanation': "Fire behavior stabilizes. Consistent northeast progression.",
-            'conditions_change': {},
-            'metrics': {'spread_rate': 3.3, 'intensity': 80, 'area': 365}
-        }
-    ]
-    
-    if hour >= len(events):
-        hour = len(events) - 1
-    
-    event = events[hour]
-    
-    # Calculate updated conditions
-    updated_conditions = base_conditions.copy()
-    updated_conditions.update(event['conditions_change'])
-    
-    # Calculate factor changes
-    factor_changes = {}
-    for key, value in event['conditions_change'].items():
-        if key in base_conditions:
-            old_value = base_conditions[key]
-            if isinstance(old_value, (int, float)):
-                change_percent = ((value - old_value) / old_value) * 100
-                factor_changes[key] = round(change_percent, 1)
-    
-    return {
-        'explanation': event['explanation'],
-        'conditions': updated_conditions,
-        'factor_changes': factor_changes,
-        'metrics': event['metrics']
-    }
-
-@app.route('/api/ml/recovery/generate-plan', methods=['POST'])
-def generate_recovery_plan():
-    """Generate post-fire recovery and reforestation plan"""
-    try:
-        data = request.get_json()
-        
-        burned_area = data.get('burned_area_hectares', 150)
-        vegetation_type = data.get('vegetation_type', 'native-mix')
-        soil_condition = data.get('soil_condition', 'moderate_damage')
-        climate_zone = data.get('climate_zone', 'temperate_himalayan')
-        
-        # Generate species recommendations
-        species_recommendations = generate_species_recommendations(vegetation_type, climate_zone)
-        
-        # Calculate priority zones
-        priority_zones = calculate_recovery_priority_zones(burned_area, soil_condition)
-        
-        # Generate timeline
-        recovery_timeline = generate_recovery_timeline(burned_area, vegetation_type)
-        
-        # Calculate sustainability metrics
-        sustainability_metrics = calculate_post_fire_sustainability(burned_area, vegetation_type)
-        
-        return jsonify({
-            'success': True,
-            'recovery_plan': {
-                'burned_area_hectares': burned_area,
-                'vegetation_type': vegetation_type,
-                'species_recommendations': species_recommendations,
-                'priority_zones': priority_zones,
-                'recovery_timeline': recovery_timeline,
-                'sustainability_metrics': sustainability_metrics,
-                'planting_schedule': generate_planting_schedule(burned_area),
-                'maintenance_plan': generate_maintenance_plan(vegetation_type)
-            },
-            'timestamp': datetime.now().isoformat()
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
-
-@app.route('/api/ml/recovery/funding-analysis', methods=['POST'])
-def analyze_funding_options():
-    """Analyze funding options for post-fire recovery projects"""
+@app.route('/api/ml/recovery/funding-analysis', methods=['POST'])
+@cached_response()
+def analyze_funding_options():
+    """Analyze funding options for post-fire recovery projects"""
     try:
         data = request.get_json()
         
@@ -1425,6 +1888,7 @@ def analyze_funding_options():
         }), 500
 
 @app.route('/api/ml/recovery/climate-impact', methods=['POST'])
+@cached_response()
 def calculate_climate_impact():
     """Calculate climate action impact of recovery projects"""
     try:
@@ -1625,13 +2089,109 @@ def calculate_habitat_quality_score(burned_area, vegetation_type):
     
     return min(100, base_score + area_bonus)
 
+# Sub-requests of one /api/ml/batch call run concurrently on this pool
+MAX_BATCH_REQUESTS = 32
+batch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('NEURONIX_BATCH_WORKERS', 8)), thread_name_prefix='batch'
+)
+
+# Not dispatchable inside a batch: nested batches, whose pool threads would wait
+# on the pool they run on, and streams that never finish
+BATCH_EXCLUDED_ENDPOINTS = frozenset({'batch_requests', 'stream_predictions'})
+
+def _prepare_subrequest(index: int, subrequest) -> tuple:
+    """Validate one batch entry and return (dedupe key, WSGI environ); ValueError if it is not allowed"""
+    if not isinstance(subrequest, dict):
+        raise ValueError(f'Request {index} must be an object')
+    path = subrequest.get('path', '')
+    body = subrequest.get('body')
+    method = subrequest.get('method', 'POST' if body is not None else 'GET')
+    if not isinstance(path, str) or not isinstance(method, str) or not path.startswith('/api/ml/'):
+        raise ValueError(f'Path not allowed in a batch: {path}')
+    
+    environ = EnvironBuilder(path=path, method=method.upper(), json=body).get_environ()
+    # Resolve the route the way dispatch will, on the decoded path (/api/ml/%62atch is the batch route)
+    try:
+        endpoint, _ = app.url_map.bind('').match(environ['PATH_INFO'], environ['REQUEST_METHOD'])
+    except HTTPException:
+        raise ValueError(f"No route for {environ['REQUEST_METHOD']} {path}")
+    if endpoint in BATCH_EXCLUDED_ENDPOINTS:
+        raise ValueError(f'Path not allowed in a batch: {path}')
+    
+    # Dedupe on the canonical request so shared work runs once
+    key = (environ['REQUEST_METHOD'], environ['PATH_INFO'], environ['QUERY_STRING'],
+           json_encoding.dumps(body, sort_keys=True))
+    return key, environ
+
+def _dispatch_subrequest(environ: dict) -> tuple:
+    """Run one sub-request through the full Flask dispatch and return (status, raw JSON body, ms)"""
+    start = time.perf_counter()
+    with app.request_context(environ):
+        response = app.full_dispatch_request()
+    data = response.get_data().rstrip(b'\n')
+    if not response.is_json:
+        # Non-JSON or empty bodies (e.g. a 304) are embedded as a string or null
+        data = json_encoding.dumps(data.decode('utf-8')) if data else b'null'
+    return response.status_code, data, (time.perf_counter() - start) * 1000
+
+@app.route('/api/ml/batch', methods=['POST'])
+def batch_requests():
+    """Run several API sub-requests concurrently and return all responses in one body
+    
+    Body: {"requests": [{"id": "info", "method": "GET", "path": "/api/ml/model-info"},
+                        {"id": "risk", "path": "/api/ml/predict", "body": {...}}]}
+    method defaults to POST when a body is given, GET otherwise. Identical
+    sub-requests are dispatched once and share the result; sub-responses are
+    spliced into the reply as raw bytes, without being decoded again.
+    """
+    try:
+        data = request.get_json(silent=True)
+        subrequests = data.get('requests', []) if isinstance(data, dict) else data
+        if not isinstance(subrequests, list) or not subrequests:
+            return jsonify({'success': False, 'error': 'Expected a non-empty list of requests'}), 400
+        if len(subrequests) > MAX_BATCH_REQUESTS:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_REQUESTS} requests per batch'}), 400
+        
+        # Validate every entry before dispatching any
+        try:
+            prepared = [_prepare_subrequest(index, subrequest) for index, subrequest in enumerate(subrequests)]
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        futures, entries = {}, []
+        for index, (subrequest, (key, environ)) in enumerate(zip(subrequests, prepared)):
+            if key not in futures:
+                futures[key] = batch_executor.submit(_dispatch_subrequest, environ)
+            entries.append((subrequest.get('id', index), futures[key]))
+        
+        parts = []
+        for request_id, future in entries:
+            status, body, elapsed_ms = future.result()
+            parts.append(b'{"id":' + json_encoding.dumps(request_id) + b',"status":' + str(status).encode('ascii') +
+                         b',"elapsed_ms":' + json_encoding.dumps(round(elapsed_ms, 3)) + b',"body":' + body + b'}')
+        
+        payload = (b'{"success":true,"deduplicated":' + str(len(entries) - len(futures)).encode('ascii') +
+                   b',"responses":[' + b','.join(parts) + b'],"timestamp":' +
+                   json_encoding.dumps(datetime.now().isoformat()) + b'}')
+        return Response(payload, mimetype='application/json')
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/ml/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    realtime = real_time_predictor.get_stats()
     return jsonify({
         'success': True,
         'status': 'healthy',
-        'realtime_active': real_time_predictor.is_running,
+        'realtime_active': realtime['active'],
+        'stream': prediction_broadcaster.get_stats(),
+        'history': realtime['history'],
+        'weather_ingestion': realtime['weather_ingestion'],
         'models_loaded': True,
         'firevision_3d': True,
         'firesense_explainability': True,
@@ -1639,6 +2199,107 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/api/ml/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Get prediction and response cache size and hit-rate statistics"""
+    return jsonify({
+        'success': True,
+        'prediction_cache': prediction_cache.get_stats(),
+        'response_caches': {endpoint: cache.get_stats() for endpoint, cache in response_caches.items()},
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/ml/scheduler-stats', methods=['GET'])
+def get_scheduler_stats():
+    """Get the real-time refresh schedule and compute budget usage"""
+    realtime = real_time_predictor.get_stats()
+    return jsonify({
+        'success': True,
+        'scheduler': realtime['scheduler'],
+        'ticks': realtime['ticks'],
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/ml/model', methods=['GET'])
+def get_model_version():
+    """Get the version and source of the currently served model"""
+    return jsonify({
+        'success': True,
+        'model': fire_predictor.model_info,
+        'timestamp': datetime.now().isoformat()
+    })
+
+# serve.py's supervisor process, set in each of its workers; None when serving alone
+supervisor_pid = None
+
+@app.route('/api/ml/model/reload', methods=['POST'])
+@require_admin_token
+def reload_model_weights():
+    """Hot-reload the configured model weights without restarting the server
+    
+    Under serve.py the artifact is verified here and the supervisor is sent
+    SIGHUP, which reloads every worker one after another (202). Otherwise this
+    process reloads and answers with the new model.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if 'source' in data:
+            # Weights only ever come from the configured NEURONIX_WEIGHTS_PATH / NEURONIX_TFLITE_MODEL
+            return jsonify({'success': False, 'error': 'source is not supported, reload uses the configured weights'}), 400
+        previous_version = fire_predictor.model_info['version']
+        
+        if supervisor_pid is not None:
+            # Reloading only this worker would leave the others serving the old version
+            artifact = check_model_artifact()
+            os.kill(supervisor_pid, signal.SIGHUP)
+            return jsonify({
+                'success': True,
+                'status': 'reloading',
+                'scope': 'all_workers',
+                'previous_version': previous_version,
+                'version': artifact['version'],
+                'timestamp': datetime.now().isoformat()
+            }), 202
+        
+        info = reload_model()
+        
+        return jsonify({
+            'success': True,
+            'scope': 'process',
+            'pid': os.getpid(),
+            'previous_version': previous_version,
+            'model': info,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except ArtifactNotFound as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    except ValueError as e:
+        # Checksum or shape mismatch: the artifact is unusable, the current model keeps serving
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/ml/regions/<region>', methods=['PUT', 'DELETE'])
+@require_admin_token
+def manage_region(region):
+    """Add a region to, or remove it from, the real-time refresh schedule"""
+    try:
+        if request.method == 'PUT':
+            if not REGION_NAME_PATTERN.fullmatch(region):
+                return jsonify({'success': False, 'error': 'Region names must be 1-64 letters, digits, spaces, '
+                                                          'dots, underscores, apostrophes or hyphens'}), 400
+            if not real_time_predictor.add_region(region):
+                limit = real_time_predictor.get_stats()['scheduler']['max_regions']
+                return jsonify({'success': False, 'error': f'Region limit of {limit} reached'}), 409
+            return jsonify({'success': True, 'region': region, 'status': 'tracked'})
+        
+        if not real_time_predictor.remove_region(region):
+            return jsonify({'success': False, 'error': f'Unknown region: {region}'}), 404
+        return jsonify({'success': True, 'region': region, 'status': 'removed'})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/ml/start-realtime', methods=['POST'])
 def start_realtime():
     """Start real-time prediction service"""
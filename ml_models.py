@@ -1,16 +1,49 @@
 
+from runtime_profile import RuntimeProfile
+
+# Thread pools and oneDNN are fixed when TensorFlow initializes, so apply the profile first
+runtime_profile = RuntimeProfile.from_env()
+runtime_profile.apply_environment()
+
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers, models
 from tensorflow.keras.optimizers import Adam
+import os
 import json
+import time
+import base64
+import copy
+import heapq
 import datetime
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Tuple, Dict, Optional
 import requests
+import weight_store
+import simulation_server
+from fire_spread import CellularAutomataFireSpread, JobQueueFull, fire_spread_result, spread_hours
 import warnings
 warnings.filterwarnings('ignore')
 
+runtime_profile.apply_tensorflow(tf)
+
+try:
+    # The standalone TFLite runtime is much lighter than full TensorFlow when installed
+    from tflite_runtime.interpreter import Interpreter as TFLiteInterpreter
+except ImportError:
+    TFLiteInterpreter = tf.lite.Interpreter
+
+# Inference backend selected at startup: 'keras' (default) or 'tflite'
+INFERENCE_BACKEND = os.environ.get('NEURONIX_INFERENCE_BACKEND', 'keras')
+TFLITE_MODEL_PATH = os.environ.get('NEURONIX_TFLITE_MODEL', 'models/convlstm_unet.tflite')
+TFLITE_NUM_THREADS = int(os.environ.get('NEURONIX_TFLITE_THREADS', 0)) or None
+
+# Weight store directory loaded at startup and by reloads (see weight_store.py)
+WEIGHTS_PATH = os.environ.get('NEURONIX_WEIGHTS_PATH', 'models/weights')
+
 @dataclass
 class EnvironmentalData:
     """Data structure for environmental parameters"""
@@ -87,28 +120,427 @@ class DataProcessor:
         
         return min(max(fwi / 50.0, 0), 1)  # Normalize to 0-1
 
+class SyntheticSpatialGenerator:
+    """Fills reusable spatial input buffers with synthetic data layers
+    
+    Each thread owns its own Generator, scratch plane and output buffer, so the
+    arrays returned by generate()/generate_batch() are views that stay valid
+    only until the same thread asks for the next batch.
+    """
+    
+    def __init__(self, grid_shape=(64, 64), channels=8, seed=None, dtype=np.float32):
+        self.grid_shape = tuple(grid_shape)
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self._seed_sequence = np.random.SeedSequence(seed)
+        self._spawn_lock = threading.Lock()
+        self._local = threading.local()
+    
+    def _thread_state(self):
+        """Get (or lazily create) the per-thread generator and buffers"""
+        state = self._local
+        if not hasattr(state, 'rng'):
+            with self._spawn_lock:
+                child_seed = self._seed_sequence.spawn(1)[0]
+            state.rng = np.random.default_rng(child_seed)
+            state.scratch = np.empty(self.grid_shape, dtype=self.dtype)
+            state.buffer = np.empty((0,) + self.grid_shape + (self.channels,), dtype=self.dtype)
+        return state
+    
+    def _batch_buffer(self, state, batch_size: int) -> np.ndarray:
+        """Return a (batch_size, H, W, C) view of the thread's reusable buffer"""
+        if state.buffer.shape[0] < batch_size:
+            capacity = max(batch_size, 2 * state.buffer.shape[0])
+            state.buffer = np.empty((capacity,) + self.grid_shape + (self.channels,), dtype=self.dtype)
+        return state.buffer[:batch_size]
+    
+    @staticmethod
+    def layer_parameters(env_data: Dict) -> List[Tuple[float, float]]:
+        """Mean and standard deviation for the normally distributed layers 0-6"""
+        ndvi_base = env_data.get('ndvi', 0.5)
+        temp_norm = env_data['temperature'] / 50.0
+        humidity_norm = env_data['humidity'] / 100.0
+        elevation_norm = 0.5  # Simplified
+        slope_norm = 0.3
+        
+        return [
+            (ndvi_base, 0.1),           # Layer 0: NDVI pattern
+            (ndvi_base - 0.1, 0.05),    # Layer 1: NDVI delta
+            (ndvi_base + 0.05, 0.08),   # Layer 2: Vegetation health
+            (temp_norm, 0.1),           # Layer 3: Temperature pattern
+            (humidity_norm, 0.1),       # Layer 4: Humidity pattern
+            (elevation_norm, 0.2),      # Layer 5: Elevation
+            (slope_norm, 0.15)          # Layer 6: Slope
+        ]
+    
+    def fill(self, env_data: Dict, out: np.ndarray, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Fill one (H, W, C) frame in place, drawing each layer exactly once"""
+        state = self._thread_state()
+        rng = rng if rng is not None else state.rng
+        scratch = state.scratch
+        
+        for layer, (mean, std) in enumerate(self.layer_parameters(env_data)):
+            rng.standard_normal(dtype=self.dtype, out=scratch)
+            np.multiply(scratch, std, out=out[:, :, layer])
+            out[:, :, layer] += mean
+        
+        # Layer 7: Human activity/burned area index, Beta(1, 5) == 1 - U**(1/5)
+        rng.random(dtype=self.dtype, out=scratch)
+        np.power(scratch, 0.2, out=scratch)
+        np.subtract(1.0, scratch, out=out[:, :, 7])
+        
+        np.clip(out, 0, 1, out=out)
+        return out
+    
+    def generate(self, env_data: Dict, seed: Optional[int] = None) -> np.ndarray:
+        """Generate a single frame as a (1, H, W, C) view of the reusable buffer"""
+        return self.generate_batch([env_data], seed=seed)
+    
+    def generate_batch(self, env_batch: List[Dict], seed: Optional[int] = None) -> np.ndarray:
+        """Generate one frame per environmental record into the reusable buffer"""
+        state = self._thread_state()
+        rng = np.random.default_rng(seed) if seed is not None else state.rng
+        batch = self._batch_buffer(state, len(env_batch))
+        
+        for frame, env_data in zip(batch, env_batch):
+            self.fill(env_data, frame, rng)
+        
+        return batch
+
+SPATIAL_MAP_DTYPES = ('float16', 'uint8')
+
+def parse_spatial_map(spatial_map: Optional[str], grid_shape: Optional[Tuple[int, int]] = None) -> Tuple[str, object]:
+    """Validate a spatial_map format string, returning (mode, option)
+    
+    option is the downsample factor or the base64 dtype, None for 'full' and
+    'none'. With grid_shape, the downsample factor is also checked against it.
+    Raises ValueError for anything encode_spatial_risk_map() would reject.
+    """
+    if spatial_map is not None and not isinstance(spatial_map, str):
+        raise ValueError(f"spatial_map must be a string, got {type(spatial_map).__name__}")
+    mode, _, option = (spatial_map or 'none').partition(':')
+    
+    if mode in ('none', 'full'):
+        if option:
+            raise ValueError(f"Spatial map format '{mode}' takes no option, got {spatial_map}")
+        return mode, None
+    
+    if mode == 'downsample':
+        try:
+            factor = int(option) if option else 4
+        except ValueError:
+            raise ValueError(f"Downsample factor must be an integer, got {option}")
+        if factor < 1:
+            raise ValueError(f"Downsample factor must be positive, got {factor}")
+        if grid_shape is not None:
+            height, width = grid_shape
+            if height % factor or width % factor:
+                raise ValueError(f"Downsample factor must evenly divide {height}x{width}, got {factor}")
+        return mode, factor
+    
+    if mode == 'base64':
+        dtype = option or 'float16'
+        if dtype not in SPATIAL_MAP_DTYPES:
+            raise ValueError(f"Unsupported spatial map dtype: {dtype}")
+        return mode, dtype
+    
+    raise ValueError(f"Unsupported spatial map format: {spatial_map}")
+
+def encode_spatial_risk_map(spatial_risk: np.ndarray, spatial_map: str = 'full'):
+    """Encode an (H, W, 1) spatial risk map for a JSON response
+    
+    Supported formats (arrays are written as nested lists by the JSON encoder):
+        'full'            array at full resolution (default)
+        'none'            omit the map, returns None
+        'downsample[:N]'  array of N x N block means (N defaults to 4)
+        'base64[:DTYPE]'  base64 buffer of float16 (default) or uint8 values
+    """
+    mode, option = parse_spatial_map(spatial_map, spatial_risk.shape[:2])
+    
+    if mode == 'none':
+        return None
+    
+    if mode == 'full':
+        # Encoded directly from the array by the API's JSON provider
+        return spatial_risk
+    
+    if mode == 'downsample':
+        factor = option
+        height, width, channels = spatial_risk.shape
+        blocks = spatial_risk.reshape(height // factor, factor, width // factor, factor, channels)
+        return blocks.mean(axis=(1, 3))
+    
+    dtype = option
+    if dtype == 'float16':
+        values = spatial_risk.astype('<f2')
+        scale = 1.0
+    else:
+        values = np.rint(np.clip(spatial_risk, 0, 1) * 255).astype(np.uint8)
+        scale = 1.0 / 255
+    
+    return {
+        'encoding': 'base64',
+        'dtype': dtype,
+        'shape': list(spatial_risk.shape),
+        'scale': scale,
+        'data': base64.b64encode(values.tobytes()).decode('ascii')
+    }
+
+class KerasInferenceBackend:
+    """Runs inference directly on the in-memory Keras model"""
+    
+    name = 'keras'
+    
+    def __init__(self, model):
+        self.model = model
+    
+    def predict(self, env_features: np.ndarray, spatial_features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (risk (N, 1), spatial risk (N, H, W, 1)) for a batch of inputs"""
+        risk_prob, spatial_risk = self.model.predict_on_batch([env_features, spatial_features])
+        return np.asarray(risk_prob), np.asarray(spatial_risk)
+
+class TFLiteInferenceBackend:
+    """Runs inference on an exported TFLite flatbuffer
+    
+    The flatbuffer is memory-mapped from model_path, so its weights are shared
+    between worker processes. TFLite interpreters are not thread-safe, so each
+    thread gets its own interpreter.
+    """
+    
+    name = 'tflite'
+    
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self._local = threading.local()
+        
+        # Load once up front so a bad artifact fails at startup, not on the first request
+        interpreter = self._interpreter()
+        details = interpreter.get_signature_runner().get_input_details()
+        self.batch_size = int(details['spatial_features']['shape'][0])
+    
+    def _interpreter(self):
+        interpreter = getattr(self._local, 'interpreter', None)
+        if interpreter is None:
+            interpreter = TFLiteInterpreter(model_path=self.model_path, num_threads=self.num_threads)
+            interpreter.allocate_tensors()
+            self._local.interpreter = interpreter
+            self._local.runner = interpreter.get_signature_runner()
+        return interpreter
+    
+    def predict(self, env_features: np.ndarray, spatial_features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (risk (N, 1), spatial risk (N, H, W, 1)), running the exported batch size at a time"""
+        self._interpreter()
+        runner = self._local.runner
+        env_features = np.asarray(env_features, dtype=np.float32)
+        spatial_features = np.asarray(spatial_features, dtype=np.float32)
+        
+        risk_chunks, spatial_chunks = [], []
+        for start in range(0, len(env_features), self.batch_size):
+            env_chunk = env_features[start:start + self.batch_size]
+            spatial_chunk = spatial_features[start:start + self.batch_size]
+            rows = len(env_chunk)
+            if rows < self.batch_size:
+                # The exported batch size is static, so pad the last chunk and drop the extra rows
+                padding = self.batch_size - rows
+                env_chunk = np.concatenate([env_chunk, np.repeat(env_chunk[-1:], padding, axis=0)])
+                spatial_chunk = np.concatenate([spatial_chunk, np.repeat(spatial_chunk[-1:], padding, axis=0)])
+            outputs = runner(environmental_features=env_chunk, spatial_features=spatial_chunk)
+            risk_chunks.append(outputs['fire_risk'][:rows])
+            spatial_chunks.append(outputs['spatial_risk'][:rows])
+        
+        return np.concatenate(risk_chunks), np.concatenate(spatial_chunks)
+
+def export_tflite_model(model, output_path: str, input_shape=(64, 64, 8), batch_size: int = 1,
+                        quantization: Optional[str] = None) -> int:
+    """Export a ConvLSTM + UNet Keras model to a TFLite flatbuffer
+    
+    quantization: None for float32, 'float16' for float16 weights or 'int8' for
+    post-training dynamic-range quantization (int8 weights, float activations).
+    The batch size is fixed at export time because the ConvLSTM loop needs
+    static shapes. Returns the size of the written file in bytes.
+    """
+    @tf.function(input_signature=[
+        tf.TensorSpec((batch_size, 8), tf.float32, name='environmental_features'),
+        tf.TensorSpec((batch_size,) + tuple(input_shape), tf.float32, name='spatial_features')
+    ])
+    def serving_fn(environmental_features, spatial_features):
+        risk_prob, spatial_risk = model([environmental_features, spatial_features], training=False)
+        return {'fire_risk': risk_prob, 'spatial_risk': spatial_risk}
+    
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [serving_fn.get_concrete_function()], model
+    )
+    if quantization == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif quantization is not None:
+        raise ValueError(f"Unsupported quantization: {quantization}")
+    
+    flatbuffer = converter.convert()
+    
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, 'wb') as f:
+        f.write(flatbuffer)
+    
+    return len(flatbuffer)
+
+def compare_inference_backends(reference, candidate, samples: int = 64,
+                               input_shape=(64, 64, 8), seed: int = 0) -> Dict:
+    """Compare a candidate backend against a reference backend on synthetic inputs"""
+    rng = np.random.default_rng(seed)
+    processor = DataProcessor()
+    generator = SyntheticSpatialGenerator(grid_shape=input_shape[:2], channels=input_shape[2], seed=seed)
+    
+    risk_errors, spatial_errors, category_matches = [], [], 0
+    reference_times, candidate_times = [], []
+    
+    for _ in range(samples):
+        env_data = {
+            'temperature': rng.uniform(10, 45),
+            'humidity': rng.uniform(10, 90),
+            'wind_speed': rng.uniform(0, 40),
+            'wind_direction': rng.choice(list(processor.wind_direction_mapping)),
+            'ndvi': rng.uniform(0.2, 0.9),
+            'elevation': rng.uniform(300, 4000),
+            'slope': rng.uniform(0, 45),
+            'vegetation_density': rng.choice(list(processor.vegetation_mapping))
+        }
+        env_features = processor.normalize_features(env_data).reshape(1, -1).astype(np.float32)
+        spatial_features = generator.generate(env_data).copy()
+        
+        start = time.perf_counter()
+        ref_risk, ref_spatial = reference.predict(env_features, spatial_features)
+        reference_times.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        cand_risk, cand_spatial = candidate.predict(env_features, spatial_features)
+        candidate_times.append(time.perf_counter() - start)
+        
+        risk_errors.append(abs(float(ref_risk[0][0]) - float(cand_risk[0][0])))
+        spatial_errors.append(float(np.mean(np.abs(ref_spatial - cand_spatial))))
+        category_matches += (ConvLSTMUNetModel.categorize_risk(ref_risk[0][0]) ==
+                             ConvLSTMUNetModel.categorize_risk(cand_risk[0][0]))
+    
+    return {
+        'samples': samples,
+        'reference_backend': reference.name,
+        'candidate_backend': candidate.name,
+        'risk_mean_abs_error': float(np.mean(risk_errors)),
+        'risk_max_abs_error': float(np.max(risk_errors)),
+        'spatial_mean_abs_error': float(np.mean(spatial_errors)),
+        'risk_category_agreement': category_matches / samples,
+        'reference_latency_ms': float(np.median(reference_times) * 1000),
+        'candidate_latency_ms': float(np.median(candidate_times) * 1000)
+    }
+
 class ConvLSTMUNetModel:
     """Hybrid ConvLSTM + UNet model for fire risk prediction"""
     
-    def __init__(self, input_shape=(64, 64, 8), sequence_length=5):
+    def __init__(self, input_shape=(64, 64, 8), sequence_length=5, backend: str = 'keras',
+                 tflite_model_path: Optional[str] = None, tflite_num_threads: Optional[int] = None):
         self.input_shape = input_shape
         self.sequence_length = sequence_length
         self.model = None
-        self.build_model()
+        self.data_processor = DataProcessor()
+        # Stateful ConvLSTM and MC dropout models, only available on the Keras backend
+        self.step_model = None
+        self.sequence_model = None
+        self.mc_features_model = None
+        self.risk_head_model = None
+        self.spatial_generator = SyntheticSpatialGenerator(
+            grid_shape=input_shape[:2], channels=input_shape[2]
+        )
+        
+        if backend == 'keras':
+            self.build_model()
+            self.backend = KerasInferenceBackend(self.model)
+        elif backend == 'tflite':
+            # The Keras graph is not built at all, which keeps per-process memory down
+            self.backend = TFLiteInferenceBackend(tflite_model_path or TFLITE_MODEL_PATH, tflite_num_threads)
+        else:
+            raise ValueError(f"Unknown inference backend: {backend}")
     
     def build_model(self):
-        """Build the hybrid ConvLSTM + UNet architecture"""
+        """Build the hybrid ConvLSTM + UNet architecture
+        
+        Besides the stateless self.model (one frame, zero initial state) this
+        builds self.step_model, which advances the ConvLSTM by one frame from a
+        given hidden/cell state, and self.sequence_model, which runs a whole frame
+        sequence to recover that state. All three share the same weights.
+        """
         # Input for environmental features
         env_input = layers.Input(shape=(8,), name='environmental_features')
         
         # Input for spatial data (satellite imagery simulation)
         spatial_input = layers.Input(shape=self.input_shape, name='spatial_features')
         
-        # ConvLSTM branch for temporal patterns
-        convlstm = layers.ConvLSTM2D(
-            filters=32, kernel_size=3, padding='same', 
-            return_sequences=False, activation='tanh'
-        )(tf.expand_dims(spatial_input, axis=1))
+        # ConvLSTM branch for temporal patterns; return_state exposes h/c for the step model
+        self.convlstm_layer = layers.ConvLSTM2D(
+            filters=64, kernel_size=3, padding='same', 
+            return_sequences=False, return_state=True, activation='tanh'
+        )
+        convlstm, _, _ = self.convlstm_layer(tf.expand_dims(spatial_input, axis=1))
+        
+        self.fusion_model = self._build_fusion_model()
+        risk_output, spatial_risk = self._named_outputs(
+            self.fusion_model([env_input, spatial_input, convlstm])
+        )
+        
+        self.model = models.Model(
+            inputs=[env_input, spatial_input],
+            outputs=[risk_output, spatial_risk]
+        )
+        
+        self.model.compile(
+            optimizer=Adam(learning_rate=0.001),
+            loss={
+                'fire_risk': 'binary_crossentropy',
+                'spatial_risk': 'binary_crossentropy'
+            },
+            metrics={
+                'fire_risk': ['accuracy'],
+                'spatial_risk': ['accuracy']
+            }
+        )
+        
+        # Head features and spatial map from one trunk pass, for MC dropout
+        self.mc_features_model = models.Model(
+            inputs=[env_input, spatial_input],
+            outputs=self.fusion_trunk([env_input, spatial_input, convlstm])
+        )
+        
+        # One recurrent step: the new frame plus the previous hidden/cell state
+        state_shape = self.input_shape[:2] + (self.convlstm_layer.filters,)
+        hidden_input = layers.Input(shape=state_shape, name='hidden_state')
+        cell_input = layers.Input(shape=state_shape, name='cell_state')
+        step_convlstm, hidden, cell = self.convlstm_layer(
+            tf.expand_dims(spatial_input, axis=1), initial_state=[hidden_input, cell_input]
+        )
+        step_risk, step_spatial_risk = self._named_outputs(
+            self.fusion_model([env_input, spatial_input, step_convlstm])
+        )
+        self.step_model = models.Model(
+            inputs=[env_input, spatial_input, hidden_input, cell_input],
+            outputs=[step_risk, step_spatial_risk, hidden, cell]
+        )
+        
+        # Replays buffered frames to rebuild the state of a region from scratch
+        sequence_input = layers.Input(shape=(None,) + tuple(self.input_shape), name='frame_sequence')
+        _, sequence_hidden, sequence_cell = self.convlstm_layer(sequence_input)
+        self.sequence_model = models.Model(inputs=sequence_input, outputs=[sequence_hidden, sequence_cell])
+    
+    def _build_fusion_model(self):
+        """UNet over the current frame fused with ConvLSTM features and environmental data"""
+        env_input = layers.Input(shape=(8,), name='environmental_features')
+        spatial_input = layers.Input(shape=self.input_shape, name='spatial_features')
+        convlstm = layers.Input(
+            shape=self.input_shape[:2] + (self.convlstm_layer.filters,), name='temporal_features'
+        )
         
         # UNet-style encoder
         conv1 = layers.Conv2D(64, 3, activation='relu', padding='same')(spatial_input)
@@ -147,90 +579,152 @@ class ConvLSTMUNetModel:
         # Combine all features
         combined = layers.concatenate([global_features, env_features])
         combined = layers.Dense(128, activation='relu')(combined)
-        combined = layers.Dropout(0.3)(combined)
-        combined = layers.Dense(64, activation='relu')(combined)
+        
+        # Dropout and everything after it form the head, the only stochastic part of the graph
+        dropout = layers.Dropout(0.3)
+        head_dense = layers.Dense(64, activation='relu')
         
         # Output layers
-        risk_output = layers.Dense(1, activation='sigmoid', name='fire_risk')(combined)
+        # Outputs stay float32 under a mixed-precision policy
+        risk_head = layers.Dense(1, activation='sigmoid', name='risk_head', dtype='float32')
+        risk_output = risk_head(head_dense(dropout(combined)))
         
         # Spatial risk map output
-        spatial_risk = layers.Conv2D(1, 1, activation='sigmoid', name='spatial_risk')(combined_spatial)
-        
-        self.model = models.Model(
-            inputs=[env_input, spatial_input],
-            outputs=[risk_output, spatial_risk]
+        spatial_risk = layers.Conv2D(
+            1, 1, activation='sigmoid', name='spatial_head', dtype='float32'
+        )(combined_spatial)
+        
+        # Deterministic trunk and stochastic head, sharing weights, for MC dropout
+        self.fusion_trunk = models.Model(
+            inputs=[env_input, spatial_input, convlstm],
+            outputs=[combined, spatial_risk],
+            name='fusion_trunk'
+        )
+        head_input = layers.Input(shape=(combined.shape[-1],), name='head_features')
+        self.risk_head_model = models.Model(
+            inputs=head_input, outputs=risk_head(head_dense(dropout(head_input))), name='risk_head_model'
         )
         
-        self.model.compile(
-            optimizer=Adam(learning_rate=0.001),
-            loss={
-                'fire_risk': 'binary_crossentropy',
-                'spatial_risk': 'binary_crossentropy'
-            },
-            metrics={
-                'fire_risk': ['accuracy'],
-                'spatial_risk': ['accuracy']
-            }
+        return models.Model(
+            inputs=[env_input, spatial_input, convlstm],
+            outputs=[risk_output, spatial_risk],
+            name='fusion'
         )
     
-    def predict_fire_risk(self, env_data: Dict, spatial_data: Optional[np.ndarray] = None) -> Dict:
-        """Predict fire risk based on environmental and spatial data"""
+    @staticmethod
+    def _named_outputs(outputs):
+        """Give the shared fusion outputs the public names used by losses and exports"""
+        risk_output, spatial_risk = outputs
+        return (layers.Activation('linear', name='fire_risk', dtype='float32')(risk_output),
+                layers.Activation('linear', name='spatial_risk', dtype='float32')(spatial_risk))
+    
+    def predict_fire_risk(self, env_data: Dict, spatial_data: Optional[np.ndarray] = None,
+                          spatial_map: str = 'full', seed: Optional[int] = None,
+                          mc_samples: int = 0) -> Dict:
+        """Predict fire risk based on environmental and spatial data
+        
+        spatial_map selects how the spatial risk map is returned, see
+        encode_spatial_risk_map(); 'none' leaves it out of the result.
+        mc_samples > 0 adds an MC dropout 'uncertainty' estimate (Keras backend only).
+        """
         if spatial_data is None:
             # Generate synthetic spatial data for demo
-            spatial_data = self.generate_synthetic_spatial_data(env_data)
+            spatial_data = self._synthetic_spatial_into_buffer(env_data, seed=seed)
         
         # Normalize environmental features
-        processor = DataProcessor()
-        env_features = processor.normalize_features(env_data).reshape(1, -1)
-        spatial_features = spatial_data.reshape(1, 64, 64, 8)
+        env_features = self.data_processor.normalize_features(env_data).reshape(1, -1).astype(np.float32)
+        
+        return self.predict_from_features(env_data, env_features, spatial_data,
+                                          spatial_map=spatial_map, mc_samples=mc_samples)
+    
+    def predict_from_features(self, env_data: Dict, env_features: np.ndarray, spatial_data: np.ndarray,
+                              fwi: Optional[float] = None, spatial_map: str = 'full',
+                              mc_samples: int = 0) -> Dict:
+        """Predict from already normalized features, reusing a precomputed FWI if given"""
+        spatial_features = spatial_data.reshape((1,) + self.input_shape)
+        
+        if mc_samples > 0 and self.mc_features_model is not None:
+            return self._predict_with_uncertainty(env_data, env_features, spatial_features,
+                                                  spatial_map, mc_samples, fwi=fwi)
         
         # Make prediction
-        risk_prob, spatial_risk = self.model.predict([env_features, spatial_features], verbose=0)
+        risk_prob, spatial_risk = self.backend.predict(env_features, spatial_features)
         
+        return self.format_prediction(env_data, risk_prob[0][0], spatial_risk[0], spatial_map, fwi=fwi)
+    
+    def predict_batch(self, env_batch: List[Dict], seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Score several environmental records with synthetic spatial inputs in one backend call"""
+        env_features = np.stack([self.data_processor.normalize_features(env) for env in env_batch]).astype(np.float32)
+        spatial_features = self.spatial_generator.generate_batch(env_batch, seed=seed)
+        risk_prob, spatial_risk = self.backend.predict(env_features, spatial_features)
+        return np.asarray(risk_prob), np.asarray(spatial_risk)
+    
+    def _predict_with_uncertainty(self, env_data: Dict, env_features: np.ndarray, spatial_features: np.ndarray,
+                                  spatial_map: str, mc_samples: int, interval: float = 0.9,
+                                  fwi: Optional[float] = None) -> Dict:
+        """Prediction plus MC dropout statistics over mc_samples stochastic passes
+        
+        Dropout only sits in the dense head, so the trunk (ConvLSTM, UNet) runs
+        once and its features are tiled into one batch of mc_samples rows for the
+        head with dropout active.
+        """
+        features, spatial_risk = self.mc_features_model.predict_on_batch([env_features, spatial_features])
+        risk_prob = float(np.asarray(self.risk_head_model(features, training=False))[0][0])
+        
+        tiled = np.repeat(np.asarray(features, dtype=np.float32), mc_samples, axis=0)
+        samples = np.asarray(self.risk_head_model(tiled, training=True), dtype=np.float64)[:, 0]
+        tail = (1 - interval) / 2
+        
+        prediction = self.format_prediction(env_data, risk_prob, np.asarray(spatial_risk)[0], spatial_map, fwi=fwi)
+        prediction['uncertainty'] = {
+            'method': 'mc_dropout',
+            'samples': mc_samples,
+            'mean': float(samples.mean()),
+            'std': float(samples.std()),
+            'interval': interval,
+            'lower_bound': float(np.quantile(samples, tail)),
+            'upper_bound': float(np.quantile(samples, 1 - tail))
+        }
+        return prediction
+    
+    def format_prediction(self, env_data: Dict, risk_prob: float, spatial_risk: np.ndarray,
+                          spatial_map: str = 'full', fwi: Optional[float] = None) -> Dict:
+        """Build the prediction dict for one model output"""
         # Calculate additional risk metrics
-        fwi = processor.calculate_fire_weather_index(
-            env_data['temperature'], 
-            env_data['humidity'], 
-            env_data['wind_speed']
-        )
+        if fwi is None:
+            fwi = self.data_processor.calculate_fire_weather_index(
+                env_data['temperature'], 
+                env_data['humidity'], 
+                env_data['wind_speed']
+            )
         
-        return {
-            'overall_risk': float(risk_prob[0][0]),
+        prediction = {
+            'overall_risk': float(risk_prob),
             'fire_weather_index': float(fwi),
-            'spatial_risk_map': spatial_risk[0].tolist(),
-            'confidence': float(max(risk_prob[0][0], 1 - risk_prob[0][0])),
-            'risk_category': self.categorize_risk(risk_prob[0][0])
+            'confidence': float(max(risk_prob, 1 - risk_prob)),
+            'risk_category': self.categorize_risk(risk_prob)
         }
-    
-    def generate_synthetic_spatial_data(self, env_data: Dict) -> np.ndarray:
-        """Generate synthetic spatial data for demonstration"""
-        # Create a 64x64x8 array representing different data layers
-        spatial_data = np.random.random((64, 64, 8))
-        
-        # Layer 0-2: NDVI patterns
-        ndvi_base = env_data.get('ndvi', 0.5)
-        spatial_data[:, :, 0] = np.random.normal(ndvi_base, 0.1, (64, 64))
-        spatial_data[:, :, 1] = np.random.normal(ndvi_base - 0.1, 0.05, (64, 64))  # NDVI delta
-        spatial_data[:, :, 2] = np.random.normal(ndvi_base + 0.05, 0.08, (64, 64))  # Vegetation health
-        
-        # Layer 3-4: Temperature and humidity patterns
-        temp_norm = env_data['temperature'] / 50.0
-        humidity_norm = env_data['humidity'] / 100.0
-        spatial_data[:, :, 3] = np.random.normal(temp_norm, 0.1, (64, 64))
-        spatial_data[:, :, 4] = np.random.normal(humidity_norm, 0.1, (64, 64))
         
-        # Layer 5-6: Terrain features
-        elevation_norm = 0.5  # Simplified
-        slope_norm = 0.3
-        spatial_data[:, :, 5] = np.random.normal(elevation_norm, 0.2, (64, 64))
-        spatial_data[:, :, 6] = np.random.normal(slope_norm, 0.15, (64, 64))
+        encoded_map = encode_spatial_risk_map(spatial_risk, spatial_map)
+        if encoded_map is not None:
+            prediction['spatial_risk_map'] = encoded_map
         
-        # Layer 7: Human activity/burned area index
-        spatial_data[:, :, 7] = np.random.beta(1, 5, (64, 64))  # Low human activity
+        return prediction
+    
+    def generate_synthetic_spatial_data(self, env_data: Dict, seed: Optional[int] = None) -> np.ndarray:
+        """Generate synthetic spatial data for demonstration, as a (64, 64, 8) array"""
+        return self._synthetic_spatial_into_buffer(env_data, seed=seed)[0].copy()
+    
+    def _synthetic_spatial_into_buffer(self, env_data: Dict, seed: Optional[int] = None) -> np.ndarray:
+        """Synthetic spatial data as a (1, 64, 64, 8) view of the generator's per-thread buffer
         
-        return np.clip(spatial_data, 0, 1)
+        The view is overwritten by the next call on the same thread, so callers
+        must consume it before generating again.
+        """
+        return self.spatial_generator.generate(env_data, seed=seed)
     
-    def categorize_risk(self, risk_score: float) -> str:
+    @staticmethod
+    def categorize_risk(risk_score: float) -> str:
         """Categorize risk score into human-readable categories"""
         if risk_score >= 0.8:
             return "very-high"
@@ -243,108 +737,265 @@ class ConvLSTMUNetModel:
         else:
             return "very-low"
 
-class CellularAutomataFireSpread:
-    """Cellular Automata model for fire spread simulation"""
-    
-    def __init__(self, grid_size=(100, 100)):
-        self.grid_size = grid_size
-        self.grid = np.zeros(grid_size)
-        self.fuel_map = np.random.beta(2, 2, grid_size)  # Fuel distribution
-        self.elevation_map = np.random.normal(0.5, 0.2, grid_size)
-        self.moisture_map = np.random.beta(3, 2, grid_size)
-        
-    def ignite_fire(self, x: int, y: int):
-        """Start a fire at given coordinates"""
-        if 0 <= x < self.grid_size[0] and 0 <= y < self.grid_size[1]:
-            self.grid[x, y] = 1.0
-    
-    def spread_step(self, wind_speed: float, wind_direction: float, temperature: float, humidity: float):
-        """Perform one step of fire spread simulation"""
-        new_grid = self.grid.copy()
-        
-        # Convert wind direction to vector
-        wind_x = np.cos(np.radians(wind_direction)) * wind_speed / 30.0
-        wind_y = np.sin(np.radians(wind_direction)) * wind_speed / 30.0
-        
-        # Temperature and humidity effects
-        temp_factor = min(temperature / 40.0, 1.5)
-        humidity_factor = max(0.1, 1.0 - humidity / 100.0)
-        
-        for i in range(1, self.grid_size[0] - 1):
-            for j in range(1, self.grid_size[1] - 1):
-                if self.grid[i, j] > 0:  # If there's fire
-                    # Check 8 neighbors
-                    for di in [-1, 0, 1]:
-                        for dj in [-1, 0, 1]:
-                            if di == 0 and dj == 0:
-                                continue
-                            
-                            ni, nj = i + di, j + dj
-                            if 0 <= ni < self.grid_size[0] and 0 <= nj < self.grid_size[1]:
-                                if new_grid[ni, nj] == 0:  # Unburned cell
-                                    # Calculate spread probability
-                                    base_prob = 0.1
-                                    
-                                    # Fuel availability
-                                    fuel_factor = self.fuel_map[ni, nj]
-                                    
-                                    # Slope effect (fire spreads faster uphill)
-                                    slope_factor = 1.0
-                                    if self.elevation_map[ni, nj] > self.elevation_map[i, j]:
-                                        slope_factor = 1.5
-                                    elif self.elevation_map[ni, nj] < self.elevation_map[i, j]:
-                                        slope_factor = 0.7
-                                    
-                                    # Wind effect
-                                    wind_factor = 1.0
-                                    if abs(di - wind_x) < 0.5 and abs(dj - wind_y) < 0.5:
-                                        wind_factor = 1.8
-                                    
-                                    # Moisture effect
-                                    moisture_factor = max(0.1, 1.0 - self.moisture_map[ni, nj])
-                                    
-                                    # Calculate total probability
-                                    spread_prob = (base_prob * fuel_factor * slope_factor * 
-                                                 wind_factor * temp_factor * humidity_factor * moisture_factor)
-                                    
-                                    if np.random.random() < spread_prob:
-                                        new_grid[ni, nj] = 1.0
-        
-        # Fire decay (burned areas become less intense over time)
-        self.grid = self.grid * 0.95
-        self.grid = np.maximum(self.grid, new_grid)
-        
-        return self.calculate_spread_metrics()
-    
-    def calculate_spread_metrics(self) -> Dict:
-        """Calculate metrics about fire spread"""
-        burned_area = np.sum(self.grid > 0.1)
-        total_cells = self.grid_size[0] * self.grid_size[1]
-        
-        # Calculate perimeter (simplified)
-        fire_cells = self.grid > 0.1
-        perimeter = 0
-        for i in range(self.grid_size[0]):
-            for j in range(self.grid_size[1]):
-                if fire_cells[i, j]:
-                    # Check if cell is on the edge of fire
-                    neighbors = 0
-                    for di in [-1, 0, 1]:
-                        for dj in [-1, 0, 1]:
-                            ni, nj = i + di, j + dj
-                            if (0 <= ni < self.grid_size[0] and 0 <= nj < self.grid_size[1] 
-                                and fire_cells[ni, nj]):
-                                neighbors += 1
-                    if neighbors < 9:  # Not completely surrounded
-                        perimeter += 1
+class TiledRiskInference:
+    """Sliding-window inference of the spatial risk map over an arbitrarily large raster
+    
+    The raster (H, W, C) is covered with overlapping tiles of the model's input
+    size, which are run through the inference backend in batches. Overlaps are
+    blended with a separable tapered weight, and the stitched (H, W) risk map is
+    written to a memory-mapped .npy file, so neither the input nor the output
+    has to fit in memory.
+    """
+    
+    def __init__(self, model: ConvLSTMUNetModel, overlap: int = 16, batch_size: int = 16):
+        self.model = model
+        self.tile_size = model.input_shape[0]
+        if model.input_shape[1] != self.tile_size:
+            raise ValueError("Tiled inference requires a square model input")
+        if not 0 <= overlap < self.tile_size:
+            raise ValueError(f"Overlap must be in [0, {self.tile_size})")
+        
+        self.overlap = overlap
+        self.stride = self.tile_size - overlap
+        
+        # A static-batch TFLite model needs full batches, so round up to a multiple of it
+        backend_batch = getattr(model.backend, 'batch_size', 1)
+        self.batch_size = -(-max(batch_size, 1) // backend_batch) * backend_batch
+        
+        self.tile_weight = self._taper(self.tile_size, overlap)
+    
+    @staticmethod
+    def _taper(size: int, overlap: int) -> np.ndarray:
+        """1D blending weight: linear ramp over the overlap, flat in the middle"""
+        if overlap == 0:
+            return np.ones(size, dtype=np.float32)
+        ramp = (np.arange(overlap, dtype=np.float32) + 0.5) / overlap
+        weight = np.ones(size, dtype=np.float32)
+        weight[:overlap] = ramp
+        weight[-overlap:] = np.minimum(weight[-overlap:], ramp[::-1])
+        return weight
+    
+    def window_origins(self, length: int) -> List[int]:
+        """Tile origins along one axis; the last tile is aligned to the raster edge"""
+        if length <= self.tile_size:
+            return [0]
+        origins = list(range(0, length - self.tile_size, self.stride))
+        origins.append(length - self.tile_size)
+        return origins
+    
+    def _axis_weight_sum(self, length: int, origins: List[int]) -> np.ndarray:
+        """Total blending weight per pixel along one axis"""
+        total = np.zeros(length, dtype=np.float32)
+        for origin in origins:
+            span = min(self.tile_size, length - origin)
+            total[origin:origin + span] += self.tile_weight[:span]
+        return total
+    
+    def predict_raster(self, raster: np.ndarray, env_data: Dict, output_path: str) -> Dict:
+        """Predict the spatial risk map for raster (H, W, C) into a memory-mapped .npy file
+        
+        env_data holds the environmental conditions applied to every tile.
+        Returns a summary of the run; load the map with np.load(output_path, mmap_mode='r').
+        """
+        height, width, channels = raster.shape
+        if channels != self.model.input_shape[2]:
+            raise ValueError(f"Raster has {channels} channels, model expects {self.model.input_shape[2]}")
+        
+        row_origins = self.window_origins(height)
+        col_origins = self.window_origins(width)
+        windows = [(y, x) for y in row_origins for x in col_origins]
+        
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        output = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32, shape=(height, width))
+        
+        tile = self.tile_size
+        env_features = DataProcessor().normalize_features(env_data).astype(np.float32)
+        env_batch = np.tile(env_features, (self.batch_size, 1))
+        tile_batch = np.zeros((self.batch_size, tile, tile, channels), dtype=np.float32)
+        tile_weight_2d = np.outer(self.tile_weight, self.tile_weight)
+        
+        start_time = time.perf_counter()
+        batches = 0
+        # Windows are row-major, so writes into the memmap stay local
+        for start in range(0, len(windows), self.batch_size):
+            batch_windows = windows[start:start + self.batch_size]
+            for i, (y, x) in enumerate(batch_windows):
+                patch = raster[y:y + tile, x:x + tile]
+                if patch.shape[:2] != (tile, tile):
+                    # Rasters smaller than one tile are edge-padded
+                    patch = np.pad(patch, ((0, tile - patch.shape[0]), (0, tile - patch.shape[1]), (0, 0)),
+                                   mode='edge')
+                tile_batch[i] = patch
+            
+            # Always run full batches; stale slots past len(batch_windows) are ignored
+            _, spatial_risk = self.model.backend.predict(env_batch, tile_batch)
+            batches += 1
+            
+            for i, (y, x) in enumerate(batch_windows):
+                rows, cols = min(tile, height - y), min(tile, width - x)
+                output[y:y + rows, x:x + cols] += (spatial_risk[i, :rows, :cols, 0] *
+                                                   tile_weight_2d[:rows, :cols])
+        
+        # The blending weight is separable, so its per-pixel total is an outer product
+        row_weight = self._axis_weight_sum(height, row_origins)
+        col_weight = self._axis_weight_sum(width, col_origins)
+        risk_sum, risk_max = 0.0, 0.0
+        for y in range(0, height, tile):
+            band = output[y:y + tile]
+            band /= np.outer(row_weight[y:y + tile], col_weight)
+            risk_sum += float(band.sum(dtype=np.float64))
+            risk_max = max(risk_max, float(band.max()))
+        output.flush()
+        elapsed = time.perf_counter() - start_time
         
         return {
-            'burned_area_hectares': burned_area * 0.25,  # Assuming each cell = 0.25 hectares
-            'fire_perimeter_km': perimeter * 0.05,  # Rough conversion
-            'fire_intensity': np.mean(self.grid[self.grid > 0]),
-            'spread_rate': burned_area  # Simplified spread rate
+            'output_path': output_path,
+            'shape': [height, width],
+            'tile_size': tile,
+            'overlap': self.overlap,
+            'windows': len(windows),
+            'batches': batches,
+            'batch_size': self.batch_size,
+            'backend': self.model.backend.name,
+            'elapsed_seconds': elapsed,
+            'windows_per_second': len(windows) / elapsed if elapsed > 0 else 0.0,
+            'mean_risk': risk_sum / (height * width),
+            'max_risk': risk_max
         }
 
+@dataclass
+class RegionTemporalState:
+    """Rolling frame buffer and carried ConvLSTM state of one region"""
+    frames: np.ndarray
+    head: int = 0
+    count: int = 0
+    steps: int = 0
+    hidden: Optional[np.ndarray] = None
+    cell: Optional[np.ndarray] = None
+    
+    def ordered_frames(self) -> np.ndarray:
+        """Buffered frames from oldest to newest"""
+        if self.count < len(self.frames):
+            return self.frames[:self.count]
+        return np.roll(self.frames, -self.head, axis=0)
+
+class TemporalStateTracker:
+    """Carries ConvLSTM hidden state across real-time ticks, per region
+    
+    Each region keeps a ring buffer of its last sequence_length frames and the
+    ConvLSTM hidden/cell state after the newest one, so advance() costs one
+    recurrent step per region, batched across regions. The buffer is only
+    replayed through the sequence model when a region's state has been dropped
+    (reset_states()), e.g. after the model weights change.
+    """
+    
+    def __init__(self, model: ConvLSTMUNetModel, sequence_length: Optional[int] = None):
+        if model.step_model is None:
+            raise ValueError("Temporal inference requires the Keras backend")
+        self.model = model
+        self.sequence_length = sequence_length or model.sequence_length
+        self.state_shape = tuple(model.step_model.inputs[2].shape[1:])
+        self._zero_state = np.zeros(self.state_shape, dtype=np.float32)
+        self._regions: Dict[str, RegionTemporalState] = {}
+        self._lock = threading.Lock()
+    
+    def _region_state(self, region: str) -> RegionTemporalState:
+        state = self._regions.get(region)
+        if state is None:
+            frames = np.zeros((self.sequence_length,) + tuple(self.model.input_shape), dtype=np.float32)
+            state = self._regions[region] = RegionTemporalState(frames=frames)
+        return state
+    
+    def _warm_start(self, state: RegionTemporalState):
+        """Rebuild a region's hidden state by replaying its buffered frames"""
+        hidden, cell = self.model.sequence_model.predict_on_batch(state.ordered_frames()[np.newaxis])
+        state.hidden = np.asarray(hidden[0], dtype=np.float32)
+        state.cell = np.asarray(cell[0], dtype=np.float32)
+    
+    def advance(self, region_env: Dict[str, Dict], spatial_map: str = 'none',
+                seed: Optional[int] = None) -> Dict[str, Dict]:
+        """Feed one new frame per region and return the per-region predictions"""
+        env_list = list(region_env.values())
+        risk_prob, spatial_risk, temporal = self.step(region_env, seed=seed)
+        
+        predictions = {}
+        for i, region in enumerate(region_env):
+            prediction = self.model.format_prediction(env_list[i], risk_prob[i][0], spatial_risk[i], spatial_map)
+            prediction['temporal'] = temporal[i]
+            predictions[region] = prediction
+        return predictions
+    
+    def step(self, region_env: Dict[str, Dict], seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, List[Dict]]:
+        """One batched recurrent step; returns (risk (N, 1), spatial risk (N, H, W, 1), per-region step info)"""
+        regions = list(region_env)
+        env_list = [region_env[region] for region in regions]
+        processor = self.model.data_processor
+        env_features = np.stack([processor.normalize_features(env) for env in env_list]).astype(np.float32)
+        frames = self.model.spatial_generator.generate_batch(env_list, seed=seed)
+        
+        with self._lock:
+            states = [self._region_state(region) for region in regions]
+            for state in states:
+                if state.hidden is None and state.count:
+                    self._warm_start(state)
+            
+            hidden = np.stack([self._zero_state if s.hidden is None else s.hidden for s in states])
+            cell = np.stack([self._zero_state if s.cell is None else s.cell for s in states])
+            
+            risk_prob, spatial_risk, hidden, cell = self.model.step_model.predict_on_batch(
+                [env_features, frames, hidden, cell]
+            )
+            hidden = np.asarray(hidden, dtype=np.float32)
+            cell = np.asarray(cell, dtype=np.float32)
+            
+            for i, state in enumerate(states):
+                state.hidden, state.cell = hidden[i], cell[i]
+                state.frames[state.head] = frames[i]
+                state.head = (state.head + 1) % self.sequence_length
+                state.count = min(state.count + 1, self.sequence_length)
+                state.steps += 1
+            temporal = [{'steps': s.steps, 'buffered_frames': s.count} for s in states]
+        
+        return np.asarray(risk_prob), np.asarray(spatial_risk), temporal
+    
+    def swap_model(self, model: ConvLSTMUNetModel):
+        """Switch to a reloaded model; carried states are rebuilt from the frame buffers"""
+        with self._lock:
+            self.model = model
+            for state in self._regions.values():
+                state.hidden = state.cell = None
+    
+    def reset_states(self, region: Optional[str] = None):
+        """Drop carried state (all regions by default); the next tick replays the frame buffer"""
+        with self._lock:
+            states = self._regions.values() if region is None else [self._regions.get(region)]
+            for state in states:
+                if state is not None:
+                    state.hidden = state.cell = None
+    
+    def forget(self, region: str) -> bool:
+        """Drop a region's carried state and frame buffer, e.g. when it is no longer tracked"""
+        with self._lock:
+            return self._regions.pop(region, None) is not None
+    
+    def clear(self):
+        """Forget all regions, including their buffered frames"""
+        with self._lock:
+            self._regions.clear()
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'sequence_length': self.sequence_length,
+                'regions': {
+                    region: {'steps': state.steps, 'buffered_frames': state.count,
+                             'has_state': state.hidden is not None}
+                    for region, state in self._regions.items()
+                }
+            }
+
 class NDVIAnalyzer:
     """NDVI Delta calculation and burned area estimation"""
     
@@ -1060,47 +1711,264 @@ class ResourceOptimizationEngine:
         
         return recommendations
 
+class PredictionPipeline:
+    """Prediction flow as a DAG of named stages
+    
+    Each stage declares the stages (or run inputs) it depends on. A run computes
+    only what the requested targets need, each stage at most once, and records
+    the wall time of every stage it executed.
+    """
+    
+    def __init__(self):
+        self.stages = {}  # name -> (function, dependency names)
+    
+    def stage(self, name: str, *dependencies: str):
+        """Decorator registering a stage whose function takes its dependencies positionally"""
+        def register(function):
+            self.stages[name] = (function, dependencies)
+            return function
+        return register
+    
+    def run(self, inputs: Dict, *targets: str) -> 'PipelineRun':
+        run = PipelineRun(self, inputs)
+        for target in targets:
+            run.get(target)
+        return run
+
+class PipelineRun:
+    """Memoized results and per-stage timings of one pipeline evaluation"""
+    
+    def __init__(self, pipeline: PredictionPipeline, inputs: Dict):
+        self.pipeline = pipeline
+        # Inputs may also pre-seed stage results, which are then not recomputed
+        self.results = dict(inputs)
+        self.timings_ms = {}
+    
+    def provide(self, name: str, value):
+        """Supply a stage result computed outside the pipeline, e.g. by a batched model call"""
+        self.results[name] = value
+    
+    def get(self, name: str):
+        if name in self.results:
+            return self.results[name]
+        if name not in self.pipeline.stages:
+            raise KeyError(f"Unknown pipeline stage or input: {name}")
+        
+        function, dependencies = self.pipeline.stages[name]
+        arguments = [self.get(dependency) for dependency in dependencies]
+        # Timed after the dependencies, so each timing covers only the stage itself
+        start = time.perf_counter()
+        result = self.results[name] = function(*arguments)
+        self.timings_ms[name] = (time.perf_counter() - start) * 1000
+        return result
+
 class FireRiskPredictor:
     """Main class that orchestrates all ML components"""
     
-    def __init__(self):
-        self.convlstm_model = ConvLSTMUNetModel()
+    def __init__(self, backend: str = INFERENCE_BACKEND):
+        self._reload_lock = threading.Lock()
+        # Incremented on every reload so cached predictions from older weights are never served
+        self.model_generation = 0
+        self.convlstm_model = ConvLSTMUNetModel(
+            backend=backend, tflite_model_path=TFLITE_MODEL_PATH, tflite_num_threads=TFLITE_NUM_THREADS
+        )
         self.ca_simulator = CellularAutomataFireSpread()
         self.data_processor = DataProcessor()
         self.resource_optimizer = ResourceOptimizationEngine()
         
-        # Simulated model weights (in production, load from trained model)
+        # Stateful per-region inference for the real-time loop (NEURONIX_TEMPORAL_STATE=0 disables it)
+        self.temporal_tracker = None
+        if (self.convlstm_model.step_model is not None and
+                os.environ.get('NEURONIX_TEMPORAL_STATE', '1') != '0'):
+            self.temporal_tracker = TemporalStateTracker(self.convlstm_model)
+        
+        # Trained weights from the weight store, when an artifact has been saved
         self._initialize_pretrained_weights()
+        
+        self.pipeline = self._build_pipeline()
+    
+    def _build_pipeline(self) -> PredictionPipeline:
+        """Stages of a comprehensive prediction; inputs are environmental_data, spatial_map, seed, mc_samples"""
+        pipeline = PredictionPipeline()
+        processor = self.data_processor
+        
+        @pipeline.stage('env_features', 'environmental_data')
+        def env_features(env_data):
+            return processor.normalize_features(env_data).reshape(1, -1).astype(np.float32)
+        
+        @pipeline.stage('fire_weather_index', 'environmental_data')
+        def fire_weather_index(env_data):
+            # Traditional fire weather index
+            return float(processor.calculate_fire_weather_index(
+                env_data['temperature'], env_data['humidity'], env_data['wind_speed']
+            ))
+        
+        @pipeline.stage('spatial_features', 'environmental_data', 'seed')
+        def spatial_features(env_data, seed):
+            # Consumed by ml_prediction within the same run, so the buffer view is safe
+            return self.convlstm_model._synthetic_spatial_into_buffer(env_data, seed=seed)
+        
+        @pipeline.stage('ml_prediction', 'environmental_data', 'env_features', 'spatial_features',
+                        'fire_weather_index', 'spatial_map', 'mc_samples')
+        def ml_prediction(env_data, features, spatial, fwi, spatial_map, mc_samples):
+            # Primary ML prediction
+            return self.convlstm_model.predict_from_features(
+                env_data, features, spatial, fwi=fwi, spatial_map=spatial_map, mc_samples=mc_samples
+            )
+        
+        @pipeline.stage('ensemble_risk', 'ml_prediction', 'fire_weather_index')
+        def ensemble_risk(prediction, fwi):
+            # Combine predictions with ensemble approach
+            return float(prediction['overall_risk'] * 0.7 + fwi * 0.3)
+        
+        pipeline.stage('risk_factors', 'environmental_data')(self._analyze_risk_factors)
+        pipeline.stage('confidence_interval', 'ml_prediction')(self._calculate_confidence)
+        pipeline.stage('recommendations', 'ensemble_risk', 'environmental_data')(self._generate_recommendations)
+        pipeline.stage('factor_weights', 'environmental_data')(self._calculate_factor_weights)
+        
+        @pipeline.stage('risk_assessment', 'ensemble_risk', 'ml_prediction', 'fire_weather_index',
+                        'risk_factors', 'confidence_interval', 'recommendations')
+        def risk_assessment(ensemble, prediction, fwi, factors, confidence, recommendations):
+            return {
+                'ensemble_risk_score': ensemble,
+                'ml_prediction': prediction,
+                'fire_weather_index': fwi,
+                'risk_factors': factors,
+                'confidence_interval': confidence,
+                'recommendations': recommendations
+            }
+        
+        return pipeline
+    
+    @staticmethod
+    def _with_timings(run: PipelineRun) -> Dict:
+        result = dict(run.get('risk_assessment'))
+        result['stage_timings_ms'] = {name: round(ms, 3) for name, ms in run.timings_ms.items()}
+        return result
     
     def _initialize_pretrained_weights(self):
-        """Initialize with simulated pre-trained weights"""
-        # In production, you would load actual trained weights
-        # For demo, we'll use the randomly initialized weights
-        pass
+        """Load trained weights from WEIGHTS_PATH, keeping random weights if there is no artifact"""
+        self.model_info = self._load_weights(self.convlstm_model, WEIGHTS_PATH, required=False)
+        if self.model_info['version'] == 'untrained':
+            print(f"No weight artifact at {WEIGHTS_PATH}, using randomly initialized weights")
     
-    def predict_comprehensive_risk(self, environmental_data: Dict) -> Dict:
-        """Comprehensive fire risk prediction"""
-        # Primary ML prediction
-        ml_prediction = self.convlstm_model.predict_fire_risk(environmental_data)
-        
-        # Traditional fire weather index
-        fwi = self.data_processor.calculate_fire_weather_index(
-            environmental_data['temperature'],
-            environmental_data['humidity'], 
-            environmental_data['wind_speed']
-        )
-        
-        # Combine predictions with ensemble approach
-        ensemble_risk = (ml_prediction['overall_risk'] * 0.7 + fwi * 0.3)
+    def _load_weights(self, model: ConvLSTMUNetModel, source: str, required: bool = True) -> Dict:
+        """Load weights into model and describe the loaded version"""
+        if model.backend.name == 'tflite':
+            # The flatbuffer carries its own weights
+            source = model.backend.model_path
+            info = {'version': os.path.splitext(os.path.basename(source))[0],
+                    'sha256': weight_store.file_sha256(source)}
+        elif weight_store.artifact_exists(source):
+            weights, manifest = weight_store.load_weights(source)
+            # Copies the mapped tensors into the model's variables, private to this process
+            model.model.set_weights(weights)
+            info = {'version': manifest['version'], 'sha256': manifest['sha256']}
+        elif required:
+            raise weight_store.ArtifactNotFound(f"No weight artifact found at {source}")
+        else:
+            source = None
+            info = {'version': 'untrained', 'sha256': None}
         
-        return {
-            'ensemble_risk_score': float(ensemble_risk),
-            'ml_prediction': ml_prediction,
-            'fire_weather_index': float(fwi),
-            'risk_factors': self._analyze_risk_factors(environmental_data),
-            'confidence_interval': self._calculate_confidence(ml_prediction),
-            'recommendations': self._generate_recommendations(ensemble_risk, environmental_data)
-        }
+        info.update(source=source, backend=model.backend.name,
+                    loaded_at=datetime.datetime.now().isoformat())
+        return info
+    
+    def reload_model(self, source: Optional[str] = None) -> Dict:
+        """Atomically swap in a new model version
+        
+        The new model is built and loaded next to the current one and then
+        swapped in with a single assignment, so requests already running finish
+        on the model they started with. source is a weight store directory for
+        the Keras backend or a .tflite file for the TFLite backend.
+        """
+        with self._reload_lock:
+            if self.convlstm_model.backend.name == 'tflite':
+                if not os.path.exists(source or TFLITE_MODEL_PATH):
+                    raise weight_store.ArtifactNotFound(f"No TFLite model found at {source or TFLITE_MODEL_PATH}")
+                model = ConvLSTMUNetModel(backend='tflite', tflite_model_path=source or TFLITE_MODEL_PATH,
+                                          tflite_num_threads=TFLITE_NUM_THREADS)
+            else:
+                model = ConvLSTMUNetModel(backend='keras')
+            info = self._load_weights(model, source or WEIGHTS_PATH)
+            
+            self.convlstm_model = model
+            self.model_info = info
+            self.model_generation += 1
+            if self.temporal_tracker is not None:
+                self.temporal_tracker.swap_model(model)
+        return info
+    
+    def save_weights(self, directory: str = WEIGHTS_PATH, version: Optional[str] = None,
+                     metadata: Optional[Dict] = None) -> Dict:
+        """Save the current Keras weights to the weight store and return the manifest"""
+        keras_model = self.convlstm_model.model
+        if keras_model is None:
+            raise ValueError("Saving weights requires the Keras backend")
+        return weight_store.save_weights(
+            keras_model.get_weights(), directory, names=[w.name for w in keras_model.weights],
+            version=version, metadata=metadata
+        )
+    
+    def predict_comprehensive_risk(self, environmental_data: Dict, spatial_map: str = 'full',
+                                   seed: Optional[int] = None, mc_samples: int = 0) -> Dict:
+        """Comprehensive fire risk prediction"""
+        run = self.pipeline.run({
+            'environmental_data': environmental_data,
+            'spatial_map': spatial_map,
+            'seed': seed,
+            'mc_samples': mc_samples
+        }, 'risk_assessment')
+        return self._with_timings(run)
+    
+    def forget_region(self, region: str):
+        """Release per-region model state for a region that is no longer tracked"""
+        if self.temporal_tracker is not None:
+            self.temporal_tracker.forget(region)
+    
+    def predict_regional_risk(self, region_env: Dict[str, Dict], spatial_map: str = 'none',
+                              executor=None) -> Dict[str, Dict]:
+        """Comprehensive predictions for several regions from one batched model call
+        
+        With the temporal tracker each region's ConvLSTM state advances by one
+        frame; otherwise the regions are scored statelessly in one batch. The
+        per-region stages after inference run on executor when one is given.
+        """
+        regions = list(region_env)
+        env_list = [region_env[region] for region in regions]
+        model = self.convlstm_model
+        
+        start = time.perf_counter()
+        if self.temporal_tracker is not None:
+            risk_prob, spatial_risk, temporal = self.temporal_tracker.step(region_env)
+        else:
+            risk_prob, spatial_risk = model.predict_batch(env_list)
+            temporal = None
+        inference_ms = (time.perf_counter() - start) * 1000
+        
+        def assess(i: int) -> Dict:
+            run = self.pipeline.run({'environmental_data': env_list[i]}, 'fire_weather_index')
+            ml_prediction = model.format_prediction(
+                env_list[i], risk_prob[i][0], spatial_risk[i], spatial_map, fwi=run.get('fire_weather_index')
+            )
+            if temporal is not None:
+                ml_prediction['temporal'] = temporal[i]
+            run.provide('ml_prediction', ml_prediction)
+            run.timings_ms['batched_inference'] = inference_ms
+            return self._with_timings(run)
+        
+        assessments = executor.map(assess, range(len(regions))) if executor else map(assess, range(len(regions)))
+        return dict(zip(regions, assessments))
+    
+    def explain_factors(self, environmental_data: Dict) -> Dict:
+        """Factor weights, risk factors and FWI for explanations, without running the model"""
+        run = self.pipeline.run({'environmental_data': environmental_data},
+                                'factor_weights', 'risk_factors', 'fire_weather_index')
+        explanation = dict(run.get('factor_weights'))
+        explanation['risk_factors'] = run.get('risk_factors')
+        explanation['fire_weather_index'] = run.get('fire_weather_index')
+        explanation['stage_timings_ms'] = {name: round(ms, 3) for name, ms in run.timings_ms.items()}
+        return explanation
     
     def simulate_fire_spread(self, ignition_point: Tuple[int, int], 
                            environmental_data: Dict, duration_hours: int = 6) -> Dict:
@@ -1108,36 +1976,9 @@ class FireRiskPredictor:
         # Initialize fire
         self.ca_simulator.ignite_fire(ignition_point[0], ignition_point[1])
         
-        # Convert wind direction string to degrees
-        wind_dir_map = {'N': 0, 'NE': 45, 'E': 90, 'SE': 135, 'S': 180, 'SW': 225, 'W': 270, 'NW': 315}
-        wind_direction_deg = wind_dir_map.get(environmental_data['wind_direction'], 0)
-        
-        simulation_results = []
-        
         # Run simulation for specified duration
-        for hour in range(duration_hours):
-            # Simulate hourly variations
-            temp_variation = environmental_data['temperature'] + np.random.normal(0, 2)
-            humidity_variation = max(10, environmental_data['humidity'] + np.random.normal(0, 5))
-            wind_variation = max(0, environmental_data['wind_speed'] + np.random.normal(0, 3))
-            
-            # Perform spread step
-            metrics = self.ca_simulator.spread_step(
-                wind_variation, wind_direction_deg, temp_variation, humidity_variation
-            )
-            
-            metrics['hour'] = hour
-            metrics['temperature'] = temp_variation
-            metrics['humidity'] = humidity_variation
-            metrics['wind_speed'] = wind_variation
-            
-            simulation_results.append(metrics)
-        
-        return {
-            'hourly_progression': simulation_results,
-            'final_state': simulation_results[-1] if simulation_results else {},
-            'fire_map': self.ca_simulator.grid.tolist()
-        }
+        simulation_results = spread_hours(self.ca_simulator, environmental_data, 0, duration_hours)
+        return fire_spread_result(self.ca_simulator, simulation_results)
     
     def _analyze_risk_factors(self, env_data: Dict) -> Dict:
         """Analyze individual risk factors"""
@@ -1169,14 +2010,51 @@ class FireRiskPredictor:
         
         return factors
     
+    def _calculate_factor_weights(self, env_data: Dict) -> Dict:
+        """Relative contribution of wind, dryness, slope and temperature to fire behavior"""
+        # Calculate factor weights using realistic fire behavior models
+        wind_weight = min(60, env_data['wind_speed'] * 2.5)
+        dryness_weight = min(50, (100 - env_data['humidity']) * 0.7)
+        slope_weight = min(30, env_data['slope'] * 1.8)
+        temp_weight = min(25, max(0, (env_data['temperature'] - 20) * 0.8))
+        
+        total_weight = wind_weight + dryness_weight + slope_weight + temp_weight
+        
+        # Normalize to percentages
+        factor_weights = {
+            'wind': round((wind_weight / total_weight) * 100, 1),
+            'dryness': round((dryness_weight / total_weight) * 100, 1),
+            'slope': round((slope_weight / total_weight) * 100, 1),
+            'temperature': round((temp_weight / total_weight) * 100, 1)
+        }
+        
+        return {
+            'factor_weights': factor_weights,
+            'dominant_factor': max(factor_weights.items(), key=lambda x: x[1])[0],
+            # Calculate confidence score
+            'confidence_score': min(95, max(65, 85 + (total_weight - 120) * 0.12))
+        }
+    
     def _calculate_confidence(self, prediction: Dict) -> Dict:
         """Calculate prediction confidence intervals"""
+        uncertainty = prediction.get('uncertainty')
+        if uncertainty is not None:
+            # Model uncertainty from MC dropout: a narrower interval means higher confidence
+            return {
+                'lower_bound': uncertainty['lower_bound'],
+                'upper_bound': uncertainty['upper_bound'],
+                'confidence_level': max(0.0, 1 - (uncertainty['upper_bound'] - uncertainty['lower_bound'])),
+                'std': uncertainty['std'],
+                'method': 'mc_dropout'
+            }
+        
         base_confidence = prediction['confidence']
         
         return {
             'lower_bound': max(0, prediction['overall_risk'] - (1 - base_confidence) * 0.2),
             'upper_bound': min(1, prediction['overall_risk'] + (1 - base_confidence) * 0.2),
-            'confidence_level': base_confidence
+            'confidence_level': base_confidence,
+            'method': 'heuristic'
         }
     
     def _generate_recommendations(self, risk_score: float, env_data: Dict) -> List[str]:
@@ -1268,24 +2146,611 @@ class FireRiskPredictor:
         else:
             return 'stable'
 
+class TTLLRUCache:
+    """Thread-safe LRU cache with per-entry TTL, bounded size and hit-rate statistics"""
+    
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+    
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries if full"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            # Compute outside the lock so slow misses don't block cache hits
+            value = compute()
+            self.put(key, value)
+        return value
+    
+    def clear(self):
+        """Drop all entries (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        """Return cache size and hit-rate statistics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+class PredictionCache:
+    """Memoizes comprehensive predictions keyed on quantized environmental inputs
+    
+    Numeric inputs are bucketed by the configured step sizes, categorical inputs
+    are matched exactly. Predictions are computed on the bucket centers, not on
+    the first caller's raw values, and the synthetic spatial input is seeded, so
+    a cached prediction is exactly what a fresh pass would return for the key
+    whatever order requests arrive in.
+    
+    MC dropout predictions (mc_samples > 0) are never cached: the dropout draws
+    are not seeded, so every request gets its own samples.
+    """
+    
+    DEFAULT_QUANTIZATION = {
+        'temperature': 0.5,   # °C
+        'humidity': 1.0,      # %
+        'wind_speed': 0.5,    # km/h
+        'ndvi': 0.01,
+        'elevation': 10.0,    # m
+        'slope': 0.5          # degrees
+    }
+    
+    CATEGORICAL_FIELDS = ('wind_direction', 'vegetation_density')
+    
+    # Describe the computation rather than the prediction: returned on the miss that
+    # computed them, never stored in (and served from) an entry
+    PER_REQUEST_FIELDS = ('stage_timings_ms',)
+    
+    def __init__(self, predict_fn, quantization: Optional[Dict] = None, max_size: int = 1024,
+                 ttl_seconds: float = 300.0, default_seed: int = 0, version_fn=None):
+        self.predict_fn = predict_fn
+        # Part of every key, so entries computed by an older model version never hit
+        self.version_fn = version_fn
+        self.quantization = dict(self.DEFAULT_QUANTIZATION)
+        self.quantization.update(quantization or {})
+        self.default_seed = default_seed
+        self.cache = TTLLRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.bypassed = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.cache.max_size > 0
+    
+    def _buckets(self, environmental_data: Dict) -> Tuple:
+        return tuple(
+            None if environmental_data.get(field) is None
+            else int(round(float(environmental_data[field]) / step))
+            for field, step in sorted(self.quantization.items())
+        )
+    
+    def quantize(self, environmental_data: Dict) -> Dict:
+        """Copy of environmental_data with every quantized field moved to its bucket center"""
+        quantized = dict(environmental_data)
+        for (field, step), bucket in zip(sorted(self.quantization.items()), self._buckets(environmental_data)):
+            if bucket is not None:
+                quantized[field] = bucket * step
+        return quantized
+    
+    def make_key(self, environmental_data: Dict, spatial_map: str, seed: int, mc_samples: int = 0) -> Tuple:
+        """Build the cache key from quantized inputs and request options"""
+        categorical = tuple(environmental_data.get(field) for field in self.CATEGORICAL_FIELDS)
+        version = self.version_fn() if self.version_fn else None
+        return self._buckets(environmental_data) + categorical + (spatial_map, seed, mc_samples, version)
+    
+    def predict(self, environmental_data: Dict, spatial_map: str = 'full',
+                seed: Optional[int] = None, mc_samples: int = 0) -> Dict:
+        """Return a (possibly cached) prediction, as a copy the caller may modify"""
+        if not self.enabled or mc_samples > 0:
+            if self.enabled:
+                self.bypassed += 1
+            return self.predict_fn(environmental_data, spatial_map=spatial_map, seed=seed,
+                                   mc_samples=mc_samples)
+        
+        if seed is None:
+            seed = self.default_seed
+        key = self.make_key(environmental_data, spatial_map, seed, mc_samples)
+        quantized = self.quantize(environmental_data)
+        per_request = {}
+        
+        def compute():
+            prediction = self.predict_fn(quantized, spatial_map=spatial_map, seed=seed, mc_samples=mc_samples)
+            for field in self.PER_REQUEST_FIELDS:
+                if field in prediction:
+                    per_request[field] = prediction.pop(field)
+            return prediction
+        
+        # The cached entry is shared between callers
+        prediction = copy.deepcopy(self.cache.get_or_compute(key, compute))
+        prediction.update(per_request)
+        return prediction
+    
+    def clear(self):
+        self.cache.clear()
+    
+    def get_stats(self) -> Dict:
+        stats = self.cache.get_stats()
+        stats['enabled'] = self.enabled
+        stats['quantization'] = dict(self.quantization)
+        stats['default_seed'] = self.default_seed
+        stats['bypassed'] = self.bypassed
+        return stats
+
+class RiskAdaptiveScheduler:
+    """Priority-queue refresh scheduler that spends a fixed compute budget per tick
+    
+    Regions sit in a min-heap keyed on their next due time. Each tick hands out
+    at most budget_per_tick due regions, most overdue first, so the model cost
+    per tick stays bounded however many regions are tracked. After a refresh,
+    a region's next interval follows its risk: high risk refreshes every
+    min_interval seconds, lower risk backs off (doubling at most per refresh)
+    towards max_interval, and a rise in risk shortens the interval immediately.
+    """
+    
+    def __init__(self, regions: List[str], min_interval: float = 15.0, max_interval: float = 300.0,
+                 budget_per_tick: int = 8, tick_seconds: float = 5.0, max_regions: Optional[int] = None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.budget_per_tick = budget_per_tick
+        self.tick_seconds = tick_seconds
+        self.max_regions = max_regions
+        self._heap = []  # (due_at, sequence, region)
+        self._sequence = 0
+        self._regions = {}  # region -> interval, due_at, last_risk, refreshes
+        self._in_flight = set()  # handed out by next_batch, not yet completed
+        self._lock = threading.Lock()
+        self._last_tick = None
+        self.ticks = 0
+        self.refreshes = 0
+        self.deferred = 0
+        
+        now = time.monotonic()
+        for region in regions:
+            self.add_region(region, now)
+    
+    def _push(self, region: str, due_at: float):
+        self._sequence += 1
+        self._regions[region]['due_at'] = due_at
+        heapq.heappush(self._heap, (due_at, self._sequence, region))
+    
+    def add_region(self, region: str, now: Optional[float] = None) -> bool:
+        """Track a region, due immediately; False if max_regions are already tracked"""
+        with self._lock:
+            if region not in self._regions:
+                if self.max_regions is not None and len(self._regions) >= self.max_regions:
+                    return False
+                self._regions[region] = {'interval': self.min_interval, 'due_at': 0.0,
+                                         'last_risk': None, 'refreshes': 0}
+                self._push(region, time.monotonic() if now is None else now)
+            return True
+    
+    def remove_region(self, region: str) -> bool:
+        """Stop tracking a region; its heap entries are skipped lazily"""
+        with self._lock:
+            self._in_flight.discard(region)
+            return self._regions.pop(region, None) is not None
+    
+    def interval_for(self, risk: float) -> float:
+        """Target refresh interval for a risk score in [0, 1]"""
+        risk = min(max(float(risk), 0.0), 1.0)
+        # Quadratic so moderate risk stays close to min_interval
+        return self.min_interval + (self.max_interval - self.min_interval) * (1 - risk) ** 2
+    
+    def next_batch(self, now: Optional[float] = None) -> List[str]:
+        """Pop the regions to refresh this tick, at most budget_per_tick of them"""
+        now = time.monotonic() if now is None else now
+        batch = []
+        with self._lock:
+            self.ticks += 1
+            while self._heap and len(batch) < self.budget_per_tick and self._heap[0][0] <= now:
+                due_at, _, region = heapq.heappop(self._heap)
+                # Skip heap entries of removed regions or superseded by a later reschedule
+                entry = self._regions.get(region)
+                if entry is not None and entry['due_at'] == due_at:
+                    batch.append(region)
+                    self._in_flight.add(region)
+                    # Already due at the previous tick, so the budget pushed it back at least once
+                    if self._last_tick is not None and due_at <= self._last_tick:
+                        self.deferred += 1
+            self._last_tick = now
+        return batch
+    
+    def complete(self, region: str, risk: float, now: Optional[float] = None) -> bool:
+        """Reschedule a refreshed region from its new risk score; False if it is no longer tracked"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._in_flight.discard(region)
+            entry = self._regions.get(region)
+            if entry is None:
+                return False
+            target = self.interval_for(risk)
+            # Back off gradually, tighten immediately
+            entry['interval'] = min(target, entry['interval'] * 2) if target > entry['interval'] else target
+            entry['last_risk'] = float(risk)
+            entry['refreshes'] += 1
+            self.refreshes += 1
+            self._push(region, now + entry['interval'])
+            return True
+    
+    def retry(self, regions: List[str], delay: float = 10.0):
+        """Put regions whose refresh failed back in the queue
+        
+        Regions of the batch that were already completed keep their new
+        schedule, so a failure part way through a batch never queues them twice.
+        """
+        with self._lock:
+            for region in regions:
+                if region in self._in_flight:
+                    self._in_flight.discard(region)
+                    if region in self._regions:
+                        self._push(region, time.monotonic() + delay)
+    
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'regions': len(self._regions),
+                'max_regions': self.max_regions,
+                'budget_per_tick': self.budget_per_tick,
+                'tick_seconds': self.tick_seconds,
+                'ticks': self.ticks,
+                'refreshes': self.refreshes,
+                'refreshes_per_tick': self.refreshes / self.ticks if self.ticks else 0.0,
+                # Refreshes that had to wait at least one tick past their due time because of the budget
+                'deferred': self.deferred,
+                'schedule': {
+                    region: {
+                        'interval_seconds': round(entry['interval'], 1),
+                        'due_in_seconds': round(max(0.0, entry['due_at'] - now), 1),
+                        'last_risk': entry['last_risk'],
+                        'refreshes': entry['refreshes']
+                    }
+                    for region, entry in sorted(self._regions.items(), key=lambda item: item[1]['due_at'])
+                }
+            }
+
+class FixedRateTicker:
+    """Fixed-rate tick clock on absolute deadlines, with timing metrics
+    
+    Deadlines sit on a fixed grid (first tick + k * period), so tick work does
+    not push later ticks back. When a tick overruns past one or more deadlines,
+    the missed ticks are coalesced into a single immediate tick and counted as
+    skipped, then the clock continues on the grid. Duration and lag (start
+    delay past the deadline) are kept for the last window ticks.
+    """
+    
+    def __init__(self, period: float, window: int = 256):
+        self.period = period
+        self._deadline = None
+        self._durations = deque(maxlen=window)
+        self._lags = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_error = None
+    
+    def wait(self) -> float:
+        """Sleep until the next deadline and return the tick's start time"""
+        now = time.monotonic()
+        if self._deadline is None:
+            deadline = now
+        else:
+            deadline = self._deadline + self.period
+            if now > deadline + self.period:
+                # Coalesce every deadline already missed into one tick at the latest of them
+                missed = int((now - deadline) // self.period)
+                deadline += missed * self.period
+                with self._lock:
+                    self.skipped += missed
+        self._deadline = deadline
+        
+        if deadline > now:
+            time.sleep(deadline - now)
+        start = time.monotonic()
+        with self._lock:
+            self._lags.append(start - deadline)
+        return start
+    
+    def complete(self, start: float):
+        duration = time.monotonic() - start
+        with self._lock:
+            self.ticks += 1
+            self._durations.append(duration)
+            if duration > self.period:
+                self.overruns += 1
+    
+    def record_error(self, error: Exception):
+        with self._lock:
+            self.errors += 1
+            self.last_error = {'type': type(error).__name__, 'message': str(error),
+                               'time': datetime.datetime.now().isoformat()}
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            durations = np.array(self._durations) * 1000
+            lags = np.array(self._lags) * 1000
+            stats = {
+                'period_seconds': self.period,
+                'ticks': self.ticks,
+                'overruns': self.overruns,
+                'skipped_ticks': self.skipped,
+                'errors': self.errors,
+                'last_error': self.last_error
+            }
+        if len(durations):
+            stats['duration_ms'] = {
+                'last': float(durations[-1]), 'mean': float(durations.mean()),
+                'p95': float(np.percentile(durations, 95)), 'max': float(durations.max())
+            }
+            # Share of the period spent computing; close to 1 means the interval is too short
+            stats['utilization'] = float(durations.mean() / (self.period * 1000))
+        if len(lags):
+            stats['lag_ms'] = {'last': float(lags[-1]), 'mean': float(lags.mean()), 'max': float(lags.max())}
+        return stats
+
+class RegionHistoryBuffer:
+    """Fixed-size ring buffer of timestamped samples for one region
+    
+    Samples live in preallocated NumPy arrays (a float64 timestamp column and a
+    float32 value matrix), so memory is constant and appends never allocate.
+    Timestamps are non-decreasing in ring order, which lets window queries
+    binary-search the two contiguous halves of the ring and copy only the
+    samples they return.
+    """
+    
+    def __init__(self, capacity: int, columns: Tuple[str, ...]):
+        self.capacity = capacity
+        self.columns = columns
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._values = np.zeros((capacity, len(columns)), dtype=np.float32)
+        self._head = 0  # next slot to write
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, timestamp: float, values: np.ndarray):
+        with self._lock:
+            self._timestamps[self._head] = timestamp
+            self._values[self._head] = values
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+    
+    def window(self, start: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) of samples at or after start, oldest first"""
+        with self._lock:
+            if self._count < self.capacity:
+                segments = [slice(0, self._count)]
+            else:
+                # Oldest samples run from head to the end, newest from 0 to head
+                segments = [slice(self._head, self.capacity), slice(0, self._head)]
+            
+            timestamps, values = [], []
+            for segment in segments:
+                segment_timestamps = self._timestamps[segment]
+                offset = np.searchsorted(segment_timestamps, start, side='left')
+                timestamps.append(segment_timestamps[offset:].copy())
+                values.append(self._values[segment][offset:].copy())
+        
+        return np.concatenate(timestamps), np.concatenate(values)
+
+class RiskHistoryStore:
+    """Per-region risk history for trend charts, with bucketed downsampling"""
+    
+    COLUMNS = ('risk', 'temperature', 'humidity', 'wind_speed', 'ndvi', 'slope')
+    
+    def __init__(self, capacity: int = 5760):
+        self.capacity = capacity
+        self._buffers = {}
+        self._lock = threading.Lock()
+    
+    def record(self, region: str, risk: float, environmental_data: Dict, timestamp: Optional[float] = None):
+        buffer = self._buffers.get(region)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.setdefault(region, RegionHistoryBuffer(self.capacity, self.COLUMNS))
+        values = np.array([risk] + [float(environmental_data.get(column, np.nan)) for column in self.COLUMNS[1:]],
+                          dtype=np.float32)
+        buffer.append(time.time() if timestamp is None else timestamp, values)
+    
+    def remove(self, region: str):
+        with self._lock:
+            self._buffers.pop(region, None)
+    
+    def regions(self) -> List[str]:
+        return list(self._buffers)
+    
+    def query(self, region: str, hours: float = 24.0, buckets: Optional[int] = None,
+              columns: Optional[List[str]] = None, now: Optional[float] = None) -> Optional[Dict]:
+        """Columnar history for the last hours, raw or downsampled into buckets
+        
+        Raw results map each column to a list of samples. Downsampled results
+        split the window into equal time buckets and map each column to its
+        per-bucket min, max and mean; empty buckets are omitted.
+        """
+        buffer = self._buffers.get(region)
+        if buffer is None:
+            return None
+        
+        columns = list(columns or self.COLUMNS)
+        unknown = [column for column in columns if column not in self.COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown history columns: {', '.join(unknown)}")
+        indices = [self.COLUMNS.index(column) for column in columns]
+        
+        end = time.time() if now is None else now
+        start = end - hours * 3600
+        timestamps, values = buffer.window(start)
+        values = values[:, indices]
+        
+        result = {'region': region, 'start': start, 'end': end, 'samples': int(len(timestamps))}
+        if not buckets or len(timestamps) == 0:
+            result['timestamps'] = timestamps.tolist()
+            result['series'] = {column: self._to_list(values[:, i]) for i, column in enumerate(columns)}
+            return result
+        
+        # Samples are time-ordered, so bucket ids are non-decreasing and reduceat works on runs
+        width = (end - start) / buckets
+        bucket_ids = np.minimum(((timestamps - start) / width).astype(np.int64), buckets - 1)
+        starts = np.flatnonzero(np.r_[True, bucket_ids[1:] != bucket_ids[:-1]])
+        counts = np.diff(np.r_[starts, len(timestamps)])
+        
+        sums = np.add.reduceat(values, starts, axis=0)
+        minimums = np.minimum.reduceat(values, starts, axis=0)
+        maximums = np.maximum.reduceat(values, starts, axis=0)
+        means = sums / counts[:, None]
+        
+        result['bucket_seconds'] = width
+        result['timestamps'] = (start + bucket_ids[starts] * width).tolist()
+        result['counts'] = counts.tolist()
+        result['series'] = {
+            column: {'min': self._to_list(minimums[:, i]), 'max': self._to_list(maximums[:, i]),
+                     'mean': self._to_list(means[:, i])}
+            for i, column in enumerate(columns)
+        }
+        return result
+    
+    @staticmethod
+    def _to_list(column: np.ndarray) -> List[Optional[float]]:
+        # float32 storage noise is rounded away; missing inputs become null rather than invalid JSON NaN
+        column = np.round(column.astype(np.float64), 6)
+        if np.isnan(column).any():
+            return [None if np.isnan(value) else value for value in column.tolist()]
+        return column.tolist()
+    
+    def get_stats(self) -> Dict:
+        buffers = list(self._buffers.values())
+        return {
+            'regions': len(buffers),
+            'capacity_per_region': self.capacity,
+            'samples': sum(len(buffer) for buffer in buffers),
+            'memory_bytes': sum(buffer._timestamps.nbytes + buffer._values.nbytes for buffer in buffers)
+        }
+
+def _parse_quantization(spec: str) -> Dict:
+    """Parse 'temperature=0.5,humidity=1' into a step-size dict"""
+    steps = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        field, _, step = item.partition('=')
+        steps[field.strip()] = float(step)
+    return steps
+
 # Global model instance
 fire_predictor = FireRiskPredictor()
 
-def get_model_predictions(environmental_data: Dict) -> Dict:
+# Prediction cache (NEURONIX_PREDICTION_CACHE_SIZE=0 disables it)
+prediction_cache = PredictionCache(
+    fire_predictor.predict_comprehensive_risk,
+    quantization=_parse_quantization(os.environ.get('NEURONIX_PREDICTION_QUANTIZATION', '')),
+    max_size=int(os.environ.get('NEURONIX_PREDICTION_CACHE_SIZE', 1024)),
+    ttl_seconds=float(os.environ.get('NEURONIX_PREDICTION_CACHE_TTL', 300)),
+    default_seed=int(os.environ.get('NEURONIX_PREDICTION_CACHE_SEED', 0)),
+    version_fn=lambda: fire_predictor.model_generation
+)
+
+def get_model_predictions(environmental_data: Dict, spatial_map: str = 'full',
+                          seed: Optional[int] = None, mc_samples: int = 0) -> Dict:
     """Main function to get comprehensive fire risk predictions"""
-    return fire_predictor.predict_comprehensive_risk(environmental_data)
+    return prediction_cache.predict(environmental_data, spatial_map=spatial_map, seed=seed,
+                                    mc_samples=mc_samples)
 
-def simulate_fire_scenario(lat: float, lng: float, env_data: Dict) -> Dict:
-    """Simulate fire spread scenario at given coordinates"""
-    # Convert lat/lng to grid coordinates (simplified)
+# Fan-out pool for per-region work after the batched model call
+region_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('NEURONIX_REGION_WORKERS', 4)), thread_name_prefix='region'
+)
+
+# Background fire spread simulations (/api/ml/simulate/jobs). Under serve.py every
+# worker uses the job server's manager instead (simulation_server.py)
+simulation_jobs = simulation_server.client() or simulation_server.local_jobs()
+
+def get_regional_predictions(region_env: Dict[str, Dict], spatial_map: str = 'none') -> Dict[str, Dict]:
+    """Predictions for one real-time tick over several regions
+    
+    All regions are scored in one batched model call: a stateful ConvLSTM step
+    when available, otherwise a stateless batch (e.g. on the TFLite backend).
+    """
+    return fire_predictor.predict_regional_risk(region_env, spatial_map=spatial_map, executor=region_executor)
+
+def explain_fire_factors(environmental_data: Dict) -> Dict:
+    """Factor weights and risk factors shared with the prediction pipeline"""
+    return fire_predictor.explain_factors(environmental_data)
+
+def check_model_artifact() -> Dict:
+    """Verify the configured weights without building a model; returns their version
+    
+    Raises ArtifactNotFound, or ValueError for a weights file failing its checksum.
+    """
+    if fire_predictor.convlstm_model.backend.name == 'tflite':
+        if not os.path.exists(TFLITE_MODEL_PATH):
+            raise weight_store.ArtifactNotFound(f"No TFLite model found at {TFLITE_MODEL_PATH}")
+        return {'version': os.path.splitext(os.path.basename(TFLITE_MODEL_PATH))[0]}
+    if not weight_store.artifact_exists(WEIGHTS_PATH):
+        raise weight_store.ArtifactNotFound(f"No weight artifact found at {WEIGHTS_PATH}")
+    _, manifest = weight_store.load_weights(WEIGHTS_PATH)
+    return {'version': manifest['version'], 'sha256': manifest['sha256']}
+
+def reload_model(source: Optional[str] = None) -> Dict:
+    """Hot-reload the model weights and drop predictions made by the previous version"""
+    info = fire_predictor.reload_model(source)
+    prediction_cache.clear()
+    return info
+
+def ignition_cell(lat: float, lng: float, grid_size: int = 100) -> Tuple[int, int]:
+    """Convert lat/lng to simulation grid coordinates (simplified)"""
     grid_x = int((lat - 29.0) * 50)  # Rough conversion for Uttarakhand region
     grid_y = int((lng - 79.0) * 50)
     
     # Ensure coordinates are within grid bounds
-    grid_x = max(0, min(99, grid_x))
-    grid_y = max(0, min(99, grid_y))
-    
-    return fire_predictor.simulate_fire_spread((grid_x, grid_y), env_data)
+    return max(0, min(grid_size - 1, grid_x)), max(0, min(grid_size - 1, grid_y))
+
+def simulate_fire_scenario(lat: float, lng: float, env_data: Dict) -> Dict:
+    """Simulate fire spread scenario at given coordinates"""
+    return fire_predictor.simulate_fire_spread(ignition_cell(lat, lng), env_data)
 
 def optimize_resource_deployment(risk_data: Dict, available_resources: Dict) -> Dict:
     """Optimize resource deployment for maximum coverage and minimum response time"""
@@ -0,0 +1,99 @@
+"""One real-time predictor shared by all pre-forked workers
+
+serve.py forks a predictor process next to its workers and calls configure()
+before forking them. That process runs the RealTimePredictor loop with its own
+model. ml_api then gives each worker a RealTimeFollower instead of a predictor
+of its own, which mirrors the predictor's snapshots and stream events and
+forwards region changes to it. The refresh budget therefore applies once per
+deployment, and every worker serves the same versions, ETags, ?since= deltas
+and event ids.
+"""
+import os
+import threading
+from multiprocessing.managers import BaseManager, RemoteError
+from typing import Dict, List, Optional
+
+PREDICTOR_METHODS = ('start_continuous_prediction', 'add_region', 'remove_region',
+                     'query_history', 'get_stats', 'changes')
+
+# Unix socket and authkey of the predictor process; None runs the predictor in this process
+address: Optional[str] = None
+authkey: Optional[bytes] = None
+
+_predictor = None
+
+def served_predictor():
+    """The RealTimePredictor this process serves"""
+    return _predictor
+
+class RealTimeServer(BaseManager):
+    """Exposes the predictor process's RealTimePredictor as predictor()"""
+
+RealTimeServer.register('predictor', callable=served_predictor, exposed=PREDICTOR_METHODS)
+
+def configure(server_address: Optional[str], server_authkey: Optional[bytes]):
+    """Point this process, and the workers forked from it, at the predictor process"""
+    global address, authkey
+    address, authkey = server_address, server_authkey
+
+def serve(server_address: str, server_authkey: bytes, predictor):
+    """Serve predictor to the workers from this process until it is stopped"""
+    global _predictor
+    _predictor = predictor
+    if os.path.exists(server_address):
+        os.unlink(server_address)  # Left behind by a predictor process that was killed
+    RealTimeServer(address=server_address, authkey=server_authkey).get_server().serve_forever()
+
+class RealTimeClient:
+    """The RealTimePredictor interface, served by the predictor process
+    
+    After a connection error the next call reconnects, e.g. to a restarted
+    predictor process.
+    """
+    
+    def __init__(self, server_address: str, server_authkey: bytes):
+        self.address = server_address
+        self.authkey = server_authkey
+        self._proxy = None
+        self._lock = threading.Lock()
+    
+    def _predictor(self):
+        with self._lock:
+            if self._proxy is None:
+                manager = RealTimeServer(address=self.address, authkey=self.authkey)
+                manager.connect()
+                self._proxy = manager.predictor()
+            return self._proxy
+    
+    def _call(self, method: str, *args):
+        proxy = self._predictor()
+        try:
+            return getattr(proxy, method)(*args)
+        except (OSError, EOFError, RemoteError):
+            with self._lock:
+                if self._proxy is proxy:
+                    self._proxy = None
+            raise
+    
+    def start_continuous_prediction(self):
+        return self._call('start_continuous_prediction')
+    
+    def add_region(self, region: str) -> bool:
+        return self._call('add_region', region)
+    
+    def remove_region(self, region: str) -> bool:
+        return self._call('remove_region', region)
+    
+    def query_history(self, region: str, hours: float = 24.0, buckets: int = None,
+                      columns: List[str] = None) -> Optional[Dict]:
+        return self._call('query_history', region, hours, buckets, columns)
+    
+    def get_stats(self) -> Dict:
+        return self._call('get_stats')
+    
+    def changes(self, epoch: str, version: int, last_event_id: int, timeout: float) -> Dict:
+        return self._call('changes', epoch, version, last_event_id, timeout)
+
+def client() -> Optional[RealTimeClient]:
+    """Client for the configured predictor process, or None outside serve.py"""
+    return RealTimeClient(address, authkey) if address else None
@@ -0,0 +1,83 @@
+
+"""TensorFlow runtime profile: thread pools, numeric precision and oneDNN
+
+The profile is read from environment variables so that every entry point
+(ml_api.py, serve.py workers, benchmark subprocesses) configures TensorFlow the
+same way:
+
+    NEURONIX_INTRA_OP_THREADS   threads used inside a single op (0 = TF default)
+    NEURONIX_INTER_OP_THREADS   ops run concurrently (0 = TF default)
+    NEURONIX_PRECISION          'float32' or 'mixed_bfloat16'
+    NEURONIX_ONEDNN             '1'/'0' to force oneDNN kernels on/off (unset = TF default)
+
+apply_environment() must run before TensorFlow is imported, because oneDNN and
+the thread pools are fixed when TensorFlow initializes.
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+PRECISIONS = ('float32', 'mixed_bfloat16')
+
+@dataclass
+class RuntimeProfile:
+    """Runtime settings for TensorFlow inference in one process"""
+    intra_op_threads: int = 0
+    inter_op_threads: int = 0
+    precision: str = 'float32'
+    onednn: Optional[bool] = None
+    
+    def __post_init__(self):
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision '{self.precision}', expected one of {PRECISIONS}")
+    
+    @classmethod
+    def from_env(cls, environ=None) -> 'RuntimeProfile':
+        """Build a profile from NEURONIX_* environment variables"""
+        environ = os.environ if environ is None else environ
+        onednn = environ.get('NEURONIX_ONEDNN')
+        return cls(
+            intra_op_threads=int(environ.get('NEURONIX_INTRA_OP_THREADS', 0)),
+            inter_op_threads=int(environ.get('NEURONIX_INTER_OP_THREADS', 0)),
+            precision=environ.get('NEURONIX_PRECISION', 'float32'),
+            onednn=None if onednn in (None, '') else onednn.lower() in ('1', 'true', 'on', 'yes')
+        )
+    
+    def to_env(self) -> Dict[str, str]:
+        """Environment variables that reproduce this profile in a child process"""
+        env = {
+            'NEURONIX_INTRA_OP_THREADS': str(self.intra_op_threads),
+            'NEURONIX_INTER_OP_THREADS': str(self.inter_op_threads),
+            'NEURONIX_PRECISION': self.precision
+        }
+        if self.onednn is not None:
+            env['NEURONIX_ONEDNN'] = '1' if self.onednn else '0'
+        return env
+    
+    def apply_environment(self):
+        """Set the TensorFlow variables that are only read at import time"""
+        if self.onednn is not None:
+            os.environ['TF_ENABLE_ONEDNN_OPTS'] = '1' if self.onednn else '0'
+        if self.intra_op_threads:
+            os.environ['TF_NUM_INTRAOP_THREADS'] = str(self.intra_op_threads)
+            # oneDNN kernels use OpenMP, which otherwise grabs every core
+            os.environ['OMP_NUM_THREADS'] = str(self.intra_op_threads)
+        if self.inter_op_threads:
+            os.environ['TF_NUM_INTEROP_THREADS'] = str(self.inter_op_threads)
+    
+    def apply_tensorflow(self, tf):
+        """Configure thread pools and the Keras precision policy on an imported TensorFlow"""
+        if self.intra_op_threads:
+            tf.config.threading.set_intra_op_parallelism_threads(self.intra_op_threads)
+        if self.inter_op_threads:
+            tf.config.threading.set_inter_op_parallelism_threads(self.inter_op_threads)
+        # Must happen before any model is built
+        tf.keras.mixed_precision.set_global_policy(self.precision)
+    
+    def describe(self) -> Dict:
+        return {
+            'intra_op_threads': self.intra_op_threads or 'default',
+            'inter_op_threads': self.inter_op_threads or 'default',
+            'precision': self.precision,
+            'onednn': 'default' if self.onednn is None else self.onednn
+        }
@@ -12,6 +12,8 @@ let deploymentLayers = [];
 const ML_API_BASE = window.location.origin.replace(':5000', ':5001');
 let mlPredictions = {};
 let realTimeUpdates = false;
+let regionalPredictions = {};
+let predictionStream = null;
 let currentOptimization = null;
 
 // Initialize the dashboard
@@ -1046,7 +1048,7 @@ function togglePrediction() {
 }
 
 function showCurrentDayPrediction() {
-    updateRiskZones([
+    updateRiskZones(regionalRiskZones() || [
         { name: 'Nainital District', risk: 'very-high', percentage: 85 },
         { name: 'Almora District', risk: 'high', percentage: 68 },
         { name: 'Dehradun District', risk: 'moderate', percentage: 42 }
@@ -1091,10 +1093,12 @@ function updateRiskZones(zones) {
             <div class="risk-color"></div>
             <div class="risk-info">
                 <span class="risk-level">${zone.risk.replace('-', ' ').toUpperCase()} Risk</span>
-                <span class="risk-area">${zone.name}</span>
+                <span class="risk-area"></span>
             </div>
             <div class="risk-percentage">${zone.percentage}%</div>
         `;
+        // Region names can come from the API, so never parse them as HTML
+        riskItem.querySelector('.risk-area').textContent = zone.name;
         riskContainer.appendChild(riskItem);
     });
 }
@@ -1308,15 +1312,18 @@ function updateTimeStamps() {
     }
 }
 
-function updateChartData() {
+async function updateChartData() {
     if (window.chartInstances && window.chartInstances.riskTimeline) {
         const chart = window.chartInstances.riskTimeline;
-        chart.data.datasets.forEach((dataset) => {
-            dataset.data = dataset.data.map(value => {
-                const variation = (Math.random() - 0.5) * 10;
-                return Math.max(0, Math.min(100, value + variation));
+        const loaded = await loadRiskTimelineHistory(chart);
+        if (!loaded) {
+            chart.data.datasets.forEach((dataset) => {
+                dataset.data = dataset.data.map(value => {
+                    const variation = (Math.random() - 0.5) * 10;
+                    return Math.max(0, Math.min(100, value + variation));
+                });
             });
-        });
+        }
         chart.update('none');
     }
 
@@ -1324,6 +1331,52 @@ function updateChartData() {
     updateAlertStatistics();
 }
 
+function riskHistoryPath(region, buckets) {
+    // One bucket per chart point over the last 24 hours, averaged on the server
+    return `/api/ml/history/${encodeURIComponent(region)}?hours=24&buckets=${buckets}&columns=risk`;
+}
+
+async function loadRiskTimelineHistory(chart) {
+    const buckets = chart.data.labels.length;
+    try {
+        const histories = await Promise.all(chart.data.datasets.map(async (dataset) => {
+            const response = await fetch(`${ML_API_BASE}${riskHistoryPath(dataset.label, buckets)}`);
+            if (!response.ok) {
+                return null;
+            }
+            const result = await response.json();
+            return result.success ? result.history : null;
+        }));
+        return applyRiskTimelineHistories(chart, histories);
+    } catch (error) {
+        return false;
+    }
+}
+
+function applyRiskTimelineHistories(chart, histories) {
+    if (histories.some(history => !history || history.samples === 0)) {
+        return false;
+    }
+    
+    // Align every region on the same bucket grid; empty buckets are left as gaps
+    const buckets = chart.data.labels.length;
+    const start = Math.min(...histories.map(history => history.start));
+    const width = histories[0].bucket_seconds;
+    chart.data.labels = Array.from({ length: buckets }, (_, i) =>
+        new Date((start + i * width) * 1000).toLocaleTimeString([], { hour: 'numeric' })
+    );
+    chart.data.datasets.forEach((dataset, index) => {
+        const history = histories[index];
+        const data = new Array(buckets).fill(null);
+        history.timestamps.forEach((timestamp, i) => {
+            const bucket = Math.min(buckets - 1, Math.round((timestamp - history.start) / width));
+            data[bucket] = Math.round(history.series.risk.mean[i] * 100);
+        });
+        dataset.data = data;
+    });
+    return true;
+}
+
 function updateFireSpreadChart() {
     if (isSimulationRunning && window.chartInstances && window.chartInstances.fireSpread) {
         const chart = window.chartInstances.fireSpread;
@@ -1445,8 +1498,8 @@ function updateEnvironmentalConditions() {
 
 // ML Integration Functions
 function initializeMLIntegration() {
-    startMLRealTimeUpdates();
-    loadMLModelInfo();
+    loadInitialMLState();
+    // The headline prediction follows the user's own inputs; the stream only feeds regional widgets
     setInterval(updateMLPredictions, 60000);
     showToast('AI/ML models initialized successfully', 'success');
 }
@@ -1461,8 +1514,7 @@ async function startMLRealTimeUpdates() {
         });
 
         if (response.ok) {
-            realTimeUpdates = true;
-            showToast('Real-time AI predictions activated', 'success');
+            onRealTimeStarted();
         }
     } catch (error) {
         console.warn('ML API not available, using fallback predictions');
@@ -1470,6 +1522,124 @@ async function startMLRealTimeUpdates() {
     }
 }
 
+function onRealTimeStarted() {
+    realTimeUpdates = true;
+    connectPredictionStream();
+    showToast('Real-time AI predictions activated', 'success');
+}
+
+// Cold load: everything the dashboard needs from the ML API in one round trip
+async function loadInitialMLState() {
+    const envData = getCurrentEnvironmentalData();
+    const chart = window.chartInstances && window.chartInstances.riskTimeline;
+    const requests = [
+        { id: 'start-realtime', method: 'POST', path: '/api/ml/start-realtime' },
+        { id: 'model-info', path: '/api/ml/model-info' },
+        { id: 'predict', path: '/api/ml/predict', body: { ...envData, spatial_map: 'none' } }
+    ];
+    if (chart) {
+        chart.data.datasets.forEach((dataset, index) => {
+            requests.push({ id: `history-${index}`, path: riskHistoryPath(dataset.label, chart.data.labels.length) });
+        });
+    }
+    
+    try {
+        const response = await fetch(`${ML_API_BASE}/api/ml/batch`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ requests })
+        });
+        if (!response.ok) {
+            throw new Error(`Batch request failed with status ${response.status}`);
+        }
+        
+        const result = await response.json();
+        const responses = {};
+        result.responses.forEach(entry => {
+            responses[entry.id] = entry.status === 200 ? entry.body : null;
+        });
+        
+        if (responses['start-realtime']) {
+            onRealTimeStarted();
+        }
+        if (responses['model-info']) {
+            applyMLModelInfo(responses['model-info']);
+        }
+        if (responses.predict) {
+            applyMLPredictionResult(responses.predict);
+        }
+        if (chart) {
+            const histories = chart.data.datasets.map((_, index) => {
+                const history = responses[`history-${index}`];
+                return history && history.success ? history.history : null;
+            });
+            if (applyRiskTimelineHistories(chart, histories)) {
+                chart.update('none');
+            }
+        }
+    } catch (error) {
+        // Fall back to individual requests, e.g. against an API without /api/ml/batch
+        startMLRealTimeUpdates();
+        loadMLModelInfo();
+    }
+}
+
+function connectPredictionStream() {
+    if (predictionStream || typeof EventSource === 'undefined') {
+        return;
+    }
+
+    // The browser reconnects on its own and resumes from the last event id
+    predictionStream = new EventSource(`${ML_API_BASE}/api/ml/stream`);
+
+    predictionStream.addEventListener('snapshot', (event) => {
+        regionalPredictions = {};
+        applyRegionalPredictions(JSON.parse(event.data));
+    });
+
+    predictionStream.addEventListener('predictions', (event) => {
+        applyRegionalPredictions(JSON.parse(event.data));
+    });
+
+    predictionStream.addEventListener('removed', (event) => {
+        JSON.parse(event.data).forEach(region => delete regionalPredictions[region]);
+        applyRegionalPredictions({});
+    });
+
+    predictionStream.onerror = () => {
+        console.warn('Prediction stream interrupted, reconnecting');
+    };
+}
+
+function applyRegionalPredictions(updates) {
+    Object.assign(regionalPredictions, updates);
+
+    // The risk zone list shows live regional risk, unless the next-day forecast is on screen
+    const btn = document.getElementById('toggle-prediction');
+    const zones = regionalRiskZones();
+    if (zones && !(btn && btn.textContent.includes('Current'))) {
+        updateRiskZones(zones);
+    }
+}
+
+function regionalRiskZones(count = 3) {
+    // The regions currently at highest risk, in the shape updateRiskZones expects
+    const entries = Object.entries(regionalPredictions);
+    if (entries.length === 0) {
+        return null;
+    }
+    return entries
+        .sort((a, b) => b[1].prediction.ensemble_risk_score - a[1].prediction.ensemble_risk_score)
+        .slice(0, count)
+        .map(([region, entry]) => ({
+            name: region,
+            risk: entry.prediction.ml_prediction.risk_category,
+            percentage: Math.round(entry.prediction.ensemble_risk_score * 100)
+        }));
+}
+
 async function updateMLPredictions() {
     try {
         const envData = getCurrentEnvironmentalData();
@@ -1478,15 +1648,12 @@ async function updateMLPredictions() {
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify(envData)
+            // The dashboard only uses the scalar scores, so skip the spatial risk map
+            body: JSON.stringify({ ...envData, spatial_map: 'none' })
         });
 
         if (response.ok) {
-            const result = await response.json();
-            if (result.success) {
-                mlPredictions = result.predictions;
-                updateDashboardWithMLPredictions(result.predictions);
-            }
+            applyMLPredictionResult(await response.json());
         }
     } catch (error) {
         const envData = getCurrentEnvironmentalData();
@@ -1495,6 +1662,13 @@ async function updateMLPredictions() {
     }
 }
 
+function applyMLPredictionResult(result) {
+    if (result.success) {
+        mlPredictions = result.predictions;
+        updateDashboardWithMLPredictions(result.predictions);
+    }
+}
+
 function getCurrentEnvironmentalData() {
     const temperature = getElementValue('temperature', 32);
 
@@ -1998,20 +2172,23 @@ async function loadMLModelInfo() {
     try {
         const response = await fetch(`${ML_API_BASE}/api/ml/model-info`);
         if (response.ok) {
-            const result = await response.json();
-            if (result.success) {
-                const accuracyEl = document.getElementById('accuracyValue');
-                if (accuracyEl && result.models.convlstm_unet.accuracy) {
-                    accuracyEl.textContent = result.models.convlstm_unet.accuracy;
-                }
-                window.mlModelInfo = result.models;
-            }
+            applyMLModelInfo(await response.json());
         }
     } catch (error) {
         console.warn('ML model info unavailable');
     }
 }
 
+function applyMLModelInfo(result) {
+    if (result.success) {
+        const accuracyEl = document.getElementById('accuracyValue');
+        if (accuracyEl && result.models.convlstm_unet.accuracy) {
+            accuracyEl.textContent = result.models.convlstm_unet.accuracy;
+        }
+        window.mlModelInfo = result.models;
+    }
+}
+
 // Initialize simulation monitoring chart
 function initializeSimulationMonitoringChart() {
     const ctx = document.getElementById('simulationMonitoringChart');
@@ -0,0 +1,286 @@
+
+"""Production entry point: pre-forks N worker processes serving the ML API
+
+Usage:
+    python serve.py --workers 4 --intra-op-threads 2 --inter-op-threads 1 --precision float32
+    python serve.py --workers 4 --asgi
+
+The parent process binds the listening socket and forks the workers before
+TensorFlow is imported, so each worker loads its own model exactly once after
+fork and Python-side work (CA spread steps, JSON encoding, feature prep) runs
+on all cores instead of serializing on one GIL. The parent only supervises:
+it restarts workers that die, backing off exponentially while a worker keeps
+crashing soon after start and giving up on it after --max-restarts such
+crashes in a row, and shuts all of them down on SIGTERM/SIGINT.
+SIGHUP to the parent hot-reloads the model weights in every worker, one worker
+after another, without dropping connections; POST /api/ml/model/reload on any
+worker sends that SIGHUP.
+
+The real-time prediction loop runs once, in a predictor process supervised
+like a worker and reloaded with them. Every worker follows it over a Unix
+socket (realtime_server.py) and serves the same snapshots and stream events.
+Simulation jobs (/api/ml/simulate/jobs) instead run in one job server process,
+supervised like a worker, which every worker reaches over a Unix socket
+(simulation_server.py); it runs the fire spread code only, without a model.
+With --asgi, workers run the ASGI app (asgi_app.py) under uvicorn instead of
+the threaded WSGI server.
+"""
+import argparse
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+import realtime_server
+import simulation_server
+from runtime_profile import RuntimeProfile, PRECISIONS
+
+# A worker that ran this long before dying is treated as healthy, resetting its backoff
+WORKER_STABLE_SECONDS = 60.0
+MAX_RESTART_DELAY = 30.0
+POLL_INTERVAL = 0.2
+# Supervised under these ids alongside the numbered workers
+JOB_SERVER = 'jobs'
+PREDICTOR = 'realtime'
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Pre-forked NeuroNix ML API server')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--intra-op-threads', type=int, default=1,
+                        help='TensorFlow intra-op threads per worker')
+    parser.add_argument('--inter-op-threads', type=int, default=1,
+                        help='TensorFlow inter-op threads per worker')
+    parser.add_argument('--precision', choices=PRECISIONS, default='float32',
+                        help='Inference precision policy per worker')
+    parser.add_argument('--onednn', choices=['default', 'on', 'off'], default='default',
+                        help='Force oneDNN kernels on or off')
+    parser.add_argument('--backlog', type=int, default=2048, help='Listen socket backlog')
+    parser.add_argument('--reload-stagger', type=float, default=2.0,
+                        help='Seconds between worker reloads on SIGHUP')
+    parser.add_argument('--max-restarts', type=int, default=5,
+                        help='Consecutive early crashes after which a worker is not restarted')
+    parser.add_argument('--asgi', action='store_true',
+                        help='Serve the ASGI app with uvicorn (requires uvicorn)')
+    parser.add_argument('--no-realtime', action='store_true',
+                        help='Do not start the real-time prediction loop until POST /api/ml/start-realtime')
+    return parser.parse_args()
+
+def create_listen_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Bind the shared listening socket that every worker accepts from"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def load_api(worker_id, args):
+    """Configure TensorFlow, import ml_api with its model and reload that model on SIGHUP"""
+    profile = RuntimeProfile(
+        intra_op_threads=args.intra_op_threads,
+        inter_op_threads=args.inter_op_threads,
+        precision=args.precision,
+        onednn=None if args.onednn == 'default' else args.onednn == 'on'
+    )
+    # ml_models applies the profile before it imports TensorFlow
+    os.environ.update(profile.to_env())
+    
+    import ml_api  # Builds the model once, in this process
+    
+    def reload_weights():
+        try:
+            info = ml_api.reload_model()
+            print(f"{describe(worker_id)} reloaded model version {info['version']}")
+        except Exception as e:
+            print(f"{describe(worker_id)} failed to reload model: {e}")
+    
+    # Reload off the signal handler so the process keeps serving meanwhile
+    signal.signal(signal.SIGHUP, lambda signum, frame: threading.Thread(target=reload_weights, daemon=True).start())
+    return ml_api
+
+def run_worker(worker_id: int, sock: socket.socket, args):
+    """Worker process body: configure TensorFlow, load the model, serve requests"""
+    from werkzeug.serving import make_server
+    ml_api = load_api(worker_id, args)
+    ml_api.supervisor_pid = os.getppid()  # HTTP reloads go through SIGHUP to every worker
+    # Mirror the predictor process, which runs the real-time loop for all workers
+    ml_api.real_time_predictor.start_following()
+    print(f"Worker {worker_id} (pid {os.getpid()}) serving on {args.host}:{args.port}")
+    
+    if args.asgi:
+        import uvicorn
+        import asgi_app
+        # uvicorn handles SIGTERM itself and drains open connections
+        config = uvicorn.Config(asgi_app.app, fd=sock.fileno(), lifespan='off', log_level='warning')
+        uvicorn.Server(config).run()
+        return
+    
+    server = make_server(args.host, args.port, ml_api.app, threaded=True, fd=sock.fileno())
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    server.serve_forever()
+
+def run_job_server(sock: socket.socket):
+    """Job server process body: run every worker's simulation jobs until SIGTERM"""
+    sock.close()  # API requests go to the workers only
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Simulation job server (pid {os.getpid()}) listening on {simulation_server.address}")
+    simulation_server.serve(simulation_server.address, simulation_server.authkey)
+
+def run_predictor(sock: socket.socket, args):
+    """Predictor process body: run the one real-time prediction loop that every worker follows"""
+    sock.close()  # API requests go to the workers only
+    server_address, server_authkey = realtime_server.address, realtime_server.authkey
+    # This process runs the predictor rather than following one
+    realtime_server.configure(None, None)
+    ml_api = load_api(PREDICTOR, args)
+    if not args.no_realtime:
+        ml_api.real_time_predictor.start_continuous_prediction()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Real-time predictor (pid {os.getpid()}) listening on {server_address}")
+    realtime_server.serve(server_address, server_authkey, ml_api.real_time_predictor)
+
+def fork_child(target, *target_args) -> int:
+    """Fork a process running target(*target_args), which exits with its status"""
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent handles Ctrl+C
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)  # A worker still starting loads the latest weights anyway
+        # Worker logs go out line by line, never held in a buffer a later fork could copy
+        sys.stdout.reconfigure(line_buffering=True)
+        code = 1
+        try:
+            target(*target_args)
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            # E.g. a model import error; report it instead of dying silently
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+    return pid
+
+def spawn_worker(worker_id, sock: socket.socket, args) -> int:
+    if worker_id == JOB_SERVER:
+        return fork_child(run_job_server, sock)
+    if worker_id == PREDICTOR:
+        return fork_child(run_predictor, sock, args)
+    return fork_child(run_worker, worker_id, sock, args)
+
+def describe(worker_id) -> str:
+    if worker_id == JOB_SERVER:
+        return 'Simulation job server'
+    return 'Real-time predictor' if worker_id == PREDICTOR else f'Worker {worker_id}'
+
+def main():
+    args = parse_args()
+    sock = create_listen_socket(args.host, args.port, args.backlog)
+    # Private directory for the job server's and predictor's sockets; workers inherit their addresses and keys
+    socket_dir = tempfile.mkdtemp(prefix='neuronix-')
+    simulation_server.configure(os.path.join(socket_dir, 'simulation.sock'), os.urandom(32))
+    realtime_server.configure(os.path.join(socket_dir, 'realtime.sock'), os.urandom(32))
+    workers = {}  # pid -> worker id
+    started_at = {}  # worker id -> monotonic start time
+    crashes = {}  # worker id -> consecutive early crashes
+    restarts = {}  # worker id -> monotonic time its restart is due
+    failed = set()  # workers given up on
+    shutting_down = False
+    reload_requested = False
+    reload_queue = []  # pids still to be sent SIGHUP
+    next_reload_at = 0.0
+    
+    def start(worker_id):
+        workers[spawn_worker(worker_id, sock, args)] = worker_id
+        started_at[worker_id] = time.monotonic()
+    
+    def shutdown(signum, frame):
+        nonlocal shutting_down
+        shutting_down = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    def reload_workers(signum, frame):
+        # Only flag it: the main loop staggers the signals without pausing worker supervision
+        nonlocal reload_requested
+        reload_requested = True
+    
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGHUP, reload_workers)
+    
+    start(JOB_SERVER)
+    start(PREDICTOR)
+    for worker_id in range(args.workers):
+        start(worker_id)
+    print(f"Started {args.workers} workers on {args.host}:{args.port}")
+    
+    # Poll instead of blocking in os.wait(), so pending restarts fire on time
+    while workers or (restarts and not shutting_down):
+        now = time.monotonic()
+        if reload_requested:
+            reload_requested = False
+            reload_queue = [pid for pid, worker_id in workers.items() if worker_id != JOB_SERVER]
+            next_reload_at = now
+        # Stagger the reloads so not every worker is busy building a model at once
+        if reload_queue and now >= next_reload_at and not shutting_down:
+            pid = reload_queue.pop(0)
+            if pid in workers:
+                try:
+                    os.kill(pid, signal.SIGHUP)
+                except ProcessLookupError:
+                    pass
+                next_reload_at = now + args.reload_stagger
+        
+        for worker_id, due_at in list(restarts.items()):
+            if shutting_down or due_at <= now:
+                del restarts[worker_id]
+                if not shutting_down:
+                    start(worker_id)
+        
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid == 0:
+            time.sleep(POLL_INTERVAL)
+            continue
+        
+        worker_id = workers.pop(pid, None)
+        if worker_id is None or shutting_down:
+            continue
+        
+        code = os.waitstatus_to_exitcode(status)
+        if time.monotonic() - started_at[worker_id] >= WORKER_STABLE_SECONDS:
+            crashes[worker_id] = 0
+        crashes[worker_id] = crashes.get(worker_id, 0) + 1
+        if crashes[worker_id] > args.max_restarts:
+            failed.add(worker_id)
+            print(f"{describe(worker_id)} (pid {pid}) exited with status {code}, "
+                  f"giving up after {args.max_restarts} restarts")
+            continue
+        
+        # Exponential backoff while the worker keeps crashing right after start
+        delay = min(MAX_RESTART_DELAY, 2.0 ** (crashes[worker_id] - 1))
+        print(f"{describe(worker_id)} (pid {pid}) exited with status {code}, restarting in {delay:.0f}s")
+        restarts[worker_id] = time.monotonic() + delay
+    
+    sock.close()
+    shutil.rmtree(socket_dir, ignore_errors=True)
+    if failed and not shutting_down:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""One simulation job manager shared by all pre-forked workers
+
+serve.py forks a job server process next to its workers and calls configure()
+before forking them. ml_models then gives each worker a SimulationJobClient
+instead of a SimulationJobManager of its own, so a job submitted through one
+worker can be polled, fetched and cancelled through any other. The
+NEURONIX_SIMULATION_* limits then apply to the job server, i.e. to the whole
+deployment rather than to each worker. The job server imports fire_spread
+only, never ml_models and its model.
+"""
+import os
+import threading
+from multiprocessing.managers import BaseManager, RemoteError
+from typing import Dict, List, Optional
+
+from fire_spread import SimulationJobManager
+
+JOB_METHODS = ('submit', 'get', 'list_jobs', 'cancel', 'get_stats')
+
+# Unix socket and authkey of the job server; None serves jobs from this process
+address: Optional[str] = None
+authkey: Optional[bytes] = None
+
+_local_jobs = None
+_local_jobs_lock = threading.Lock()
+
+def local_jobs() -> SimulationJobManager:
+    """This process's own job manager, created on first use"""
+    global _local_jobs
+    with _local_jobs_lock:
+        if _local_jobs is None:
+            _local_jobs = SimulationJobManager(
+                max_workers=int(os.environ.get('NEURONIX_SIMULATION_WORKERS', 2)),
+                max_queued=int(os.environ.get('NEURONIX_SIMULATION_QUEUE', 32)),
+                retain=int(os.environ.get('NEURONIX_SIMULATION_RETAIN', 100)),
+                result_ttl=float(os.environ.get('NEURONIX_SIMULATION_RESULT_TTL', 3600))
+            )
+        return _local_jobs
+
+class SimulationJobServer(BaseManager):
+    """Exposes the job server's SimulationJobManager as jobs()"""
+
+SimulationJobServer.register('jobs', callable=local_jobs, exposed=JOB_METHODS)
+
+def configure(server_address: str, server_authkey: bytes):
+    """Point this process, and the workers forked from it, at the job server"""
+    global address, authkey
+    address, authkey = server_address, server_authkey
+
+def serve(server_address: str, server_authkey: bytes):
+    """Run the job server in this process until it is stopped"""
+    global address, authkey
+    # This process runs the jobs itself rather than being a client of itself
+    address = authkey = None
+    if os.path.exists(server_address):
+        os.unlink(server_address)  # Left behind by a job server that was killed
+    server = SimulationJobServer(address=server_address, authkey=server_authkey).get_server()
+    try:
+        server.serve_forever()
+    finally:
+        if _local_jobs is not None:
+            # Running jobs stop after their current simulated hour, then the
+            # pool processes exit instead of outliving the server
+            _local_jobs.shutdown()
+
+class SimulationJobClient:
+    """The SimulationJobManager interface, served by the job server
+    
+    After a connection error the next call reconnects, e.g. to a restarted job
+    server; the jobs of the previous one are gone then.
+    """
+    
+    def __init__(self, server_address: str, server_authkey: bytes):
+        self.address = server_address
+        self.authkey = server_authkey
+        self._proxy = None
+        self._lock = threading.Lock()
+    
+    def _jobs(self):
+        with self._lock:
+            if self._proxy is None:
+                manager = SimulationJobServer(address=self.address, authkey=self.authkey)
+                manager.connect()
+                self._proxy = manager.jobs()
+            return self._proxy
+    
+    def _call(self, method: str, *args):
+        proxy = self._jobs()
+        try:
+            return getattr(proxy, method)(*args)
+        except (OSError, EOFError, RemoteError):
+            with self._lock:
+                if self._proxy is proxy:
+                    self._proxy = None
+            raise
+    
+    def submit(self, params: Dict):
+        return self._call('submit', params)
+    
+    def get(self, job_id: str):
+        return self._call('get', job_id)
+    
+    def list_jobs(self) -> List:
+        return self._call('list_jobs')
+    
+    def cancel(self, job_id: str):
+        return self._call('cancel', job_id)
+    
+    def get_stats(self) -> Dict:
+        return self._call('get_stats')
+
+def client() -> Optional[SimulationJobClient]:
+    """Client for the configured job server, or None outside serve.py"""
+    return SimulationJobClient(address, authkey) if address else None
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The model is built with the Keras 2 API (tf_keras), and the modules live at the repo root
+os.environ.setdefault('TF_USE_LEGACY_KERAS', '1')
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,62 @@
+import pytest
+
+import ml_api
+
+@pytest.fixture
+def client():
+    return ml_api.app.test_client()
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    """Records the sub-requests the batch route hands to the pool"""
+    calls = []
+    dispatch = ml_api._dispatch_subrequest
+    
+    def record(environ):
+        calls.append((environ['REQUEST_METHOD'], environ['PATH_INFO']))
+        return dispatch(environ)
+    
+    monkeypatch.setattr(ml_api, '_dispatch_subrequest', record)
+    return calls
+
+def batch(client, *subrequests):
+    return client.post('/api/ml/batch', json={'requests': list(subrequests)})
+
+def test_identical_subrequests_are_dispatched_once(client, dispatched):
+    response = batch(client,
+                     {'id': 'first', 'path': '/api/ml/model'},
+                     {'id': 'second', 'method': 'get', 'path': '/api/ml/model'},
+                     {'id': 'health', 'path': '/api/ml/health'})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['deduplicated'] == 1
+    assert [item['id'] for item in data['responses']] == ['first', 'second', 'health']
+    assert all(item['status'] == 200 for item in data['responses'])
+    assert data['responses'][0]['body'] == data['responses'][1]['body']
+    assert sorted(dispatched) == [('GET', '/api/ml/health'), ('GET', '/api/ml/model')]
+
+@pytest.mark.parametrize('path', ['/api/ml/batch', '/api/ml/%62atch', '/api/ml/stream', '/api/ml/%73tream?x=1'])
+def test_nested_batches_and_streams_are_rejected_however_spelled(client, dispatched, path):
+    response = batch(client, {'path': path, 'method': 'POST' if 'atch' in path else 'GET'})
+    assert response.status_code == 400
+    assert 'not allowed' in response.get_json()['error']
+    assert dispatched == []
+
+@pytest.mark.parametrize('subrequest', [
+    'x',
+    {'path': 42},
+    {'path': '/api/ml/unknown'},
+    {'path': '/api/ml/predict', 'method': 'GET'},
+    {'path': '/index.html'},
+])
+def test_any_invalid_entry_rejects_the_batch_before_dispatch(client, dispatched, subrequest):
+    response = batch(client, {'path': '/api/ml/health'}, subrequest)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert dispatched == []
+
+def test_malformed_batches_are_rejected(client):
+    assert client.post('/api/ml/batch', data='not json', content_type='application/json').status_code == 400
+    assert client.post('/api/ml/batch', json={'requests': []}).status_code == 400
+    too_many = [{'path': '/api/ml/health'}] * (ml_api.MAX_BATCH_REQUESTS + 1)
+    assert client.post('/api/ml/batch', json=too_many).status_code == 400
@@ -0,0 +1,98 @@
+import itertools
+import time
+from datetime import datetime
+
+import pytest
+from flask import jsonify, request
+
+import ml_api
+
+_names = itertools.count()
+
+@pytest.fixture
+def counted_view():
+    """A cached view that counts its calls; it fails when the body asks it to"""
+    calls = []
+    
+    def view():
+        calls.append(1)
+        data = request.get_json(silent=True) or {}
+        if data.get('fail'):
+            return jsonify({'success': False, 'error': 'failed'}), 500
+        payload = {'success': True, 'value': data.get('value'), 'calls': len(calls)}
+        if data.get('stamped'):
+            payload['timestamp'] = datetime.now().isoformat()
+        return jsonify(payload)
+    
+    view.__name__ = f'counted_view_{next(_names)}'
+    return ml_api.cached_response(max_size=8, ttl_seconds=60)(view), calls
+
+def call(view, method='POST', json=None, headers=None, path='/cached'):
+    with ml_api.app.test_request_context(path, method=method, json=json, headers=headers):
+        return view()
+
+def test_repeat_body_is_served_from_cache(counted_view):
+    view, calls = counted_view
+    first = call(view, json={'value': 1, 'other': 2})
+    # Key order does not matter
+    second = call(view, json={'other': 2, 'value': 1})
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_data() == first.get_data()
+    assert len(calls) == 1
+
+def test_hits_get_a_fresh_timestamp(counted_view):
+    view, calls = counted_view
+    first = call(view, json={'stamped': True}).get_json()
+    time.sleep(0.01)
+    second = call(view, json={'stamped': True}).get_json()
+    assert len(calls) == 1
+    assert second.pop('timestamp') > first.pop('timestamp')
+    assert second == first
+
+def test_different_body_or_path_misses(counted_view):
+    view, calls = counted_view
+    call(view, json={'value': 1})
+    call(view, json={'value': 2})
+    call(view, json={'value': 1}, path='/other')
+    call(view, json={'value': 1}, path='/cached?x=1')
+    assert len(calls) == 4
+
+def test_errors_are_not_cached(counted_view):
+    view, calls = counted_view
+    assert call(view, json={'fail': True}).status_code == 500
+    assert call(view, json={'fail': True}).status_code == 500
+    assert len(calls) == 2
+
+def test_model_reload_invalidates(counted_view, monkeypatch):
+    view, calls = counted_view
+    call(view, json={'value': 1})
+    monkeypatch.setattr(ml_api.fire_predictor, 'model_generation', ml_api.fire_predictor.model_generation + 1)
+    assert call(view, json={'value': 1}).headers['X-Cache'] == 'MISS'
+    assert len(calls) == 2
+
+def test_post_responses_carry_no_validators(counted_view):
+    view, _ = counted_view
+    response = call(view, json={'value': 1})
+    assert 'ETag' not in response.headers and 'Cache-Control' not in response.headers
+
+def test_conditional_post_is_never_answered_with_304(counted_view):
+    view, _ = counted_view
+    etag = call(view, method='GET', json={'value': 1}).headers['ETag']
+    response = call(view, json={'value': 1}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['value'] == 1
+
+def test_conditional_get_gets_304(counted_view):
+    view, _ = counted_view
+    etag = call(view, method='GET').headers['ETag']
+    response = call(view, method='GET', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+def test_etag_ignores_the_timestamp(counted_view):
+    view, _ = counted_view
+    etag = call(view, method='GET', json={'stamped': True}).headers['ETag']
+    time.sleep(0.01)
+    response = call(view, method='GET', json={'stamped': True}, headers={'If-None-Match': etag})
+    assert response.status_code == 304
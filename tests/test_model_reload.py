@@ -0,0 +1,47 @@
+import os
+import signal
+
+import pytest
+
+import ml_api
+from weight_store import ArtifactNotFound
+
+HEADERS = {'Authorization': 'Bearer secret'}
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(ml_api, 'ADMIN_TOKEN', 'secret')
+    return ml_api.app.test_client()
+
+@pytest.fixture
+def signals(monkeypatch):
+    sent = []
+    monkeypatch.setattr(ml_api.os, 'kill', lambda pid, signum: sent.append((pid, signum)))
+    return sent
+
+def test_reload_under_serve_signals_the_supervisor(client, signals, monkeypatch):
+    monkeypatch.setattr(ml_api, 'supervisor_pid', 4321)
+    monkeypatch.setattr(ml_api, 'check_model_artifact', lambda: {'version': 'v2'})
+    monkeypatch.setattr(ml_api, 'reload_model', lambda: pytest.fail('reloaded only this worker'))
+    response = client.post('/api/ml/model/reload', headers=HEADERS)
+    assert response.status_code == 202
+    assert response.get_json()['scope'] == 'all_workers'
+    assert response.get_json()['version'] == 'v2'
+    assert signals == [(4321, signal.SIGHUP)]
+
+def test_unusable_artifact_is_rejected_before_signalling(client, signals, monkeypatch):
+    monkeypatch.setattr(ml_api, 'supervisor_pid', 4321)
+    def missing():
+        raise ArtifactNotFound('No weight artifact found')
+    monkeypatch.setattr(ml_api, 'check_model_artifact', missing)
+    assert client.post('/api/ml/model/reload', headers=HEADERS).status_code == 404
+    assert signals == []
+
+def test_reload_without_supervisor_reloads_this_process(client, signals, monkeypatch):
+    monkeypatch.setattr(ml_api, 'supervisor_pid', None)
+    monkeypatch.setattr(ml_api, 'reload_model', lambda: {'version': 'v2'})
+    response = client.post('/api/ml/model/reload', headers=HEADERS)
+    assert response.status_code == 200
+    assert response.get_json()['scope'] == 'process'
+    assert response.get_json()['pid'] == os.getpid()
+    assert signals == []
@@ -0,0 +1,86 @@
+from ml_models import PredictionCache
+
+ENV = {'temperature': 34.9, 'humidity': 40, 'wind_speed': 12.2, 'wind_direction': 'NE',
+       'ndvi': 0.61, 'elevation': 1503, 'slope': 14.9, 'vegetation_density': 'moderate'}
+
+def make_cache(**kwargs):
+    calls = []
+    
+    def predict_fn(environmental_data, spatial_map='full', seed=None, mc_samples=0):
+        calls.append(dict(environmental_data))
+        return {'temperature': environmental_data['temperature'], 'seed': seed,
+                'recommendations': ['Monitor conditions']}
+    
+    return PredictionCache(predict_fn, **kwargs), calls
+
+def test_inputs_in_one_bucket_share_an_entry():
+    cache, calls = make_cache()
+    first = cache.predict(ENV)
+    second = cache.predict(dict(ENV, temperature=35.1))
+    assert len(calls) == 1
+    assert first == second
+    assert cache.get_stats()['hits'] == 1
+
+def test_prediction_is_computed_on_the_bucket_center():
+    cache, calls = make_cache()
+    # 34.9 and 35.1 share the 35.0 bucket; either arrival order computes on 35.0
+    assert cache.predict(dict(ENV, temperature=35.1))['temperature'] == 35.0
+    assert calls[0]['temperature'] == 35.0
+    assert calls[0]['elevation'] == 1500.0
+    assert calls[0]['wind_direction'] == 'NE'
+
+def test_categorical_fields_and_options_are_part_of_the_key():
+    cache, calls = make_cache()
+    cache.predict(ENV)
+    cache.predict(dict(ENV, wind_direction='SW'))
+    cache.predict(ENV, spatial_map='none')
+    cache.predict(ENV, seed=7)
+    assert len(calls) == 4
+
+def test_default_seed_is_used_when_none_given():
+    cache, _ = make_cache(default_seed=3)
+    assert cache.predict(ENV)['seed'] == 3
+    assert cache.predict(ENV, seed=5)['seed'] == 5
+
+def test_callers_get_independent_copies():
+    cache, _ = make_cache()
+    first = cache.predict(ENV)
+    first['recommendations'].append('mutated')
+    first['temperature'] = -1
+    second = cache.predict(ENV)
+    assert second['recommendations'] == ['Monitor conditions']
+    assert second['temperature'] == 35.0
+
+def test_version_change_invalidates_entries():
+    version = [0]
+    cache, calls = make_cache(version_fn=lambda: version[0])
+    cache.predict(ENV)
+    version[0] += 1
+    cache.predict(ENV)
+    assert len(calls) == 2
+
+def test_disabled_cache_passes_raw_inputs_through():
+    cache, calls = make_cache(max_size=0)
+    cache.predict(ENV)
+    cache.predict(ENV)
+    assert len(calls) == 2
+    assert calls[0]['temperature'] == 34.9
+
+def test_mc_dropout_predictions_bypass_the_cache():
+    cache, calls = make_cache()
+    cache.predict(ENV, mc_samples=8)
+    cache.predict(ENV, mc_samples=8, seed=1)
+    cache.predict(ENV, mc_samples=8, seed=1)
+    assert len(calls) == 3
+    assert calls[0]['temperature'] == 34.9
+    assert cache.get_stats()['bypassed'] == 3
+    assert cache.get_stats()['size'] == 0
+
+def test_stage_timings_are_only_reported_by_the_computing_request():
+    def predict_fn(environmental_data, spatial_map='full', seed=None, mc_samples=0):
+        return {'overall_risk': 0.5, 'stage_timings_ms': {'ml_prediction': 12.5}}
+    
+    cache = PredictionCache(predict_fn)
+    assert cache.predict(ENV)['stage_timings_ms'] == {'ml_prediction': 12.5}
+    hit = cache.predict(ENV)
+    assert hit == {'overall_risk': 0.5}
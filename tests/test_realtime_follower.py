@@ -0,0 +1,92 @@
+import queue
+
+import pytest
+
+import ml_api
+from ml_api import PredictionBroadcaster, RealTimeFollower, RealTimePredictor, SnapshotStore
+
+def prediction(score):
+    return {'prediction': {'ensemble_risk_score': score}, 'timestamp': 't'}
+
+@pytest.fixture
+def leader():
+    return RealTimePredictor(snapshots=SnapshotStore(change_log_size=4), broadcaster=PredictionBroadcaster())
+
+def follower_of(leader):
+    return RealTimeFollower(leader, snapshots=SnapshotStore(change_log_size=4), broadcaster=PredictionBroadcaster())
+
+def publish(predictor, updates, removed=()):
+    # As the prediction loop and remove_region do: snapshot first, then the stream
+    predictor.snapshots.publish(updates, removed)
+    if updates:
+        predictor.broadcaster.publish('predictions', updates)
+    if removed:
+        predictor.broadcaster.publish('removed', list(removed))
+
+def assert_same_snapshot(leader, follower, since=()):
+    ours, theirs = leader.snapshots.current, follower.snapshots.current
+    assert theirs.etag == ours.etag
+    assert theirs.body() == ours.body()
+    for version in since:
+        assert theirs.delta_body(version) == ours.delta_body(version)
+    assert follower.broadcaster.last_event_id == leader.broadcaster.last_event_id
+
+def test_follower_serves_the_leaders_versions_and_deltas(leader):
+    publish(leader, {'Almora': prediction(0.1), 'Tehri': prediction(0.2)})
+    follower = follower_of(leader)
+    # Its own epoch is unknown to the leader: the whole snapshot
+    follower.sync()
+    assert_same_snapshot(leader, follower, since=[0, 1])
+    
+    publish(leader, {'Almora': prediction(0.3)})
+    publish(leader, {}, removed=['Tehri'])
+    follower.sync()
+    assert_same_snapshot(leader, follower, since=[1, 2, 3])
+    assert 'Tehri' not in follower.snapshots.current.predictions
+
+def test_follower_falling_behind_the_change_log_gets_everything(leader):
+    follower = follower_of(leader)
+    follower.sync()
+    for score in range(10):
+        publish(leader, {f'Region {score}': prediction(score)})
+    follower.sync()
+    assert_same_snapshot(leader, follower, since=[9, 10])
+
+def test_subscribers_get_the_leaders_frames_and_event_ids(leader):
+    follower = follower_of(leader)
+    follower.sync()
+    subscription = follower.broadcaster.subscribe()
+    publish(leader, {'Almora': prediction(0.5)})
+    follower.sync()
+    frame = subscription.get_nowait()
+    assert frame == leader.broadcaster.frames_after(0)[-1][1]
+    assert b'id: 1\n' in frame
+    with pytest.raises(queue.Empty):
+        subscription.get_nowait()
+    # Reconnecting with Last-Event-ID replays from the follower's own history
+    assert follower.broadcaster.subscribe(0).get_nowait() == frame
+
+def test_realtime_route_matches_across_workers(leader, monkeypatch):
+    publish(leader, {'Almora': prediction(0.1)})
+    follower = follower_of(leader)
+    follower.sync()
+    client = ml_api.app.test_client()
+    
+    monkeypatch.setattr(ml_api, 'prediction_snapshots', leader.snapshots)
+    from_leader = client.get('/api/ml/realtime')
+    monkeypatch.setattr(ml_api, 'prediction_snapshots', follower.snapshots)
+    from_follower = client.get('/api/ml/realtime')
+    assert from_follower.headers['ETag'] == from_leader.headers['ETag']
+    assert from_follower.get_data() == from_leader.get_data()
+    # An ETag from one worker is valid on any other
+    response = client.get('/api/ml/realtime', headers={'If-None-Match': from_leader.headers['ETag']})
+    assert response.status_code == 304
+
+def test_follower_forwards_region_changes(leader):
+    follower = follower_of(leader)
+    assert follower.add_region('Test Region')
+    assert 'Test Region' in leader.get_stats()['scheduler']['schedule']
+    assert follower.remove_region('Test Region')
+    assert not follower.remove_region('Test Region')
+    follower.sync()
+    assert follower.snapshots.current.version == leader.snapshots.current.version == 1
@@ -0,0 +1,61 @@
+from ml_models import RiskAdaptiveScheduler
+
+REGIONS = ['a', 'b', 'c', 'd', 'e']
+
+def make_scheduler(**kwargs):
+    return RiskAdaptiveScheduler(REGIONS, min_interval=10.0, max_interval=100.0, **kwargs)
+
+def test_budget_caps_each_tick_and_counts_deferred_refreshes():
+    scheduler = make_scheduler(budget_per_tick=2)
+    now = 1e9
+    first = scheduler.next_batch(now)
+    assert len(first) == 2
+    assert scheduler.deferred == 0
+    for region in first:
+        scheduler.complete(region, 1.0, now)
+    
+    # The three remaining regions were due at the first tick and waited for the budget
+    second = scheduler.next_batch(now + 5)
+    third = scheduler.next_batch(now + 6)
+    assert len(second) == 2 and len(third) == 1
+    assert scheduler.deferred == 3
+
+def test_high_risk_refreshes_sooner_than_low_risk():
+    scheduler = make_scheduler(budget_per_tick=5)
+    now = 1e9
+    scheduler.next_batch(now)
+    scheduler.complete('a', 1.0, now)
+    scheduler.complete('b', 0.0, now)
+    schedule = scheduler.get_stats()['schedule']
+    assert schedule['a']['interval_seconds'] == 10.0
+    # Backs off gradually: at most doubling per refresh
+    assert schedule['b']['interval_seconds'] == 20.0
+
+def test_retry_skips_regions_that_already_completed():
+    scheduler = make_scheduler(budget_per_tick=5)
+    now = 1e9
+    batch = scheduler.next_batch(now)
+    scheduler.complete('a', 0.5, now)
+    scheduler.retry(batch)
+    # One heap entry per region: 'a' keeps its completed schedule, the rest are retried once
+    live = [region for due_at, _, region in scheduler._heap
+            if scheduler._regions[region]['due_at'] == due_at]
+    assert sorted(live) == REGIONS
+    assert len(scheduler._heap) == len(REGIONS)
+    
+    # A second retry of the same batch does nothing
+    scheduler.retry(batch)
+    assert len(scheduler._heap) == len(REGIONS)
+
+def test_removed_regions_are_not_handed_out():
+    scheduler = make_scheduler(budget_per_tick=5)
+    assert scheduler.remove_region('c')
+    assert 'c' not in scheduler.next_batch(1e9)
+    assert not scheduler.complete('c', 0.5)
+
+def test_region_limit():
+    scheduler = make_scheduler(max_regions=6)
+    assert scheduler.add_region('f')
+    assert not scheduler.add_region('g')
+    # Re-adding a tracked region is fine at the limit
+    assert scheduler.add_region('a')
@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import pickle
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+import simulation_server
+from fire_spread import JobQueueFull, SimulationJobManager
+
+ENV = {'temperature': 35, 'humidity': 20, 'wind_speed': 20, 'wind_direction': 'NE'}
+
+def job_params(grid_size=20, duration_hours=3, ensemble_size=1):
+    return {
+        'ignition_point': (grid_size // 2, grid_size // 2),
+        'grid_size': grid_size,
+        'duration_hours': duration_hours,
+        'ensemble_size': ensemble_size,
+        'environmental_data': ENV
+    }
+
+# Long enough to still be running when the test acts on it
+LONG_JOB = job_params(grid_size=300, duration_hours=72)
+
+def wait_for(jobs, job_id, condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get(job_id)
+        if condition(job):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} stuck at {jobs.get(job_id)}")
+
+def finished(job):
+    return job.finished
+
+@pytest.fixture
+def make_manager():
+    managers = []
+    def make(**kwargs):
+        managers.append(SimulationJobManager(**kwargs))
+        return managers[-1]
+    yield make
+    for manager in managers:
+        manager.shutdown()
+
+def test_submitted_job_completes_with_progress_and_result(make_manager):
+    jobs = make_manager(max_workers=2)
+    job = jobs.submit(job_params(ensemble_size=2))
+    assert job.status in ('queued', 'running')
+    # Callers get snapshots that can cross a process boundary
+    assert job.cancel_event is None and job.future is None
+    pickle.dumps(job)
+    
+    job = wait_for(jobs, job.job_id, finished)
+    assert job.status == 'completed', job.error
+    assert job.progress == 1.0
+    assert len(job.result['hourly_progression']) == 3
+    assert job.result['fire_map'].shape == (20, 20)
+    assert job.result['ensemble']['burn_probability'].shape == (20, 20)
+    assert jobs.get_stats()['completed'] == 1
+
+def test_cancel_stops_running_and_queued_jobs(make_manager):
+    jobs = make_manager(max_workers=1)
+    running = jobs.submit(LONG_JOB)
+    queued = jobs.submit(LONG_JOB)
+    wait_for(jobs, running.job_id, lambda job: job.progress > 0)
+    
+    # A queued job never starts
+    assert jobs.cancel(queued.job_id).status == 'cancelled'
+    jobs.cancel(running.job_id)
+    job = wait_for(jobs, running.job_id, finished)
+    assert job.status == 'cancelled'
+    assert 0 < job.progress < 1
+    assert jobs.get_stats()['cancelled'] == 2
+    assert jobs.cancel('unknown') is None
+
+def test_full_queue_rejects_submissions(make_manager):
+    jobs = make_manager(max_workers=1, max_queued=1)
+    running = jobs.submit(LONG_JOB)
+    wait_for(jobs, running.job_id, lambda job: job.status == 'running')
+    jobs.submit(LONG_JOB)
+    with pytest.raises(JobQueueFull):
+        jobs.submit(LONG_JOB)
+    assert jobs.get_stats()['rejected'] == 1
+
+def test_finished_jobs_are_evicted_beyond_retain_and_after_ttl(make_manager):
+    jobs = make_manager(retain=1)
+    first = wait_for(jobs, jobs.submit(job_params()).job_id, finished)
+    second = wait_for(jobs, jobs.submit(job_params()).job_id, finished)
+    assert [job.job_id for job in jobs.list_jobs()] == [second.job_id]
+    assert jobs.get(first.job_id) is None
+    
+    jobs.result_ttl = 0.0
+    time.sleep(0.01)
+    assert jobs.list_jobs() == []
+    assert jobs.get_stats()['evicted'] == 2
+
+def run_job_server(address, authkey):
+    # Like serve.py: exit through serve(), which stops the pool processes
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    simulation_server.serve(address, authkey)
+
+def test_job_server_shares_jobs_between_clients(tmp_path):
+    address, authkey = str(tmp_path / 'jobs.sock'), os.urandom(16)
+    server = multiprocessing.get_context('spawn').Process(target=run_job_server, args=(address, authkey))
+    server.start()
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(address) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        # E.g. two workers: submitted through one, finished as seen through the other
+        submitting = simulation_server.SimulationJobClient(address, authkey)
+        polling = simulation_server.SimulationJobClient(address, authkey)
+        job = submitting.submit(job_params())
+        job = wait_for(polling, job.job_id, finished)
+        assert job.status == 'completed'
+        assert polling.get_stats()['completed'] == 1
+        # Release the proxies while the server can still be told
+        del submitting, polling
+    finally:
+        server.terminate()
+        server.join()
+    assert server.exitcode == 0
+
+def test_job_server_imports_neither_the_model_nor_tensorflow():
+    check = ("import sys, simulation_server; "
+             "sys.exit(bool({'ml_models', 'tensorflow'} & set(sys.modules)))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert subprocess.run([sys.executable, '-c', check], cwd=root).returncode == 0
@@ -0,0 +1,66 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import weight_store
+
+def make_weights(value):
+    return [np.full((2, 3), value, dtype=np.float32), np.full((4,), value, dtype=np.float32)]
+
+def test_round_trip(tmp_path):
+    manifest = weight_store.save_weights(make_weights(1.0), str(tmp_path), names=['a', 'b'], version='v1')
+    weights, loaded = weight_store.load_weights(str(tmp_path))
+    assert loaded['version'] == manifest['version'] == 'v1'
+    assert [w.shape for w in weights] == [(2, 3), (4,)]
+    assert np.all(weights[0] == 1.0)
+
+def test_new_version_never_touches_the_current_files(tmp_path):
+    weight_store.save_weights(make_weights(1.0), str(tmp_path), version='v1')
+    weights_v1, _ = weight_store.load_weights(str(tmp_path))
+    weight_store.save_weights(make_weights(2.0), str(tmp_path), version='v2')
+    
+    # A reader holding v1 keeps consistent data; new readers get v2
+    assert np.all(weights_v1[0] == 1.0)
+    weights_v2, manifest = weight_store.load_weights(str(tmp_path))
+    assert manifest['version'] == 'v2'
+    assert np.all(weights_v2[0] == 2.0)
+    # Each version directory is a loadable artifact on its own
+    assert weight_store.load_weights(str(tmp_path / 'versions' / 'v1'))[1]['version'] == 'v1'
+
+def test_versions_are_immutable(tmp_path):
+    weight_store.save_weights(make_weights(1.0), str(tmp_path), version='v1')
+    with pytest.raises(ValueError):
+        weight_store.save_weights(make_weights(2.0), str(tmp_path), version='v1')
+    with pytest.raises(ValueError):
+        weight_store.save_weights(make_weights(2.0), str(tmp_path), version='../escape')
+
+def test_old_versions_are_pruned(tmp_path):
+    for i in range(4):
+        weight_store.save_weights(make_weights(float(i)), str(tmp_path), version=f'v{i}', keep=2)
+        # Distinct mtimes regardless of filesystem timestamp resolution
+        os.utime(tmp_path / 'versions' / f'v{i}', (i, i))
+    weight_store.save_weights(make_weights(9.0), str(tmp_path), version='v9', keep=2)
+    assert sorted(os.listdir(tmp_path / 'versions')) == ['v3', 'v9']
+
+def test_checksum_mismatch_is_rejected(tmp_path):
+    weight_store.save_weights(make_weights(1.0), str(tmp_path), version='v1')
+    path = tmp_path / 'versions' / 'v1' / 'weights.npy'
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        weight_store.load_weights(str(tmp_path))
+
+def test_flat_layout_still_loads(tmp_path):
+    manifest = weight_store.save_weights(make_weights(1.0), str(tmp_path / 'new'), version='v1')
+    (tmp_path / 'old').mkdir()
+    os.replace(tmp_path / 'new' / 'versions' / 'v1' / 'weights.npy', tmp_path / 'old' / 'weights.npy')
+    manifest.pop('weights_file')
+    (tmp_path / 'old' / 'manifest.json').write_text(json.dumps(manifest))
+    assert weight_store.load_weights(str(tmp_path / 'old'))[1]['version'] == 'v1'
+
+def test_missing_artifact(tmp_path):
+    with pytest.raises(weight_store.ArtifactNotFound):
+        weight_store.load_weights(str(tmp_path))
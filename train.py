@@ -0,0 +1,200 @@
+"""Train the ConvLSTM + UNet model from TFRecord shards on local disk
+
+Usage:
+    python train.py --write-synthetic data/train 64 --examples-per-shard 256
+    python train.py --train 'data/train/*.tfrecord' --val 'data/val/*.tfrecord' \\
+        --epochs 10 --batch-size 32 --cache data/cache/train --output models/weights
+
+Shards are streamed through tf.data (parallel interleave over files, batched
+vectorized parsing, optional on-disk cache, shuffle, prefetch), so the
+dataset never has to fit in RAM. Each example holds:
+
+    environmental_features  8 float32 values (DataProcessor.normalize_features)
+    spatial_features        raw float32 bytes, shape (64, 64, 8)
+    fire_risk               float32 label in [0, 1]
+    spatial_risk            raw float32 bytes, shape (64, 64, 1)
+
+The trained weights are written to the weight store (see weight_store.py);
+POST /api/ml/model/reload or SIGHUP to serve.py picks them up without a restart.
+"""
+import argparse
+import glob
+import os
+import time
+
+# Training always needs the Keras graph, whatever backend serving is configured for
+os.environ['NEURONIX_INFERENCE_BACKEND'] = 'keras'
+
+import numpy as np
+import tensorflow as tf
+
+from ml_models import fire_predictor, DataProcessor, SyntheticSpatialGenerator, WEIGHTS_PATH
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+FEATURE_SPEC = {
+    'environmental_features': tf.io.FixedLenFeature([8], tf.float32),
+    'spatial_features': tf.io.FixedLenFeature([], tf.string),
+    'fire_risk': tf.io.FixedLenFeature([1], tf.float32),
+    'spatial_risk': tf.io.FixedLenFeature([], tf.string)
+}
+
+def make_dataset(file_pattern: str, input_shape=(64, 64, 8), batch_size: int = 32, training: bool = True,
+                 shuffle_buffer: int = 2048, cache: str = None) -> tf.data.Dataset:
+    """Stream ((env, spatial), labels) batches from TFRecord shards
+    
+    cache caches the serialized records after the first epoch: a file path
+    prefix for an on-disk cache, 'memory' for RAM, or None to re-read shards.
+    """
+    files = tf.data.Dataset.list_files(file_pattern, shuffle=training)
+    dataset = files.interleave(
+        lambda path: tf.data.TFRecordDataset(path, buffer_size=8 << 20),
+        cycle_length=AUTOTUNE, num_parallel_calls=AUTOTUNE, deterministic=not training
+    )
+    if cache:
+        # Cache raw records, which are much smaller than decoded float tensors
+        dataset = dataset.cache('' if cache == 'memory' else cache)
+    if training:
+        dataset = dataset.shuffle(shuffle_buffer, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size, drop_remainder=training)
+    
+    height, width, channels = input_shape
+    
+    def parse_batch(serialized):
+        # Parsing whole batches is vectorized and much cheaper than per-example maps
+        features = tf.io.parse_example(serialized, FEATURE_SPEC)
+        spatial = tf.reshape(tf.io.decode_raw(features['spatial_features'], tf.float32),
+                             (-1, height, width, channels))
+        spatial_risk = tf.reshape(tf.io.decode_raw(features['spatial_risk'], tf.float32),
+                                  (-1, height, width, 1))
+        inputs = (features['environmental_features'], spatial)
+        labels = {'fire_risk': features['fire_risk'], 'spatial_risk': spatial_risk}
+        return inputs, labels
+    
+    dataset = dataset.map(parse_batch, num_parallel_calls=AUTOTUNE, deterministic=not training)
+    return dataset.prefetch(AUTOTUNE)
+
+def serialize_example(env_features: np.ndarray, spatial: np.ndarray, risk: float, spatial_risk: np.ndarray) -> bytes:
+    feature = {
+        'environmental_features': tf.train.Feature(float_list=tf.train.FloatList(value=env_features)),
+        'spatial_features': tf.train.Feature(bytes_list=tf.train.BytesList(
+            value=[np.ascontiguousarray(spatial, dtype=np.float32).tobytes()])),
+        'fire_risk': tf.train.Feature(float_list=tf.train.FloatList(value=[risk])),
+        'spatial_risk': tf.train.Feature(bytes_list=tf.train.BytesList(
+            value=[np.ascontiguousarray(spatial_risk, dtype=np.float32).tobytes()]))
+    }
+    return tf.train.Example(features=tf.train.Features(feature=feature)).SerializeToString()
+
+def write_synthetic_shards(directory: str, shards: int, examples_per_shard: int, seed: int = 0):
+    """Write demo shards labelled with the fire weather index, for exercising the pipeline"""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    processor = DataProcessor()
+    generator = SyntheticSpatialGenerator(seed=seed)
+    directions = list(processor.wind_direction_mapping)
+    densities = list(processor.vegetation_mapping)
+    
+    for shard in range(shards):
+        path = os.path.join(directory, f'shard-{shard:05d}.tfrecord')
+        with tf.io.TFRecordWriter(path) as writer:
+            for _ in range(examples_per_shard):
+                env_data = {
+                    'temperature': rng.uniform(10, 45), 'humidity': rng.uniform(10, 90),
+                    'wind_speed': rng.uniform(0, 40), 'wind_direction': rng.choice(directions),
+                    'ndvi': rng.uniform(0.2, 0.9), 'elevation': rng.uniform(300, 4000),
+                    'slope': rng.uniform(0, 45), 'vegetation_density': rng.choice(densities)
+                }
+                fwi = processor.calculate_fire_weather_index(
+                    env_data['temperature'], env_data['humidity'], env_data['wind_speed']
+                )
+                spatial = generator.generate(env_data)[0]
+                # Riskier where the fuel layer is dense
+                spatial_risk = np.clip(spatial[..., :1] * fwi * 2, 0, 1)
+                writer.write(serialize_example(processor.normalize_features(env_data), spatial,
+                                               fwi, spatial_risk))
+        print(f"Wrote {path}")
+
+class ThroughputMonitor(tf.keras.callbacks.Callback):
+    """Logs training examples/sec and process CPU utilization per epoch"""
+    
+    def __init__(self, batch_size: int):
+        super().__init__()
+        self.batch_size = batch_size
+        self.cpu_count = os.cpu_count() or 1
+        self.history = []
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        self.batches = 0
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+    
+    def on_train_batch_end(self, batch, logs=None):
+        self.batches += 1
+        # Stop the clocks at the last training batch so validation is not counted
+        self.wall_end = time.perf_counter()
+        self.cpu_end = time.process_time()
+    
+    def on_epoch_end(self, epoch, logs=None):
+        wall = self.wall_end - self.wall_start if self.batches else 0.0
+        cpu = self.cpu_end - self.cpu_start if self.batches else 0.0
+        examples = self.batches * self.batch_size
+        stats = {
+            'epoch': epoch + 1,
+            'examples': examples,
+            'examples_per_sec': examples / wall if wall > 0 else 0.0,
+            # Share of all cores used by this process (input pipeline + training)
+            'cpu_utilization': cpu / (wall * self.cpu_count) if wall > 0 else 0.0,
+            'loss': float((logs or {}).get('loss', float('nan')))
+        }
+        self.history.append(stats)
+        print(f"\nEpoch {stats['epoch']}: {stats['examples_per_sec']:.1f} examples/sec, "
+              f"CPU utilization {stats['cpu_utilization'] * 100:.0f}% of {self.cpu_count} cores")
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the ConvLSTM + UNet fire risk model')
+    parser.add_argument('--train', help='Glob of training TFRecord shards')
+    parser.add_argument('--val', help='Glob of validation TFRecord shards')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--steps-per-epoch', type=int, default=None)
+    parser.add_argument('--shuffle-buffer', type=int, default=2048)
+    parser.add_argument('--cache', default=None, help="Cache path prefix, or 'memory'")
+    parser.add_argument('--output', default=WEIGHTS_PATH, help='Weight store directory to write')
+    parser.add_argument('--version', default=None, help='Version label for the saved weights')
+    parser.add_argument('--write-synthetic', nargs=2, metavar=('DIRECTORY', 'SHARDS'),
+                        help='Write synthetic demo shards instead of training')
+    parser.add_argument('--examples-per-shard', type=int, default=256)
+    args = parser.parse_args()
+    
+    if args.write_synthetic:
+        directory, shards = args.write_synthetic
+        write_synthetic_shards(directory, int(shards), args.examples_per_shard)
+        return
+    
+    if not args.train or not glob.glob(args.train):
+        parser.error('--train must match at least one TFRecord shard')
+    
+    model = fire_predictor.convlstm_model
+    train_dataset = make_dataset(args.train, model.input_shape, args.batch_size, training=True,
+                                 shuffle_buffer=args.shuffle_buffer, cache=args.cache)
+    val_dataset = None
+    if args.val:
+        val_dataset = make_dataset(args.val, model.input_shape, args.batch_size, training=False)
+    
+    monitor = ThroughputMonitor(args.batch_size)
+    history = model.model.fit(
+        train_dataset, validation_data=val_dataset, epochs=args.epochs,
+        steps_per_epoch=args.steps_per_epoch, callbacks=[monitor]
+    )
+    
+    manifest = fire_predictor.save_weights(args.output, version=args.version, metadata={
+        'epochs': args.epochs,
+        'batch_size': args.batch_size,
+        'train_pattern': args.train,
+        'final_loss': float(history.history['loss'][-1]),
+        'throughput': monitor.history
+    })
+    print(f"Saved weights version {manifest['version']} to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""Weather observations for the real-time predictor from pluggable station feeds
+
+Sources implement WeatherSource.fetch(region) as a coroutine:
+
+    HTTPWeatherSource    pooled aiohttp client against a per-region URL template
+    ReplayWeatherSource  JSON-lines file of recorded observations, usable offline
+
+WeatherIngestor runs the source on its own asyncio event loop in a background
+thread, so the fetches for all regions of a tick overlap, each bounded by a
+timeout and a concurrency limit. A region whose station is slow or failing
+gets its last known observation (or nothing, leaving the caller's defaults),
+so one bad feed never stalls the prediction tick.
+
+Configured from the environment by create_weather_ingestor():
+
+    NEURONIX_WEATHER_SOURCE       'none' (default), 'http' or 'replay'
+    NEURONIX_WEATHER_URL          URL template with {region}, for 'http'
+    NEURONIX_WEATHER_REPLAY       JSON-lines file path, for 'replay'
+    NEURONIX_WEATHER_TIMEOUT      seconds per region fetch (default 2)
+    NEURONIX_WEATHER_CONCURRENCY  concurrent fetches (default 16)
+    NEURONIX_WEATHER_MAX_AGE      seconds a last known observation stays usable (default 900)
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Fields a station feed may provide; anything else comes from the caller's defaults
+WEATHER_FIELDS = ('temperature', 'humidity', 'wind_speed', 'wind_direction', 'ndvi')
+
+class WeatherSource(ABC):
+    """Asynchronous source of the latest weather observation for a region"""
+    
+    name = 'source'
+    
+    @abstractmethod
+    async def fetch(self, region: str) -> Dict:
+        """Latest observation for region as a dict of WEATHER_FIELDS (a subset is fine)"""
+    
+    async def close(self):
+        pass
+
+class HTTPWeatherSource(WeatherSource):
+    """Fetches observations over HTTP with one pooled aiohttp session
+    
+    The session (and its keep-alive connection pool) is created lazily on the
+    ingestor's event loop and reused for every request. field_map renames feed
+    fields to ours, e.g. {'temperature': 'temp_c'}.
+    """
+    
+    name = 'http'
+    
+    def __init__(self, url_template: str, max_connections: int = 32, headers: Optional[Dict] = None,
+                 field_map: Optional[Dict[str, str]] = None):
+        if aiohttp is None:
+            raise RuntimeError("HTTPWeatherSource requires aiohttp (pip install aiohttp)")
+        self.url_template = url_template
+        self.max_connections = max_connections
+        self.headers = headers or {}
+        self.field_map = field_map or {}
+        self._session = None
+    
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                  raise_for_status=True)
+        return self._session
+    
+    async def fetch(self, region: str) -> Dict:
+        url = self.url_template.format(region=quote(region))
+        async with self._get_session().get(url) as response:
+            payload = await response.json(content_type=None)
+        
+        observation = {}
+        for field in WEATHER_FIELDS:
+            value = payload.get(self.field_map.get(field, field))
+            if value is not None:
+                observation[field] = value if field == 'wind_direction' else float(value)
+        return observation
+    
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+class ReplayWeatherSource(WeatherSource):
+    """Replays recorded observations from a JSON-lines file, for offline runs
+    
+    Each line is an object with a 'region' key and any WEATHER_FIELDS. Every
+    fetch returns the region's next record, wrapping around at the end.
+    """
+    
+    name = 'replay'
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._records = defaultdict(list)
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records[record['region']].append(
+                        {field: record[field] for field in WEATHER_FIELDS if field in record}
+                    )
+        self._positions = defaultdict(int)
+    
+    async def fetch(self, region: str) -> Dict:
+        records = self._records.get(region)
+        if not records:
+            raise KeyError(f"No recorded observations for region: {region}")
+        position = self._positions[region]
+        self._positions[region] = (position + 1) % len(records)
+        return dict(records[position])
+
+class WeatherIngestor:
+    """Fetches observations for many regions concurrently from synchronous code"""
+    
+    def __init__(self, source: WeatherSource, timeout: float = 2.0, max_concurrency: int = 16,
+                 max_age: float = 900.0):
+        self.source = source
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_age = max_age
+        self._last_known = {}  # region -> (monotonic time, observation)
+        self._lock = threading.Lock()
+        self.stats = {'fetches': 0, 'failures': 0, 'timeouts': 0, 'stale_served': 0, 'last_fetch_ms': 0.0}
+        
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = None
+        self._thread = threading.Thread(target=self._loop.run_forever, name='weather-ingestion', daemon=True)
+        self._thread.start()
+    
+    async def _fetch_one(self, region: str) -> Dict:
+        async with self._semaphore:
+            return await self.source.fetch(region)
+    
+    async def _fetch_all(self, regions: List[str]) -> list:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # The timeout covers waiting for a slot too, so the whole call is bounded by it
+        return await asyncio.gather(
+            *(asyncio.wait_for(self._fetch_one(region), self.timeout) for region in regions),
+            return_exceptions=True
+        )
+    
+    def fetch(self, regions: List[str]) -> Dict[str, Dict]:
+        """Observations for regions; failed regions get their last known one or are left out"""
+        start = time.perf_counter()
+        future = asyncio.run_coroutine_threadsafe(self._fetch_all(regions), self._loop)
+        results = future.result(self.timeout + 1.0)
+        
+        now = time.monotonic()
+        observations = {}
+        with self._lock:
+            self.stats['fetches'] += len(regions)
+            for region, result in zip(regions, results):
+                if not isinstance(result, BaseException):
+                    self._last_known[region] = (now, result)
+                    observations[region] = result
+                    continue
+                
+                self.stats['failures'] += 1
+                if isinstance(result, asyncio.TimeoutError):
+                    self.stats['timeouts'] += 1
+                fetched_at, last_known = self._last_known.get(region, (None, None))
+                if last_known is not None and now - fetched_at <= self.max_age:
+                    self.stats['stale_served'] += 1
+                    observations[region] = last_known
+            self.stats['last_fetch_ms'] = (time.perf_counter() - start) * 1000
+        return observations
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'source': self.source.name, 'timeout_seconds': self.timeout,
+                    'max_concurrency': self.max_concurrency, **self.stats}
+    
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.source.close(), self._loop).result(self.timeout + 1.0)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+def create_weather_ingestor() -> Optional[WeatherIngestor]:
+    """Ingestor configured by the NEURONIX_WEATHER_* variables, or None for synthetic weather"""
+    kind = os.environ.get('NEURONIX_WEATHER_SOURCE', 'none').lower()
+    if kind == 'none':
+        return None
+    if kind == 'http':
+        source = HTTPWeatherSource(os.environ['NEURONIX_WEATHER_URL'],
+                                   max_connections=int(os.environ.get('NEURONIX_WEATHER_CONCURRENCY', 16)))
+    elif kind == 'replay':
+        source = ReplayWeatherSource(os.environ['NEURONIX_WEATHER_REPLAY'])
+    else:
+        raise ValueError(f"Unknown NEURONIX_WEATHER_SOURCE: {kind}")
+    
+    return WeatherIngestor(
+        source,
+        timeout=float(os.environ.get('NEURONIX_WEATHER_TIMEOUT', 2.0)),
+        max_concurrency=int(os.environ.get('NEURONIX_WEATHER_CONCURRENCY', 16)),
+        max_age=float(os.environ.get('NEURONIX_WEATHER_MAX_AGE', 900))
+    )
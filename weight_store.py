@@ -0,0 +1,134 @@
+
+"""Model weight artifacts: one flat float32 .npy file plus a JSON manifest per version
+
+    <directory>/versions/<version>/weights.npy    every weight tensor, concatenated and flattened
+    <directory>/versions/<version>/manifest.json  version, sha256 of weights.npy, tensor names/shapes/offsets
+    <directory>/manifest.json                     the current version's manifest, naming its weights file
+
+A version directory is written once and never modified. Saving a new version
+writes it completely and then replaces the top-level manifest in one rename,
+so a reader always gets a manifest and a weights file that belong together.
+Directories written before versioning (weights.npy next to manifest.json)
+still load.
+
+Loading memory-maps the weights file and returns per-tensor views into that
+mapping, so reading an artifact makes no private copy of the file. Keras
+set_weights() still copies every tensor into its own variables, so each
+worker process holds a full copy of the weights; only the TFLite backend,
+which maps its flatbuffer directly, shares weight pages between workers.
+"""
+import datetime
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+WEIGHTS_FILE = 'weights.npy'
+MANIFEST_FILE = 'manifest.json'
+VERSIONS_DIR = 'versions'
+
+class ArtifactNotFound(FileNotFoundError):
+    """No weight artifact at the requested location"""
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def artifact_exists(directory: str) -> bool:
+    return os.path.exists(os.path.join(directory, MANIFEST_FILE))
+
+def _write_manifest(manifest: Dict, path: str):
+    """Write a manifest under a temporary name and rename it into place"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _prune_versions(directory: str, current: str, keep: int):
+    """Delete all but the newest keep version directories, never the current one"""
+    versions_dir = os.path.join(directory, VERSIONS_DIR)
+    entries = sorted(os.scandir(versions_dir), key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        if entry.is_dir() and entry.name != current:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def save_weights(weights: List[np.ndarray], directory: str, names: Optional[List[str]] = None,
+                 version: Optional[str] = None, metadata: Optional[Dict] = None, keep: int = 5) -> Dict:
+    """Write weights as a new version in directory, make it current and return the manifest
+    
+    Older versions beyond the newest keep are deleted.
+    """
+    version = version or datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    if not version or os.path.basename(version) != version or version in ('.', '..'):
+        raise ValueError(f"Invalid weight version name: {version!r}")
+    version_dir = os.path.join(directory, VERSIONS_DIR, version)
+    os.makedirs(os.path.dirname(version_dir), exist_ok=True)
+    try:
+        os.mkdir(version_dir)
+    except FileExistsError:
+        raise ValueError(f"Weight version {version} already exists in {directory}")
+    
+    names = names or [f'weight_{i}' for i in range(len(weights))]
+    total = sum(int(np.size(w)) for w in weights)
+    
+    weights_path = os.path.join(version_dir, WEIGHTS_FILE)
+    flat = np.lib.format.open_memmap(weights_path, mode='w+', dtype=np.float32, shape=(total,))
+    
+    tensors, offset = [], 0
+    for name, weight in zip(names, weights):
+        weight = np.asarray(weight)
+        flat[offset:offset + weight.size] = weight.ravel()
+        tensors.append({'name': name, 'shape': list(weight.shape), 'offset': offset, 'size': int(weight.size)})
+        offset += weight.size
+    flat.flush()
+    del flat
+    
+    manifest = {
+        'version': version,
+        'created': datetime.datetime.now().isoformat(),
+        'dtype': 'float32',
+        'total_parameters': total,
+        'sha256': file_sha256(weights_path),
+        'weights_file': WEIGHTS_FILE,
+        'tensors': tensors,
+        'metadata': metadata or {}
+    }
+    _write_manifest(manifest, os.path.join(version_dir, MANIFEST_FILE))
+    
+    # The single switch-over point: the top-level manifest names the new version's file
+    current = dict(manifest, weights_file=os.path.join(VERSIONS_DIR, version, WEIGHTS_FILE))
+    _write_manifest(current, os.path.join(directory, MANIFEST_FILE))
+    
+    _prune_versions(directory, version, keep)
+    return manifest
+
+def load_weights(directory: str, verify: bool = True) -> Tuple[List[np.ndarray], Dict]:
+    """Memory-map the weights in directory and return (per-tensor views, manifest)"""
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise ArtifactNotFound(f"No weight artifact found at {directory}")
+    
+    # Read once: the file named here is never rewritten, whatever is saved meanwhile
+    weights_path = os.path.join(directory, manifest.get('weights_file', WEIGHTS_FILE))
+    if verify:
+        checksum = file_sha256(weights_path)
+        if checksum != manifest['sha256']:
+            raise ValueError(f"Checksum mismatch for {weights_path}: expected {manifest['sha256']}, got {checksum}")
+    
+    flat = np.load(weights_path, mmap_mode='r')
+    if flat.size != manifest['total_parameters']:
+        raise ValueError(f"{weights_path} has {flat.size} values, manifest expects {manifest['total_parameters']}")
+    
+    weights = [
+        flat[t['offset']:t['offset'] + t['size']].reshape(t['shape'])
+        for t in manifest['tensors']
+    ]
+    return weights, manifest